@@ -1,24 +1,36 @@
 """
 AI clients for Mosaic 2.0 fallback system.
 Provides OpenAI and Anthropic clients with rate limiting and error handling.
+Answers are served from a semantic cache when a similar prompt was answered recently.
 """
 
+import asyncio
 import json
 import time
 from datetime import datetime
-from typing import Any, Dict, Optional
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
 
 try:
     import openai
-    from anthropic import Anthropic
+    from anthropic import Anthropic, AsyncAnthropic
 
     AI_PACKAGES_AVAILABLE = True
 except ImportError:
     AI_PACKAGES_AVAILABLE = False
 
+from .embedding_cache import DEFAULT_MODEL as EMBEDDING_MODEL
+from .embedding_cache import get_cached_embedding
+from .provider_routing import ProviderRouter
+from .semantic_cache import SemanticResponseCache, namespace_for
 from .settings import get_settings
 
 
+# Receives each chunk of generated text while a response is streamed
+DeltaCallback = Callable[[str], Awaitable[None]]
+
+
 class AIClientManager:
     """Manages AI clients with rate limiting and fallback logic."""
 
@@ -26,14 +38,35 @@ class AIClientManager:
         self.settings = get_settings()
         self.openai_client = None
         self.anthropic_client = None
+        # Async clients are created lazily inside the running event loop
+        self.async_openai_client = None
+        self.async_anthropic_client = None
         self.rate_limits = {
             "openai": {"requests": 0, "last_reset": datetime.now()},
             "anthropic": {"requests": 0, "last_reset": datetime.now()},
         }
         self.max_requests_per_minute = 60
 
+        # Anthropic resilience settings shared by the sync and async paths
+        self.anthropic_timeout = 30.0
+        self.backoff_delays = [1, 2, 4]  # seconds
+
+        self.semantic_cache = SemanticResponseCache(embed_fn=self.embed_prompt)
+        # Orders providers by observed latency/errors and hedges slow calls
+        self.router = ProviderRouter(["openai", "anthropic"])
+
         self._initialize_clients()
 
+    def _request_embedding(self, text: str) -> List[float]:
+        response = self.openai_client.embeddings.create(model=EMBEDDING_MODEL, input=text)
+        return response.data[0].embedding
+
+    def embed_prompt(self, text: str) -> List[float]:
+        """Embedding for the semantic cache, shared with the global embedding cache."""
+        if not self.openai_client:
+            return []
+        return get_cached_embedding(text, self._request_embedding)
+
     def _initialize_clients(self):
         """Initialize AI clients with API keys."""
         if not AI_PACKAGES_AVAILABLE:
@@ -83,43 +116,63 @@ class AIClientManager:
         """Increment rate limit counter for a provider."""
         self.rate_limits[provider]["requests"] += 1
 
+    def _cache_namespace(self, context: Optional[Dict[str, Any]]) -> str:
+        """Fingerprint of what the model sees besides the prompt itself."""
+        if "system_prompt" in (context or {}):
+            return namespace_for(self._system_prompt(context))
+        # Without a system prompt the context is sent alongside the user prompt
+        return namespace_for(self._system_prompt(context), context or None)
+
+    def _cached_response(self, cached: Dict[str, Any], start_time: float) -> Dict[str, Any]:
+        return {
+            **cached,
+            "fallback_used": True,
+            "cached": True,
+            "response_time_ms": int((time.time() - start_time) * 1000),
+        }
+
+    def _store_response(
+        self, namespace: str, prompt: str, vector: Any, result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        if result.get("fallback_used") and not result.get("incomplete"):
+            self.semantic_cache.store(
+                namespace,
+                prompt,
+                vector,
+                {"response": result["response"], "provider": result["provider"]},
+            )
+        return result
+
     def generate_fallback_response(
         self, prompt: str, context: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Generate AI fallback response using available clients."""
+        """Generate AI fallback response, reusing a cached answer to a similar prompt."""
         start_time = time.time()
+        namespace = self._cache_namespace(context)
+        vector = self.semantic_cache.embed(prompt)
+        cached = self.semantic_cache.lookup(namespace, vector)
+        if cached:
+            return self._cached_response(cached, start_time)
+        result = self._generate_uncached(prompt, context, start_time)
+        return self._store_response(namespace, prompt, vector, result)
+
+    def _ready_providers(self) -> List[str]:
+        """Providers with a client, within rate limits and not tripped, fastest first."""
+        clients = {"openai": self.openai_client, "anthropic": self.anthropic_client}
+        return self.router.rank(
+            [p for p, client in clients.items() if client and self._check_rate_limit(p)]
+        )
 
-        # Try OpenAI first
-        if self.openai_client and self._check_rate_limit("openai"):
-            try:
-                response = self._call_openai(prompt, context)
-                if response:
-                    self._increment_rate_limit("openai")
-                    return {
-                        "response": response,
-                        "provider": "openai",
-                        "fallback_used": True,
-                        "response_time_ms": int((time.time() - start_time) * 1000),
-                    }
-            except Exception as e:
-                print(f"⚠️ OpenAI fallback failed: {e}")
-
-        # Try Anthropic as fallback
-        if self.anthropic_client and self._check_rate_limit("anthropic"):
-            try:
-                response = self._call_anthropic(prompt, context)
-                if response:
-                    self._increment_rate_limit("anthropic")
-                    return {
-                        "response": response,
-                        "provider": "anthropic",
-                        "fallback_used": True,
-                        "response_time_ms": int((time.time() - start_time) * 1000),
-                    }
-            except Exception as e:
-                print(f"⚠️ Anthropic fallback failed: {e}")
+    def _provider_result(self, provider: str, response: str, start_time: float) -> Dict[str, Any]:
+        self._increment_rate_limit(provider)
+        return {
+            "response": response,
+            "provider": provider,
+            "fallback_used": True,
+            "response_time_ms": int((time.time() - start_time) * 1000),
+        }
 
-        # If all AI clients fail, return error
+    def _unavailable_result(self, start_time: float) -> Dict[str, Any]:
         return {
             "response": "AI fallback unavailable - all providers failed",
             "provider": "none",
@@ -128,35 +181,51 @@ class AIClientManager:
             "response_time_ms": int((time.time() - start_time) * 1000),
         }
 
+    def _generate_uncached(
+        self, prompt: str, context: Optional[Dict[str, Any]], start_time: float
+    ) -> Dict[str, Any]:
+        """Generate AI fallback response, hedging across available clients."""
+        calls = {"openai": self._call_openai, "anthropic": self._call_anthropic}
+        provider, response = self.router.call(
+            [(p, partial(calls[p], prompt, context)) for p in self._ready_providers()]
+        )
+        if response:
+            return self._provider_result(provider, response, start_time)
+        return self._unavailable_result(start_time)
+
+    def _system_prompt(self, context: Optional[Dict[str, Any]]) -> str:
+        if context and "system_prompt" in context:
+            return context["system_prompt"]
+        return "You are a helpful career coach assistant. Provide thoughtful, actionable advice."
+
+    def _user_content(self, prompt: str, context: Optional[Dict[str, Any]]) -> str:
+        # If a system_prompt is provided, we assume it contains all necessary context.
+        # Otherwise, we fall back to the old behavior of dumping the context.
+        if "system_prompt" in (context or {}) or not context:
+            return prompt
+        context_str = json.dumps(context, indent=2)
+        return f"Context: {context_str}\n\nUser prompt: {prompt}"
+
+    def _openai_messages(
+        self, prompt: str, context: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": self._system_prompt(context)},
+            {"role": "user", "content": self._user_content(prompt, context)},
+        ]
+
+    def _is_transient(self, error: Exception) -> bool:
+        error_str = str(error).lower()
+        return any(x in error_str for x in ["timeout", "rate", "429", "503", "502", "connection"])
+
     def _call_openai(self, prompt: str, context: Optional[Dict[str, Any]] = None) -> Optional[str]:
         """Call OpenAI API with proper error handling."""
         try:
-            system_prompt = (
-                "You are a helpful career coach assistant. Provide thoughtful, actionable advice."
-            )
-            if context and "system_prompt" in context:
-                system_prompt = context["system_prompt"]
-
-            messages = [{"role": "system", "content": system_prompt}]
-
-            # If a system_prompt is provided, we assume it contains all necessary context.
-            # Otherwise, we fall back to the old behavior of dumping the context.
-            if "system_prompt" not in (context or {}):
-                if context:
-                    context_str = json.dumps(context, indent=2)
-                    messages.append(
-                        {
-                            "role": "user",
-                            "content": f"Context: {context_str}\n\nUser prompt: {prompt}",
-                        }
-                    )
-                else:
-                    messages.append({"role": "user", "content": prompt})
-            else:
-                messages.append({"role": "user", "content": prompt})
-
             response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo", messages=messages, max_tokens=1000, temperature=0.7
+                model="gpt-3.5-turbo",
+                messages=self._openai_messages(prompt, context),
+                max_tokens=1000,
+                temperature=0.7,
             )
 
             return response.choices[0].message.content
@@ -183,50 +252,172 @@ class AIClientManager:
             - 3 retry attempts with exponential backoff
             - Handles transient errors (rate limits, timeouts)
         """
-        max_retries = 3
-        backoff_delays = [1, 2, 4]  # seconds
+        max_retries = len(self.backoff_delays)
 
         try:
-            system_prompt = (
-                "You are a helpful career coach assistant. Provide thoughtful, actionable advice."
-            )
-            if context and "system_prompt" in context:
-                system_prompt = context["system_prompt"]
-
-            # If a system_prompt is provided, we assume it contains all necessary context.
-            if "system_prompt" in (context or {}):
-                full_prompt = prompt
-            elif context:
-                context_str = json.dumps(context, indent=2)
-                full_prompt = f"Context: {context_str}\n\nUser prompt: {prompt}"
-            else:
-                full_prompt = prompt
-
             response = self.anthropic_client.messages.create(
                 model="claude-3-haiku-20240307",
                 max_tokens=1000,
-                system=system_prompt,
-                messages=[{"role": "user", "content": full_prompt}],
-                timeout=30.0,  # ✅ RESILIENCE FIX: 30 second timeout
+                system=self._system_prompt(context),
+                messages=[{"role": "user", "content": self._user_content(prompt, context)}],
+                timeout=self.anthropic_timeout,  # ✅ RESILIENCE FIX: 30 second timeout
             )
 
             return response.content[0].text
 
         except Exception as e:
-            error_str = str(e).lower()
             # ✅ RESILIENCE FIX: Retry on transient errors
-            is_transient = any(x in error_str for x in ['timeout', 'rate', '429', '503', '502', 'connection'])
-
-            if is_transient and retry_count < max_retries:
-                delay = backoff_delays[retry_count]
+            if self._is_transient(e) and retry_count < max_retries:
+                delay = self.backoff_delays[retry_count]
                 print(f"Anthropic API transient error (attempt {retry_count + 1}/{max_retries}): {e}. Retrying in {delay}s...")
-                import time
                 time.sleep(delay)
                 return self._call_anthropic(prompt, context, retry_count + 1)
 
             print(f"Anthropic API error (final): {e}")
             return None
 
+    def _get_async_clients(self) -> Tuple[Any, Any]:
+        """Create async SDK clients on first use (they bind to the running loop's transport)."""
+        if not AI_PACKAGES_AVAILABLE:
+            return None, None
+        if self.async_openai_client is None and self.openai_client is not None:
+            self.async_openai_client = openai.AsyncOpenAI(api_key=self.settings.OPENAI_API_KEY)
+        if self.async_anthropic_client is None and self.anthropic_client is not None:
+            self.async_anthropic_client = AsyncAnthropic(api_key=self.settings.CLAUDE_API_KEY)
+        return self.async_openai_client, self.async_anthropic_client
+
+    async def _call_openai_async(
+        self,
+        prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+        on_delta: Optional[DeltaCallback] = None,
+    ) -> Optional[str]:
+        """Call OpenAI API without blocking the event loop; streams deltas to on_delta."""
+        client, _ = self._get_async_clients()
+        if client is None:
+            return None
+        try:
+            request = {
+                "model": "gpt-3.5-turbo",
+                "messages": self._openai_messages(prompt, context),
+                "max_tokens": 1000,
+                "temperature": 0.7,
+            }
+            if on_delta is None:
+                response = await client.chat.completions.create(**request)
+                return response.choices[0].message.content
+
+            parts = []
+            stream = await client.chat.completions.create(stream=True, **request)
+            async for chunk in stream:
+                text = chunk.choices[0].delta.content if chunk.choices else None
+                if text:
+                    parts.append(text)
+                    await on_delta(text)
+            return "".join(parts)
+        except Exception as e:
+            print(f"OpenAI API error: {e}")
+            return None
+
+    async def _call_anthropic_async(
+        self,
+        prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+        on_delta: Optional[DeltaCallback] = None,
+    ) -> Optional[str]:
+        """Call Anthropic API with the same timeout/retry policy, backing off with asyncio.sleep."""
+        _, client = self._get_async_clients()
+        if client is None:
+            return None
+        max_retries = len(self.backoff_delays)
+        request = {
+            "model": "claude-3-haiku-20240307",
+            "max_tokens": 1000,
+            "system": self._system_prompt(context),
+            "messages": [{"role": "user", "content": self._user_content(prompt, context)}],
+            "timeout": self.anthropic_timeout,
+        }
+        for attempt in range(max_retries + 1):
+            parts = []
+            try:
+                if on_delta is None:
+                    response = await client.messages.create(**request)
+                    return response.content[0].text
+                async with client.messages.stream(**request) as stream:
+                    async for text in stream.text_stream:
+                        parts.append(text)
+                        await on_delta(text)
+                return "".join(parts)
+            except Exception as e:
+                # Once text has reached the client a retry would repeat it
+                if self._is_transient(e) and attempt < max_retries and not parts:
+                    delay = self.backoff_delays[attempt]
+                    print(f"Anthropic API transient error (attempt {attempt + 1}/{max_retries}): {e}. Retrying in {delay}s...")
+                    await asyncio.sleep(delay)
+                    continue
+                print(f"Anthropic API error (final): {e}")
+                return None
+        return None
+
+    async def generate_fallback_response_async(
+        self,
+        prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+        on_delta: Optional[DeltaCallback] = None,
+    ) -> Dict[str, Any]:
+        """Async variant of generate_fallback_response for request handlers.
+
+        With on_delta, provider output is streamed to the callback as it arrives;
+        cached answers are returned whole without calling it.
+        """
+        start_time = time.time()
+        namespace = self._cache_namespace(context)
+        vector = await asyncio.to_thread(self.semantic_cache.embed, prompt)
+        cached = self.semantic_cache.lookup(namespace, vector)
+        if cached:
+            return self._cached_response(cached, start_time)
+        result = await self._generate_uncached_async(prompt, context, start_time, on_delta)
+        return self._store_response(namespace, prompt, vector, result)
+
+    async def _generate_uncached_async(
+        self,
+        prompt: str,
+        context: Optional[Dict[str, Any]],
+        start_time: float,
+        on_delta: Optional[DeltaCallback] = None,
+    ) -> Dict[str, Any]:
+        calls = {"openai": self._call_openai_async, "anthropic": self._call_anthropic_async}
+        providers = self._ready_providers()
+        if on_delta is None:
+            provider, response = await self.router.call_async(
+                [(p, partial(calls[p], prompt, context)) for p in providers]
+            )
+            if response:
+                return self._provider_result(provider, response, start_time)
+            return self._unavailable_result(start_time)
+
+        # Two streams can't be interleaved, so streaming tries providers in turn
+        emitted: List[str] = []
+
+        async def forward(text: str):
+            emitted.append(text)
+            await on_delta(text)
+
+        for provider in providers:
+            response = await self.router.run_async(
+                provider, partial(calls[provider], prompt, context, forward)
+            )
+            if response:
+                return self._provider_result(provider, response, start_time)
+            if emitted:
+                # The stream broke part way; the client already has this text, so
+                # don't start over with another provider
+                result = self._provider_result(provider, "".join(emitted), start_time)
+                result["incomplete"] = True
+                return result
+
+        return self._unavailable_result(start_time)
+
     def get_health_status(self) -> Dict[str, Any]:
         """Get health status of all AI clients."""
         status = {
@@ -234,19 +425,21 @@ class AIClientManager:
                 "available": self.openai_client is not None,
                 "rate_limited": not self._check_rate_limit("openai"),
                 "requests_this_minute": self.rate_limits["openai"]["requests"],
+                "circuit_open": self.router.is_open("openai"),
             },
             "anthropic": {
                 "available": self.anthropic_client is not None,
                 "rate_limited": not self._check_rate_limit("anthropic"),
                 "requests_this_minute": self.rate_limits["anthropic"]["requests"],
+                "circuit_open": self.router.is_open("anthropic"),
             },
         }
 
         status["any_available"] = any(
-            [
-                status["openai"]["available"] and not status["openai"]["rate_limited"],
-                status["anthropic"]["available"] and not status["anthropic"]["rate_limited"],
-            ]
+            status[p]["available"]
+            and not status[p]["rate_limited"]
+            and not status[p]["circuit_open"]
+            for p in ("openai", "anthropic")
         )
 
         return status
@@ -263,6 +456,25 @@ def get_ai_fallback_response(
     return ai_client_manager.generate_fallback_response(prompt, context)
 
 
+async def get_ai_fallback_response_async(
+    prompt: str,
+    context: Optional[Dict[str, Any]] = None,
+    on_delta: Optional[DeltaCallback] = None,
+) -> Dict[str, Any]:
+    """Get AI fallback response without blocking the event loop."""
+    return await ai_client_manager.generate_fallback_response_async(prompt, context, on_delta)
+
+
 def get_ai_health_status() -> Dict[str, Any]:
     """Get AI clients health status."""
     return ai_client_manager.get_health_status()
+
+
+def get_semantic_cache_stats() -> Dict[str, Any]:
+    """Get semantic response cache statistics."""
+    return ai_client_manager.semantic_cache.get_stats()
+
+
+def get_routing_stats() -> Dict[str, Any]:
+    """Get provider latency, hedging and circuit breaker statistics."""
+    return ai_client_manager.router.get_stats()
@@ -4,9 +4,15 @@ Tracks match score distribution, rerank lift, and token usage
 """
 
 import csv
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any, Dict, List
 
+from .analytics_store import (
+    MATCH_ROLLUP,
+    TOKEN_ROLLUP,
+    read_rollup,
+    upsert_rollups,
+)
 from .storage import get_conn
 
 
@@ -29,22 +35,6 @@ class AnalyticsEngine:
         try:
             with get_conn() as conn:
                 with conn.cursor() as cursor:
-                    # Create analytics table if it doesn't exist (PostgreSQL syntax)
-                    cursor.execute(
-                        """
-                        CREATE TABLE IF NOT EXISTS match_analytics (
-                            id SERIAL PRIMARY KEY,
-                            query_hash TEXT,
-                            query_text TEXT,
-                            pre_rerank_avg REAL,
-                            post_rerank_avg REAL,
-                            improvement_pct REAL,
-                            processing_time REAL,
-                            timestamp TIMESTAMP WITH TIME ZONE DEFAULT (NOW() AT TIME ZONE 'utc')
-                        )
-                    """
-                    )
-
                     # Insert analytics record
                     query_hash = self._get_query_hash(query)
                     pre_avg = sum(pre_scores) / len(pre_scores) if pre_scores else 0.0
@@ -58,6 +48,17 @@ class AnalyticsEngine:
                     """,
                         (query_hash, query, pre_avg, post_avg, improvement_pct, processing_time),
                     )
+                    upsert_rollups(
+                        cursor,
+                        MATCH_ROLLUP,
+                        [
+                            (
+                                datetime.utcnow(),
+                                (),
+                                (1, pre_avg, post_avg, improvement_pct, processing_time),
+                            )
+                        ],
+                    )
 
         except Exception as e:
             print(f"Error logging analytics: {e}")
@@ -67,20 +68,6 @@ class AnalyticsEngine:
         try:
             with get_conn() as conn:
                 with conn.cursor() as cursor:
-                    # Create token usage table if it doesn't exist (PostgreSQL syntax)
-                    cursor.execute(
-                        """
-                        CREATE TABLE IF NOT EXISTS token_usage (
-                            id SERIAL PRIMARY KEY,
-                            operation TEXT,
-                            tokens INTEGER,
-                            cost REAL,
-                            success BOOLEAN,
-                            timestamp TIMESTAMP WITH TIME ZONE DEFAULT (NOW() AT TIME ZONE 'utc')
-                        )
-                    """
-                    )
-
                     # Insert token usage record
                     cursor.execute(
                         """
@@ -89,6 +76,17 @@ class AnalyticsEngine:
                     """,
                         (operation, tokens, cost, success),
                     )
+                    upsert_rollups(
+                        cursor,
+                        TOKEN_ROLLUP,
+                        [
+                            (
+                                datetime.utcnow(),
+                                (operation or "unknown",),
+                                (1, tokens, tokens if success else 0, cost),
+                            )
+                        ],
+                    )
 
         except Exception as e:
             print(f"Error logging token usage: {e}")
@@ -96,43 +94,30 @@ class AnalyticsEngine:
     def get_match_analytics(self, days: int = 7) -> Dict[str, Any]:
         """Get match analytics for the specified period."""
         try:
-            with get_conn() as conn:
-                with conn.cursor() as cursor:
-                    # Get analytics data
-                    cursor.execute(
-                        f"""
-                        SELECT
-                            AVG(pre_rerank_avg) as avg_pre_score,
-                            AVG(post_rerank_avg) as avg_post_score,
-                            AVG(improvement_pct) as avg_improvement,
-                            AVG(processing_time) as avg_processing_time,
-                            COUNT(*) as total_queries
-                        FROM match_analytics
-                        WHERE timestamp > NOW() - INTERVAL '{days} days'
-                    """
-                    )
-                    rows = cursor.fetchone()
-
-                if rows:
-                    return {
-                        "period_days": days,
-                        "total_queries": rows[4],
-                        "avg_pre_score": round(rows[0], 3) if rows[0] else 0.0,
-                        "avg_post_score": round(rows[1], 3) if rows[1] else 0.0,
-                        "avg_improvement_pct": round(rows[2], 1) if rows[2] else 0.0,
-                        "avg_processing_time": round(rows[3], 3) if rows[3] else 0.0,
-                        "status": "operational",
-                    }
-                else:
-                    return {
-                        "period_days": days,
-                        "total_queries": 0,
-                        "avg_pre_score": 0.0,
-                        "avg_post_score": 0.0,
-                        "avg_improvement_pct": 0.0,
-                        "avg_processing_time": 0.0,
-                        "status": "no_data",
-                    }
+            totals = read_rollup(MATCH_ROLLUP, datetime.utcnow() - timedelta(days=days))
+            row = totals.get(())
+            queries = int(row["queries"]) if row else 0
+
+            if queries:
+                return {
+                    "period_days": days,
+                    "total_queries": queries,
+                    "avg_pre_score": round(row["sum_pre_rerank"] / queries, 3),
+                    "avg_post_score": round(row["sum_post_rerank"] / queries, 3),
+                    "avg_improvement_pct": round(row["sum_improvement_pct"] / queries, 1),
+                    "avg_processing_time": round(row["sum_processing_time"] / queries, 3),
+                    "status": "operational",
+                }
+            else:
+                return {
+                    "period_days": days,
+                    "total_queries": 0,
+                    "avg_pre_score": 0.0,
+                    "avg_post_score": 0.0,
+                    "avg_improvement_pct": 0.0,
+                    "avg_processing_time": 0.0,
+                    "status": "no_data",
+                }
 
         except Exception as e:
             return {"error": str(e), "status": "error"}
@@ -140,46 +125,33 @@ class AnalyticsEngine:
     def get_token_usage_analytics(self, days: int = 7) -> Dict[str, Any]:
         """Get token usage analytics for the specified period."""
         try:
-            with get_conn() as conn:
-                with conn.cursor() as cursor:
-                    # Get token usage data
-                    cursor.execute(
-                        f"""
-                        SELECT
-                            operation,
-                            SUM(tokens) as total_tokens,
-                            SUM(cost) as total_cost,
-                            COUNT(*) as total_operations,
-                            AVG(CASE WHEN success = true THEN tokens ELSE 0 END) as avg_successful_tokens
-                        FROM token_usage
-                        WHERE timestamp > NOW() - INTERVAL '{days} days'
-                        GROUP BY operation
-                    """
-                    )
-                    rows = cursor.fetchall()
-
-                operations = {}
-                total_cost = 0.0
-                total_tokens = 0
-
-                for row in rows:
-                    operation, tokens, cost, ops, avg_tokens = row
-                    operations[operation] = {
-                        "total_tokens": tokens,
-                        "total_cost": round(cost, 4),
-                        "total_operations": ops,
-                        "avg_successful_tokens": round(avg_tokens, 1) if avg_tokens else 0,
-                    }
-                    total_cost += cost
-                    total_tokens += tokens
-
-                return {
-                    "period_days": days,
-                    "total_cost": round(total_cost, 4),
-                    "total_tokens": total_tokens,
-                    "operations": operations,
-                    "status": "operational",
+            totals = read_rollup(TOKEN_ROLLUP, datetime.utcnow() - timedelta(days=days))
+
+            operations = {}
+            total_cost = 0.0
+            total_tokens = 0
+
+            for (operation,), row in totals.items():
+                ops = int(row["operations"])
+                tokens = int(row["tokens"])
+                operations[operation] = {
+                    "total_tokens": tokens,
+                    "total_cost": round(row["cost"], 4),
+                    "total_operations": ops,
+                    "avg_successful_tokens": (
+                        round(row["successful_tokens"] / ops, 1) if ops else 0
+                    ),
                 }
+                total_cost += row["cost"]
+                total_tokens += tokens
+
+            return {
+                "period_days": days,
+                "total_cost": round(total_cost, 4),
+                "total_tokens": total_tokens,
+                "operations": operations,
+                "status": "operational",
+            }
 
         except Exception as e:
             return {"error": str(e), "status": "error"}
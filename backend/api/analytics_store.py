@@ -0,0 +1,188 @@
+"""
+Analytics storage for Mosaic 2.0
+Raw event tables are partitioned by day (migration 005) and summarized into
+minute/hour/day rollup tables that are updated by upsert as events are written,
+so dashboards read a bounded number of rollup rows instead of scanning raw rows.
+"""
+
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .storage import get_conn
+
+
+GRANULARITIES = ("minute", "hour", "day")
+
+RAW_RETENTION_DAYS = int(os.getenv("ANALYTICS_RAW_RETENTION_DAYS", "30"))
+MINUTE_ROLLUP_RETENTION_DAYS = int(os.getenv("ANALYTICS_MINUTE_RETENTION_DAYS", "2"))
+HOUR_ROLLUP_RETENTION_DAYS = int(os.getenv("ANALYTICS_HOUR_RETENTION_DAYS", "90"))
+PARTITION_DAYS_AHEAD = 7
+
+
+@dataclass(frozen=True)
+class Rollup:
+    """A rollup table: additive measures keyed by granularity, bucket and dimensions."""
+
+    table: str
+    raw_table: str
+    dimensions: Tuple[str, ...]
+    measures: Tuple[str, ...]
+
+
+USAGE_ROLLUP = Rollup(
+    "usage_tracking_rollup", "usage_tracking", ("operation",), ("requests", "successes", "cost")
+)
+MATCH_ROLLUP = Rollup(
+    "match_analytics_rollup",
+    "match_analytics",
+    (),
+    (
+        "queries",
+        "sum_pre_rerank",
+        "sum_post_rerank",
+        "sum_improvement_pct",
+        "sum_processing_time",
+    ),
+)
+TOKEN_ROLLUP = Rollup(
+    "token_usage_rollup",
+    "token_usage",
+    ("operation",),
+    ("operations", "tokens", "successful_tokens", "cost"),
+)
+ROLLUPS = (USAGE_ROLLUP, MATCH_ROLLUP, TOKEN_ROLLUP)
+
+# One event: (UTC timestamp, dimension values, measure values)
+Event = Tuple[datetime, Tuple[Any, ...], Tuple[float, ...]]
+
+
+def bucket_start(when: datetime, granularity: str) -> datetime:
+    """Truncate a naive UTC datetime to the start of its bucket."""
+    if granularity == "minute":
+        return when.replace(second=0, microsecond=0)
+    if granularity == "hour":
+        return when.replace(minute=0, second=0, microsecond=0)
+    return when.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def aggregate_events(events: Iterable[Event]) -> Dict[Tuple, List[float]]:
+    """Sum events per (granularity, bucket, dimensions) so a batch needs few upserts."""
+    totals: Dict[Tuple, List[float]] = defaultdict(list)
+    for when, dims, measures in events:
+        for granularity in GRANULARITIES:
+            key = (granularity, bucket_start(when, granularity), *dims)
+            current = totals[key]
+            if not current:
+                current.extend([0] * len(measures))
+            for i, value in enumerate(measures):
+                current[i] += value
+    return totals
+
+
+def upsert_rollups(cursor, rollup: Rollup, events: Iterable[Event]) -> int:
+    """Add events to the rollup table using the caller's transaction."""
+    totals = aggregate_events(events)
+    if not totals:
+        return 0
+    key_columns = ("granularity", "bucket_start", *rollup.dimensions)
+    columns = key_columns + rollup.measures
+    updates = ", ".join(f"{m} = {rollup.table}.{m} + EXCLUDED.{m}" for m in rollup.measures)
+    cursor.executemany(
+        f"""INSERT INTO {rollup.table} ({", ".join(columns)})
+            VALUES ({", ".join(["%s"] * len(columns))})
+            ON CONFLICT ({", ".join(key_columns)}) DO UPDATE SET {updates}""",
+        [key + tuple(values) for key, values in totals.items()],
+    )
+    return len(totals)
+
+
+def read_rollup(
+    rollup: Rollup, since: datetime, until: datetime = None
+) -> Dict[Tuple[Any, ...], Dict[str, float]]:
+    """Summed measures per dimension tuple for [since, until).
+
+    Whole days come from day buckets and the leading partial day from hour
+    buckets, so the row count stays bounded by window length, not traffic.
+    """
+    until = until or datetime.utcnow()
+    hour_edge = bucket_start(since, "hour")
+    if hour_edge < since:
+        hour_edge += timedelta(hours=1)
+    day_edge = bucket_start(since, "day")
+    if day_edge < since:
+        day_edge += timedelta(days=1)
+    day_edge = max(day_edge, hour_edge)
+
+    dims = ", ".join(rollup.dimensions)
+    select_dims = f"{dims}, " if dims else ""
+    sums = ", ".join(f"COALESCE(SUM({m}), 0)" for m in rollup.measures)
+    with get_conn() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"""SELECT {select_dims}{sums}
+                    FROM {rollup.table}
+                    WHERE bucket_start < %s AND (
+                        (granularity = 'day' AND bucket_start >= %s)
+                        OR (granularity = 'hour' AND bucket_start >= %s AND bucket_start < %s)
+                    )
+                    {"GROUP BY " + dims if dims else ""}""",
+                (until, day_edge, hour_edge, day_edge),
+            )
+            rows = cursor.fetchall()
+
+    n = len(rollup.dimensions)
+    return {
+        tuple(row[:n]): {m: float(v or 0) for m, v in zip(rollup.measures, row[n:])} for row in rows
+    }
+
+
+def read_series(rollup: Rollup, granularity: str, since: datetime) -> List[Dict[str, Any]]:
+    """Per-bucket totals (summed across dimensions) from since onwards."""
+    sums = ", ".join(f"COALESCE(SUM({m}), 0)" for m in rollup.measures)
+    with get_conn() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"""SELECT bucket_start, {sums}
+                    FROM {rollup.table}
+                    WHERE granularity = %s AND bucket_start >= %s
+                    GROUP BY bucket_start
+                    ORDER BY bucket_start""",
+                (granularity, bucket_start(since, granularity)),
+            )
+            rows = cursor.fetchall()
+    return [
+        {"bucket_start": row[0].isoformat(), **dict(zip(rollup.measures, map(float, row[1:])))}
+        for row in rows
+    ]
+
+
+def run_maintenance(now: datetime = None) -> Dict[str, Any]:
+    """Roll partitions forward, drop expired ones and prune fine-grained rollups."""
+    now = now or datetime.utcnow()
+    report: Dict[str, Any] = {"partitions_created": 0, "partitions_dropped": 0, "rollup_rows": 0}
+    with get_conn() as conn:
+        with conn.cursor() as cursor:
+            for rollup in ROLLUPS:
+                cursor.execute(
+                    "SELECT analytics_ensure_partitions(%s, %s::date, %s::date)",
+                    (rollup.raw_table, now.date(), now.date() + timedelta(PARTITION_DAYS_AHEAD)),
+                )
+                report["partitions_created"] += cursor.fetchone()[0] or 0
+                cursor.execute(
+                    "SELECT analytics_drop_partitions(%s, %s)",
+                    (rollup.raw_table, RAW_RETENTION_DAYS),
+                )
+                report["partitions_dropped"] += cursor.fetchone()[0] or 0
+                for granularity, keep_days in (
+                    ("minute", MINUTE_ROLLUP_RETENTION_DAYS),
+                    ("hour", HOUR_ROLLUP_RETENTION_DAYS),
+                ):
+                    cursor.execute(
+                        f"DELETE FROM {rollup.table} WHERE granularity = %s AND bucket_start < %s",
+                        (granularity, now - timedelta(days=keep_days)),
+                    )
+                    report["rollup_rows"] += cursor.rowcount or 0
+    return report
@@ -0,0 +1,214 @@
+"""
+Async storage layer for Mosaic 2.0
+Mirrors the session functions in storage.py on top of an asyncpg pool so request
+handlers can await the database instead of blocking the event loop. When asyncpg
+is unavailable the same calls run the psycopg2 versions in a worker thread.
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+
+try:
+    import asyncpg
+
+    ASYNCPG_AVAILABLE = True
+except ImportError:
+    asyncpg = None
+    ASYNCPG_AVAILABLE = False
+
+from . import storage
+from .storage import (
+    SessionUnitOfWork,
+    _expiry_ts,
+    _json_dump,
+    _load_user_data,
+    activate_session,
+    deactivate_session,
+)
+
+
+# Sized apart from the psycopg2 pool (DB_POOL_MAX), which every worker also holds
+ASYNC_DB_POOL_MIN = int(os.getenv("ASYNC_DB_POOL_MIN", "1"))
+ASYNC_DB_POOL_MAX = int(os.getenv("ASYNC_DB_POOL_MAX", "5"))
+
+# One asyncpg pool per event loop (gunicorn/uvicorn workers each run their own)
+_POOLS: Dict[int, Any] = {}
+_POOL_LOCKS: Dict[int, asyncio.Lock] = {}
+
+_UPSERT_SESSION_SQL = """
+    INSERT INTO sessions (id, expires_at, user_data)
+    VALUES ($1, $2::timestamp, '{}'::jsonb)
+    ON CONFLICT (id) DO UPDATE SET expires_at = EXCLUDED.expires_at
+    RETURNING user_data
+"""
+_LATEST_METRICS_SQL = (
+    "SELECT metrics FROM wimd_outputs WHERE session_id = $1 ORDER BY created_at DESC LIMIT 1"
+)
+_INSERT_OUTPUT_SQL = """
+    INSERT INTO wimd_outputs (session_id, prompt, response, analysis_data, metrics)
+    VALUES ($1, $2, $3, $4::jsonb, $5::jsonb)
+"""
+
+
+async def get_pool():
+    """Return the asyncpg pool for the running loop, or None to use the thread fallback."""
+    database_url = os.getenv("DATABASE_URL")
+    if not ASYNCPG_AVAILABLE or not database_url:
+        return None
+
+    loop_id = id(asyncio.get_running_loop())
+    pool = _POOLS.get(loop_id)
+    if pool is not None:
+        return pool
+    lock = _POOL_LOCKS.setdefault(loop_id, asyncio.Lock())
+    async with lock:
+        if loop_id not in _POOLS:
+            _POOLS[loop_id] = await asyncpg.create_pool(
+                database_url, min_size=ASYNC_DB_POOL_MIN, max_size=ASYNC_DB_POOL_MAX
+            )
+        return _POOLS[loop_id]
+
+
+async def close_pool() -> None:
+    """Close the pool owned by the running loop (called on shutdown)."""
+    pool = _POOLS.pop(id(asyncio.get_running_loop()), None)
+    if pool is not None:
+        await pool.close()
+
+
+async def load_session(uow: SessionUnitOfWork) -> SessionUnitOfWork:
+    """Async equivalent of SessionUnitOfWork.load()."""
+    pool = await get_pool()
+    if pool is None:
+        return await asyncio.to_thread(uow.load)
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            user_data = await conn.fetchval(_UPSERT_SESSION_SQL, uow.session_id, _expiry_ts())
+            metrics = await conn.fetchval(_LATEST_METRICS_SQL, uow.session_id)
+    return uow.loaded(user_data, metrics)
+
+
+async def flush_session(uow: SessionUnitOfWork) -> None:
+    """Async equivalent of SessionUnitOfWork.flush()."""
+    if not uow.dirty and not uow.pending_outputs:
+        return
+    pool = await get_pool()
+    if pool is None:
+        await asyncio.to_thread(uow.flush)
+        return
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            if uow.dirty:
+                current = await conn.fetchval(
+                    "SELECT user_data FROM sessions WHERE id = $1 FOR UPDATE", uow.session_id
+                )
+                await conn.execute(
+                    "UPDATE sessions SET user_data = $1::jsonb WHERE id = $2",
+                    _json_dump(uow.merge_into(current)),
+                    uow.session_id,
+                )
+            if uow.pending_outputs:
+                await conn.executemany(_INSERT_OUTPUT_SQL, uow.pending_outputs)
+    uow.flushed()
+
+
+@asynccontextmanager
+async def session_unit_of_work(session_id: Optional[str] = None):
+    """Async version of storage.session_unit_of_work.
+
+    The unit of work is registered in the same context variable the sync storage
+    functions consult, so code run via a context-copying threadpool sees it too.
+    """
+    uow = await load_session(SessionUnitOfWork(session_id))
+    token = activate_session(uow)
+    try:
+        yield uow
+        await flush_session(uow)
+    finally:
+        deactivate_session(token)
+
+
+async def get_session_data(session_id: str) -> Dict[str, Any]:
+    """Get session user_data JSON field."""
+    uow = storage._active_session(session_id)
+    if uow is not None:
+        return uow.get_data()
+    pool = await get_pool()
+    if pool is None:
+        return await asyncio.to_thread(storage.get_session_data, session_id)
+    async with pool.acquire() as conn:
+        raw = await conn.fetchval("SELECT user_data FROM sessions WHERE id = $1", session_id)
+    return _load_user_data(raw)
+
+
+async def update_session_data(session_id: str, data: Dict[str, Any]) -> None:
+    """Update session user_data JSON field."""
+    uow = storage._active_session(session_id)
+    if uow is not None:
+        uow.set_data(data)
+        return
+    pool = await get_pool()
+    if pool is None:
+        await asyncio.to_thread(storage.update_session_data, session_id, data)
+        return
+    async with pool.acquire() as conn:
+        await conn.execute(
+            "UPDATE sessions SET user_data = $1::jsonb WHERE id = $2", _json_dump(data), session_id
+        )
+
+
+async def record_wimd_output(
+    session_id: str,
+    prompt: str,
+    response: str,
+    analysis_data: Optional[Dict[str, Any]] = None,
+    metrics: Optional[Dict[str, Any]] = None,
+) -> None:
+    uow = storage._active_session(session_id)
+    if uow is not None:
+        uow.add_output(prompt, response, analysis_data, metrics)
+        return
+    pool = await get_pool()
+    if pool is None:
+        await asyncio.to_thread(
+            storage.record_wimd_output, session_id, prompt, response, analysis_data, metrics
+        )
+        return
+    async with pool.acquire() as conn:
+        await conn.execute(
+            _INSERT_OUTPUT_SQL,
+            session_id,
+            prompt,
+            response,
+            _json_dump(analysis_data or {}),
+            _json_dump(metrics or {}),
+        )
+
+
+async def latest_metrics(session_id: str) -> Optional[Dict[str, Any]]:
+    uow = storage._active_session(session_id)
+    if uow is not None:
+        return uow.metrics
+    pool = await get_pool()
+    if pool is None:
+        return await asyncio.to_thread(storage.latest_metrics, session_id)
+    async with pool.acquire() as conn:
+        raw = await conn.fetchval(_LATEST_METRICS_SQL, session_id)
+    return _load_user_data(raw) or None
+
+
+async def get_pool_stats() -> Dict[str, Any]:
+    """Get asyncpg pool statistics for the running loop."""
+    pool = _POOLS.get(id(asyncio.get_running_loop()))
+    if pool is None:
+        return {"initialized": False, "asyncpg_available": ASYNCPG_AVAILABLE}
+    return {
+        "initialized": True,
+        "size": pool.get_size(),
+        "idle": pool.get_idle_size(),
+        "min": pool.get_min_size(),
+        "max": pool.get_max_size(),
+    }
@@ -10,6 +10,11 @@ from typing import Any, Dict
 
 from .rag_engine import rag_engine
 from .storage import get_conn
+from .vector_codec import encode_float32, quantize_int8
+
+
+# Documents embedded and stored per round trip during reindex
+REINDEX_CHUNK_SIZE = 2000
 
 
 def reindex_corpus() -> Dict[str, Any]:
@@ -27,38 +32,46 @@ def reindex_corpus() -> Dict[str, Any]:
     try:
         # Get all existing embeddings
         with get_conn() as conn:
-            rows = conn.execute(
-                "SELECT text_hash, text, metadata FROM embeddings ORDER BY created_at DESC"
-            ).fetchall()
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT text_hash, text, metadata FROM embeddings ORDER BY created_at DESC"
+                )
+                rows = cursor.fetchall()
 
         results["total_documents"] = len(rows)
 
         print(f"Starting corpus reindex: {len(rows)} documents")
 
-        for i, (text_hash, text, metadata) in enumerate(rows):
+        # Embed in chunks: each chunk becomes a few concurrent batched API calls
+        for start in range(0, len(rows), REINDEX_CHUNK_SIZE):
+            chunk = rows[start : start + REINDEX_CHUNK_SIZE]
             try:
-                # Compute new embedding
-                embedding_result = rag_engine.compute_embedding(text)
-
-                if embedding_result:
-                    # Update with new embedding
-                    rag_engine.store_embedding(
-                        embedding_result, json.loads(metadata) if metadata else {}
-                    )
-                    results["successful_embeddings"] += 1
-
-                    if (i + 1) % 10 == 0:
-                        print(f"Processed {i + 1}/{len(rows)} documents")
-                else:
-                    results["failed_embeddings"] += 1
-                    results["errors"].append(f"Failed to embed document {i + 1}")
-
-                # Rate limiting
-                time.sleep(0.1)
+                embedding_results = rag_engine.batch_compute_embeddings(
+                    [text for _, text, _ in chunk]
+                )
+                by_hash = {result.hash: result for result in embedding_results}
+
+                items = []
+                for i, (text_hash, text, metadata) in enumerate(chunk, start=start + 1):
+                    embedding_result = by_hash.get(rag_engine._get_text_hash(text))
+                    if embedding_result:
+                        items.append((embedding_result, json.loads(metadata) if metadata else {}))
+                    else:
+                        results["failed_embeddings"] += 1
+                        results["errors"].append(f"Failed to embed document {i}")
+
+                # Update with new embeddings
+                stored = rag_engine.store_embeddings(items)
+                results["successful_embeddings"] += stored
+                results["failed_embeddings"] += len(items) - stored
+
+                print(f"Processed {start + len(chunk)}/{len(rows)} documents")
 
             except Exception as e:
-                results["failed_embeddings"] += 1
-                results["errors"].append(f"Error processing document {i + 1}: {e!s}")
+                results["failed_embeddings"] += len(chunk)
+                results["errors"].append(
+                    f"Error processing documents {start + 1}-{start + len(chunk)}: {e!s}"
+                )
 
         results["processing_time"] = time.time() - start_time
         results["end_time"] = datetime.utcnow().isoformat()
@@ -74,21 +87,82 @@ def reindex_corpus() -> Dict[str, Any]:
     return results
 
 
+def migrate_embeddings_to_binary(batch_size: int = 500) -> Dict[str, Any]:
+    """One-shot conversion of legacy JSON embeddings to float32 bytea."""
+    start_time = time.time()
+    results = {"converted": 0, "failed": 0, "errors": [], "processing_time": 0}
+    store_int8 = rag_engine.store_int8_copy
+    failed_hashes = set()
+
+    try:
+        while True:
+            with get_conn() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        """SELECT text_hash, embedding FROM embeddings
+                           WHERE embedding_vec IS NULL AND embedding IS NOT NULL
+                           AND NOT (text_hash = ANY(%s))
+                           LIMIT %s""",
+                        (list(failed_hashes), batch_size),
+                    )
+                    rows = cursor.fetchall()
+                    if not rows:
+                        break
+
+                    updates = []
+                    for text_hash, embedding in rows:
+                        try:
+                            vector = json.loads(embedding)
+                            q8, q8_scale = quantize_int8(vector) if store_int8 else (None, None)
+                            updates.append(
+                                (encode_float32(vector), len(vector), q8, q8_scale, text_hash)
+                            )
+                        except Exception as e:
+                            failed_hashes.add(text_hash)
+                            results["failed"] += 1
+                            results["errors"].append(f"Error converting {text_hash[:12]}: {e!s}")
+
+                    # Dropping the JSON copy is what reclaims the space
+                    cursor.executemany(
+                        """UPDATE embeddings
+                           SET embedding_vec = %s, embedding_dim = %s,
+                               embedding_q8 = %s, embedding_q8_scale = %s, embedding = NULL
+                           WHERE text_hash = %s""",
+                        updates,
+                    )
+            results["converted"] += len(updates)
+            print(f"Converted {results['converted']} embeddings to binary")
+
+    except Exception as e:
+        results["errors"].append(f"Fatal error during binary migration: {e!s}")
+
+    results["processing_time"] = time.time() - start_time
+    return results
+
+
 def get_reindex_status() -> Dict[str, Any]:
     """Get current reindex status."""
     try:
         with get_conn() as conn:
-            # Count total embeddings
-            total_count = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            with conn.cursor() as cursor:
+                # Count total embeddings
+                cursor.execute("SELECT COUNT(*) FROM embeddings")
+                total_count = cursor.fetchone()[0]
 
-            # Count recent embeddings (last 24 hours)
-            recent_count = conn.execute(
-                "SELECT COUNT(*) FROM embeddings WHERE created_at > datetime('now', '-1 day')"
-            ).fetchone()[0]
+                # Count recent embeddings (last 24 hours)
+                cursor.execute(
+                    "SELECT COUNT(*) FROM embeddings WHERE created_at > NOW() - INTERVAL '1 day'"
+                )
+                recent_count = cursor.fetchone()[0]
+
+                # Rows still stored as JSON text
+                cursor.execute("SELECT COUNT(*) FROM embeddings WHERE embedding_vec IS NULL")
+                legacy_count = cursor.fetchone()[0]
 
             return {
                 "total_embeddings": total_count,
                 "recent_embeddings": recent_count,
+                "legacy_json_embeddings": legacy_count,
                 "status": "operational",
             }
     except Exception as e:
@@ -96,6 +170,11 @@ def get_reindex_status() -> Dict[str, Any]:
 
 
 if __name__ == "__main__":
-    # Run reindex
-    results = reindex_corpus()
+    import sys
+
+    if "--migrate-binary" in sys.argv:
+        results = migrate_embeddings_to_binary()
+    else:
+        # Run reindex
+        results = reindex_corpus()
     print(json.dumps(results, indent=2))
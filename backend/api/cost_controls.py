@@ -1,15 +1,30 @@
 """
 Cost Controls and Resource Management for Mosaic 2.0
 Prevents runaway costs and resource exhaustion.
+
+Limit checks read in-memory usage counters. The counters are seeded from
+usage_tracking once, written back in batches by a background thread, and
+periodically re-synced so every worker sees usage recorded by the others.
 """
 
+import atexit
+import os
+import threading
+import time
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Any, Dict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
 
+from .analytics_store import USAGE_ROLLUP, read_series, upsert_rollups
 from .storage import get_conn
 
 
+USAGE_FLUSH_INTERVAL_SECONDS = float(os.getenv("USAGE_FLUSH_INTERVAL_SECONDS", "2"))
+USAGE_FLUSH_BATCH_SIZE = int(os.getenv("USAGE_FLUSH_BATCH_SIZE", "100"))
+USAGE_SYNC_SECONDS = float(os.getenv("USAGE_SYNC_SECONDS", "60"))  # 0 disables re-sync
+USAGE_MAX_PENDING = 10000
+
+
 @dataclass
 class CostLimit:
     """Cost limit configuration"""
@@ -22,25 +37,163 @@ class CostLimit:
 
 @dataclass
 class ResourceLimit:
-    """Resource limit configuration"""
-
-    max_requests_per_minute: int = 60
-    max_requests_per_hour: int = 1000
-    max_requests_per_day: int = 10000
-    max_embedding_requests: int = 100  # Per day
-    max_job_search_requests: int = 500  # Per day
+    """Resource limit configuration; a limit of 0 disables that check"""
+
+    max_requests_per_minute: int = int(os.getenv("RESOURCE_MAX_REQUESTS_PER_MINUTE", "60"))
+    max_requests_per_hour: int = int(os.getenv("RESOURCE_MAX_REQUESTS_PER_HOUR", "1000"))
+    max_requests_per_day: int = int(os.getenv("RESOURCE_MAX_REQUESTS_PER_DAY", "10000"))
+    # Per day; only billable calls count, cache and local index hits don't
+    max_embedding_requests: int = int(os.getenv("RESOURCE_MAX_EMBEDDING_REQUESTS", "100"))
+    max_job_search_requests: int = int(os.getenv("RESOURCE_MAX_JOB_SEARCH_REQUESTS", "500"))
     max_concurrent_requests: int = 10
 
 
+def _over_limit(current: int, limit: int) -> bool:
+    return limit > 0 and current >= limit
+
+
+class SlidingWindowCounter:
+    """Ring buffer of per-bucket request counts and costs over a trailing window."""
+
+    def __init__(self, window_seconds: int, buckets: int):
+        self.bucket_seconds = window_seconds / buckets
+        self.counts = [0] * buckets
+        self.costs = [0.0] * buckets
+        self.count = 0
+        self.cost = 0.0
+        self._head: Optional[int] = None
+
+    def _advance(self, now: float) -> int:
+        """Move the window to now, expiring buckets that fell out of it."""
+        bucket = int(now // self.bucket_seconds)
+        if self._head is None:
+            self._head = bucket
+        elif bucket > self._head:
+            size = len(self.counts)
+            for b in range(max(self._head + 1, bucket - size + 1), bucket + 1):
+                i = b % size
+                self.count -= self.counts[i]
+                self.cost -= self.costs[i]
+                self.counts[i] = 0
+                self.costs[i] = 0.0
+            self._head = bucket
+        return bucket
+
+    def add(self, when: float, now: float, count: int = 1, cost: float = 0.0):
+        head = self._advance(now)
+        bucket = int(when // self.bucket_seconds)
+        if bucket > head or bucket <= head - len(self.counts):
+            return
+        i = bucket % len(self.counts)
+        self.counts[i] += count
+        self.costs[i] += cost
+        self.count += count
+        self.cost += cost
+
+    def total(self, now: float) -> Tuple[int, float]:
+        self._advance(now)
+        return self.count, max(0.0, self.cost)
+
+
+class PeriodCounter:
+    """Request counts and costs for the current UTC calendar period."""
+
+    def __init__(self, period_format: str):
+        self.period_format = period_format
+        self.period: Optional[str] = None
+        self.count = 0
+        self.cost = 0.0
+        self.by_operation: Dict[str, int] = {}
+
+    def _roll(self, now: datetime):
+        period = now.strftime(self.period_format)
+        if period != self.period:
+            self.period = period
+            self.count = 0
+            self.cost = 0.0
+            self.by_operation = {}
+
+    def add(self, when: datetime, now: datetime, operation: str, count: int = 1, cost: float = 0.0):
+        self._roll(now)
+        if when.strftime(self.period_format) != self.period:
+            return
+        self.count += count
+        self.cost += cost
+        self.by_operation[operation] = self.by_operation.get(operation, 0) + count
+
+    def totals(self, now: datetime) -> "PeriodCounter":
+        self._roll(now)
+        return self
+
+
+class UsageCounters:
+    """All windows the limit checks need, updated in O(1) per request."""
+
+    def __init__(self):
+        self.minute = SlidingWindowCounter(60, 60)
+        self.hour = SlidingWindowCounter(3600, 60)
+        self.day = PeriodCounter("%Y-%m-%d")
+        self.month = PeriodCounter("%Y-%m")
+
+    def add_window(self, when: float, now: float, count: int = 1, cost: float = 0.0):
+        self.minute.add(when, now, count, cost)
+        self.hour.add(when, now, count, cost)
+
+    def add_period(
+        self, when: datetime, now: datetime, operation: str, count: int = 1, cost: float = 0.0
+    ):
+        self.day.add(when, now, operation, count, cost)
+        self.month.add(when, now, operation, count, cost)
+
+    def record(self, now: float, operation: str, cost: float = 0.0):
+        self.add_window(now, now, 1, cost)
+        now_dt = _utc(now)
+        self.add_period(now_dt, now_dt, operation, 1, cost)
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        now_dt = _utc(now)
+        day = self.day.totals(now_dt)
+        return {
+            "requests_today": day.count,
+            "embedding_requests_today": day.by_operation.get("embedding", 0),
+            "job_search_requests_today": day.by_operation.get("job_search", 0),
+            "daily_cost": round(day.cost, 6),
+            "requests_this_hour": self.hour.total(now)[0],
+            "requests_this_minute": self.minute.total(now)[0],
+            "monthly_cost": round(self.month.totals(now_dt).cost, 6),
+        }
+
+
+def _utc(ts: float) -> datetime:
+    """Naive UTC datetime, matching how usage_tracking.created_at is stored."""
+    return datetime.fromtimestamp(ts, tz=timezone.utc).replace(tzinfo=None)
+
+
 class CostController:
     """Manages costs and resource usage to prevent runaway expenses."""
 
-    def __init__(self):
+    def __init__(self, background: bool = True):
         self.cost_limits = CostLimit()
         self.resource_limits = ResourceLimit()
         self.usage_tracking = {}
         self.emergency_stop = False
 
+        self.background = background
+        self.clock = time.time
+        self._lock = threading.Lock()
+        self._counters = UsageCounters()
+        self._seeded = False
+        self._last_sync = 0.0
+        # Rows waiting to be written to usage_tracking, tagged with a sequence number
+        self._pending: List[Tuple[int, str, float, bool, datetime]] = []
+        self._seq = 0
+        self._flush_event = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_pid: Optional[int] = None
+        self.flushed_rows = 0
+        self.flush_errors = 0
+        self.dropped_rows = 0
+
     def check_cost_limits(self, operation: str, estimated_cost: float = 0.0) -> Dict[str, Any]:
         """Check if operation is within cost limits."""
         try:
@@ -93,9 +246,8 @@ class CostController:
             current_usage = self._get_current_usage()
 
             # Check per-minute limit
-            if (
-                current_usage["requests_this_minute"]
-                >= self.resource_limits.max_requests_per_minute
+            if _over_limit(
+                current_usage["requests_this_minute"], self.resource_limits.max_requests_per_minute
             ):
                 return {
                     "allowed": False,
@@ -105,7 +257,9 @@ class CostController:
                 }
 
             # Check per-hour limit
-            if current_usage["requests_this_hour"] >= self.resource_limits.max_requests_per_hour:
+            if _over_limit(
+                current_usage["requests_this_hour"], self.resource_limits.max_requests_per_hour
+            ):
                 return {
                     "allowed": False,
                     "reason": "Rate limit exceeded (per hour)",
@@ -114,7 +268,9 @@ class CostController:
                 }
 
             # Check per-day limit
-            if current_usage["requests_today"] >= self.resource_limits.max_requests_per_day:
+            if _over_limit(
+                current_usage["requests_today"], self.resource_limits.max_requests_per_day
+            ):
                 return {
                     "allowed": False,
                     "reason": "Daily request limit exceeded",
@@ -123,10 +279,9 @@ class CostController:
                 }
 
             # Check operation-specific limits
-            if (
-                operation == "embedding"
-                and current_usage["embedding_requests_today"]
-                >= self.resource_limits.max_embedding_requests
+            if operation == "embedding" and _over_limit(
+                current_usage["embedding_requests_today"],
+                self.resource_limits.max_embedding_requests,
             ):
                 return {
                     "allowed": False,
@@ -135,10 +290,9 @@ class CostController:
                     "limit": self.resource_limits.max_embedding_requests,
                 }
 
-            if (
-                operation == "job_search"
-                and current_usage["job_search_requests_today"]
-                >= self.resource_limits.max_job_search_requests
+            if operation == "job_search" and _over_limit(
+                current_usage["job_search_requests_today"],
+                self.resource_limits.max_job_search_requests,
             ):
                 return {
                     "allowed": False,
@@ -159,76 +313,165 @@ class CostController:
             return {"allowed": False, "reason": "Error checking limits", "error": str(e)}
 
     def _get_current_usage(self) -> Dict[str, Any]:
-        """Get current usage statistics."""
-        try:
-            with get_conn() as conn:
-                # Get daily usage
-                daily_usage = conn.execute(
-                    """SELECT
-                        COUNT(*) as requests_today,
-                        SUM(CASE WHEN operation = 'embedding' THEN 1 ELSE 0 END) as embedding_requests_today,
-                        SUM(CASE WHEN operation = 'job_search' THEN 1 ELSE 0 END) as job_search_requests_today,
-                        SUM(estimated_cost) as daily_cost
-                       FROM usage_tracking
-                       WHERE DATE(created_at) = DATE('now')"""
-                ).fetchone()
-
-                # Get hourly usage
-                hourly_usage = conn.execute(
-                    """SELECT COUNT(*) as requests_this_hour
-                       FROM usage_tracking
-                       WHERE created_at >= datetime('now', '-1 hour')"""
-                ).fetchone()
-
-                # Get minute usage
-                minute_usage = conn.execute(
-                    """SELECT COUNT(*) as requests_this_minute
+        """Get current usage statistics from the in-memory counters."""
+        self._ensure_seeded()
+        with self._lock:
+            return self._counters.snapshot(self.clock())
+
+    def _load_counters(self, now: float) -> UsageCounters:
+        """Build counters from usage_tracking (month-to-date plus the last hour)."""
+        counters = UsageCounters()
+        now_dt = _utc(now)
+        with get_conn() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """SELECT DATE(created_at), operation, COUNT(*),
+                              COALESCE(SUM(estimated_cost), 0)
                        FROM usage_tracking
-                       WHERE created_at >= datetime('now', '-1 minute')"""
-                ).fetchone()
+                       WHERE created_at >= date_trunc('month', %s::timestamp)
+                       GROUP BY 1, 2""",
+                    (now_dt,),
+                )
+                for day, operation, count, cost in cursor.fetchall():
+                    when = datetime(day.year, day.month, day.day)
+                    counters.add_period(when, now_dt, operation, int(count), float(cost))
 
-                # Get monthly usage
-                monthly_usage = conn.execute(
-                    """SELECT SUM(estimated_cost) as monthly_cost
+                cursor.execute(
+                    """SELECT EXTRACT(EPOCH FROM date_trunc('second', created_at)), COUNT(*),
+                              COALESCE(SUM(estimated_cost), 0)
                        FROM usage_tracking
-                       WHERE DATE(created_at) >= DATE('now', 'start of month')"""
-                ).fetchone()
-
-                return {
-                    "requests_today": daily_usage[0] or 0,
-                    "embedding_requests_today": daily_usage[1] or 0,
-                    "job_search_requests_today": daily_usage[2] or 0,
-                    "daily_cost": daily_usage[3] or 0.0,
-                    "requests_this_hour": hourly_usage[0] or 0,
-                    "requests_this_minute": minute_usage[0] or 0,
-                    "monthly_cost": monthly_usage[0] or 0.0,
-                }
-
+                       WHERE created_at >= %s::timestamp - INTERVAL '1 hour'
+                       GROUP BY 1""",
+                    (now_dt,),
+                )
+                for epoch, count, cost in cursor.fetchall():
+                    counters.add_window(float(epoch), now, int(count), float(cost))
+        return counters
+
+    def _ensure_seeded(self):
+        """Seed counters from the database on first use."""
+        if self._seeded:
+            return
+        with self._lock:
+            if self._seeded:
+                return
+            self._seeded = True
+        self._sync()
+
+    def _sync(self):
+        """Replace local counters with database totals plus unflushed local usage."""
+        now = self.clock()
+        try:
+            counters = self._load_counters(now)
         except Exception as e:
-            print(f"Error getting current usage: {e}")
-            return {
-                "requests_today": 0,
-                "embedding_requests_today": 0,
-                "job_search_requests_today": 0,
-                "daily_cost": 0.0,
-                "requests_this_hour": 0,
-                "requests_this_minute": 0,
-                "monthly_cost": 0.0,
-            }
+            print(f"Error loading usage counters: {e}")
+            return
+        with self._lock:
+            # Anything not yet written is missing from the DB totals; replay it
+            for seq, operation, cost, _, created_at in self._pending:
+                ts = created_at.replace(tzinfo=timezone.utc).timestamp()
+                counters.add_window(ts, now, 1, cost)
+                counters.add_period(created_at, _utc(now), operation, 1, cost)
+            self._counters = counters
+            self._last_sync = now
+
+    def _ensure_worker(self):
+        """Start the background flush thread in this process."""
+        pid = os.getpid()
+        if self._worker is not None and self._worker_pid == pid and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker_pid == pid and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(
+                target=self._run_worker, name="usage-flush", daemon=True
+            )
+            self._worker_pid = pid
+            self._worker.start()
+
+    def _run_worker(self):
+        while True:
+            self._flush_event.wait(USAGE_FLUSH_INTERVAL_SECONDS)
+            self._flush_event.clear()
+            self.flush()
+            if USAGE_SYNC_SECONDS and self.clock() - self._last_sync >= USAGE_SYNC_SECONDS:
+                self._sync()
+
+    def flush(self) -> int:
+        """Write pending usage rows to usage_tracking in one batch."""
+        with self._lock:
+            batch = list(self._pending)
+        if not batch:
+            return 0
+        try:
+            with get_conn() as conn:
+                with conn.cursor() as cursor:
+                    cursor.executemany(
+                        """INSERT INTO usage_tracking
+                           (operation, estimated_cost, success, created_at)
+                           VALUES (%s, %s, %s, %s)""",
+                        [row[1:] for row in batch],
+                    )
+                    upsert_rollups(
+                        cursor,
+                        USAGE_ROLLUP,
+                        [
+                            (created_at, (operation,), (1, int(success), cost))
+                            for _, operation, cost, success, created_at in batch
+                        ],
+                    )
+        except Exception as e:
+            self.flush_errors += 1
+            print(f"Error recording usage: {e}")
+            return 0
+        with self._lock:
+            last_seq = batch[-1][0]
+            self._pending = [row for row in self._pending if row[0] > last_seq]
+            self.flushed_rows += len(batch)
+        return len(batch)
 
     def record_usage(self, operation: str, estimated_cost: float = 0.0, success: bool = True):
         """Record usage for tracking and cost control."""
         try:
-            with get_conn() as conn:
-                conn.execute(
-                    """INSERT INTO usage_tracking
-                       (operation, estimated_cost, success, created_at)
-                       VALUES (?, ?, ?, ?)""",
-                    (operation, estimated_cost, success, datetime.utcnow().isoformat()),
-                )
+            self._ensure_seeded()
+            now = self.clock()
+            with self._lock:
+                self._counters.record(now, operation, estimated_cost)
+                self._seq += 1
+                self._pending.append((self._seq, operation, estimated_cost, success, _utc(now)))
+                if len(self._pending) > USAGE_MAX_PENDING:
+                    # DB unreachable for a long time: keep counting, drop the oldest rows
+                    overflow = len(self._pending) - USAGE_MAX_PENDING
+                    del self._pending[:overflow]
+                    self.dropped_rows += overflow
+                pending = len(self._pending)
+            if self.background:
+                self._ensure_worker()
+                if pending >= USAGE_FLUSH_BATCH_SIZE:
+                    self._flush_event.set()
         except Exception as e:
             print(f"Error recording usage: {e}")
 
+    def get_counter_stats(self) -> Dict[str, Any]:
+        """Usage counter health for monitoring."""
+        with self._lock:
+            return {
+                "seeded": self._seeded,
+                "pending_rows": len(self._pending),
+                "flushed_rows": self.flushed_rows,
+                "flush_errors": self.flush_errors,
+                "dropped_rows": self.dropped_rows,
+                "last_sync": self._last_sync,
+            }
+
+    def get_usage_history(self, days: int = 7) -> List[Dict[str, Any]]:
+        """Daily request and cost totals from the usage rollup."""
+        try:
+            return read_series(USAGE_ROLLUP, "day", datetime.utcnow() - timedelta(days=days))
+        except Exception as e:
+            print(f"Error reading usage history: {e}")
+            return []
+
     def get_usage_analytics(self) -> Dict[str, Any]:
         """Get usage analytics for monitoring."""
         try:
@@ -246,6 +489,8 @@ class CostController:
                     "max_requests_per_day": self.resource_limits.max_requests_per_day,
                 },
                 "current_usage": current_usage,
+                "counters": self.get_counter_stats(),
+                "daily_history": self.get_usage_history(),
                 "emergency_stop": self.emergency_stop,
                 "status": "operational" if not self.emergency_stop else "emergency_stop",
             }
@@ -256,6 +501,7 @@ class CostController:
 
 # Global cost controller instance
 cost_controller = CostController()
+atexit.register(cost_controller.flush)
 
 
 def check_cost_limits(operation: str, estimated_cost: float = 0.0) -> Dict[str, Any]:
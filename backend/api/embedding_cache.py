@@ -0,0 +1,195 @@
+"""
+Two-tier embedding cache for Mosaic 2.0
+Tier one is a bounded in-process LRU; tier two is the Postgres embedding_cache
+table keyed by (model, text_hash), which survives restarts and is shared by
+every worker.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from .caching import LRUTTLCache
+from .storage import get_conn
+from .vector_codec import decode_float32, encode_float32
+
+
+DEFAULT_MODEL = "text-embedding-3-small"
+# Persistent rows are pruned by age and, beyond the row cap, oldest first
+PERSIST_TTL_DAYS = int(os.getenv("EMBEDDING_CACHE_PERSIST_TTL_DAYS", "30"))
+PERSIST_MAX_ROWS = int(os.getenv("EMBEDDING_CACHE_PERSIST_MAX_ROWS", "500000"))
+
+
+def text_hash(text: str) -> str:
+    """Hash used as the cache key for a text."""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class EmbeddingCache:
+    """Memory LRU in front of a persistent Postgres embedding store."""
+
+    def __init__(self):
+        self.memory = LRUTTLCache(
+            max_items=int(os.getenv("EMBEDDING_CACHE_MAX_ITEMS", "20000")),
+            max_bytes=int(os.getenv("EMBEDDING_CACHE_MAX_MB", "64")) * 1024 * 1024,
+            ttl_seconds=24 * 60 * 60,
+        )
+        self.persistent_enabled = os.getenv("EMBEDDING_CACHE_PERSIST", "true").lower() in (
+            "1",
+            "true",
+            "yes",
+            "on",
+        )
+        # Back off from the persistent tier for a while after a DB error
+        self.persistent_retry_seconds = 60
+        self._persistent_down_until = 0.0
+        self._lock = threading.Lock()
+
+        self.persistent_hits = 0
+        self.persistent_misses = 0
+        self.persistent_writes = 0
+        self.persistent_errors = 0
+        self.persistent_pruned = 0
+
+    def _persistent_available(self) -> bool:
+        return self.persistent_enabled and time.time() >= self._persistent_down_until
+
+    def _persistent_failed(self, e: Exception):
+        with self._lock:
+            self.persistent_errors += 1
+            self._persistent_down_until = time.time() + self.persistent_retry_seconds
+        print(f"⚠️ Embedding cache persistent tier unavailable: {e}")
+
+    def get_many(self, hashes: List[str], model: str = DEFAULT_MODEL) -> Dict[str, np.ndarray]:
+        """Look up embeddings by text hash; returns only the hashes that were found."""
+        found: Dict[str, np.ndarray] = {}
+        missing = []
+        for h in dict.fromkeys(hashes):
+            vector = self.memory.get((model, h))
+            if vector is not None:
+                found[h] = vector
+            else:
+                missing.append(h)
+
+        if missing and self._persistent_available():
+            try:
+                with get_conn() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute(
+                            """SELECT text_hash, embedding FROM embedding_cache
+                               WHERE model = %s AND text_hash = ANY(%s)""",
+                            (model, missing),
+                        )
+                        rows = cursor.fetchall()
+                for h, embedding in rows:
+                    vector = decode_float32(embedding)
+                    found[h] = vector
+                    self.memory.set((model, h), vector)
+                with self._lock:
+                    self.persistent_hits += len(rows)
+                    self.persistent_misses += len(missing) - len(rows)
+            except Exception as e:
+                self._persistent_failed(e)
+
+        return found
+
+    def get(self, h: str, model: str = DEFAULT_MODEL) -> Optional[np.ndarray]:
+        """Look up one embedding by text hash."""
+        return self.get_many([h], model).get(h)
+
+    def put_many(self, items: Dict[str, List[float]], model: str = DEFAULT_MODEL):
+        """Store embeddings in both tiers."""
+        if not items:
+            return
+        rows = []
+        for h, embedding in items.items():
+            vector = np.asarray(embedding, dtype=np.float32)
+            self.memory.set((model, h), vector)
+            rows.append((model, h, encode_float32(vector)))
+
+        if not self._persistent_available():
+            return
+        try:
+            with get_conn() as conn:
+                with conn.cursor() as cursor:
+                    cursor.executemany(
+                        """INSERT INTO embedding_cache (model, text_hash, embedding)
+                           VALUES (%s, %s, %s)
+                           ON CONFLICT (model, text_hash) DO NOTHING""",
+                        rows,
+                    )
+            with self._lock:
+                self.persistent_writes += len(rows)
+        except Exception as e:
+            self._persistent_failed(e)
+
+    def put(self, h: str, embedding: List[float], model: str = DEFAULT_MODEL):
+        """Store one embedding in both tiers."""
+        self.put_many({h: embedding}, model)
+
+    def prune(self, batch_size: int = 1000) -> int:
+        """Delete one batch of persistent rows past the TTL or the row cap; returns the count."""
+        with get_conn() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """DELETE FROM embedding_cache WHERE (model, text_hash) IN (
+                           SELECT model, text_hash FROM embedding_cache
+                           WHERE created_at < GREATEST(
+                               NOW() - make_interval(days => %s),
+                               (SELECT created_at FROM embedding_cache
+                                ORDER BY created_at DESC OFFSET %s LIMIT 1)
+                           )
+                           ORDER BY created_at LIMIT %s
+                       )""",
+                    (PERSIST_TTL_DAYS, PERSIST_MAX_ROWS, batch_size),
+                )
+                deleted = cursor.rowcount or 0
+        with self._lock:
+            self.persistent_pruned += deleted
+        return deleted
+
+    def get_stats(self) -> Dict[str, object]:
+        """Get hit/miss/eviction counters for both tiers."""
+        return {
+            "memory": self.memory.get_stats(),
+            "persistent": {
+                "enabled": self.persistent_enabled,
+                "available": self._persistent_available(),
+                "hits": self.persistent_hits,
+                "misses": self.persistent_misses,
+                "writes": self.persistent_writes,
+                "errors": self.persistent_errors,
+                "pruned": self.persistent_pruned,
+                "ttl_days": PERSIST_TTL_DAYS,
+                "max_rows": PERSIST_MAX_ROWS,
+            },
+        }
+
+
+# Global embedding cache shared by the RAG engine and the chat endpoints
+embedding_cache = EmbeddingCache()
+
+
+def get_cached_embedding(
+    text: str,
+    embed_fn: Callable[[str], List[float]],
+    model: str = DEFAULT_MODEL,
+) -> List[float]:
+    """Return the cached embedding for text, computing and caching it on a miss."""
+    h = text_hash(text)
+    vector = embedding_cache.get(h, model)
+    if vector is not None:
+        return vector.tolist()
+    embedding = embed_fn(text)
+    if embedding:
+        embedding_cache.put(h, embedding, model)
+    return embedding
+
+
+def get_embedding_cache_stats() -> Dict[str, object]:
+    """Get embedding cache statistics."""
+    return embedding_cache.get_stats()
@@ -10,6 +10,7 @@ from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
+from .feature_flags import feature_flags
 from .settings import get_settings
 from .storage import get_conn
 
@@ -67,14 +68,7 @@ class ExperimentEngine:
 
     def _check_feature_flag(self, flag_name: str) -> bool:
         """Check if a feature flag is enabled."""
-        try:
-            with get_conn() as conn:
-                row = conn.execute(
-                    "SELECT enabled FROM feature_flags WHERE flag_name = ?", (flag_name,)
-                ).fetchone()
-                return row and row[0] if row else False
-        except Exception:
-            return False
+        return feature_flags.is_enabled(flag_name)
 
     def create_experiment(
         self, session_id: str, experiment_data: ExperimentCreate, user_id: Optional[str] = None
@@ -0,0 +1,184 @@
+"""
+Feature flag service for Mosaic 2.0
+Loads every row of feature_flags in one query and serves reads from an
+in-memory snapshot. The snapshot is refreshed after a short TTL, and right away
+when Postgres sends a feature_flags_changed notification (migration 006).
+Flags missing from the table fall back to environment variables.
+"""
+
+import contextlib
+import os
+import select
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .settings import get_feature_flag
+from .storage import get_conn
+
+
+FLAG_TTL_SECONDS = float(os.getenv("FEATURE_FLAG_TTL_SECONDS", "30"))
+FLAG_LISTEN_ENABLED = os.getenv("FEATURE_FLAG_LISTEN", "true").lower() in ("1", "true", "yes", "on")
+NOTIFY_CHANNEL = "feature_flags_changed"
+
+try:
+    import psycopg2
+
+    PSYCOPG2_AVAILABLE = True
+except ImportError:
+    psycopg2 = None
+    PSYCOPG2_AVAILABLE = False
+
+
+class FeatureFlagService:
+    """Shared, TTL-cached snapshot of the feature_flags table."""
+
+    def __init__(self, ttl_seconds: float = FLAG_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: Optional[Dict[str, bool]] = None
+        self._expires_at = 0.0
+        # Reentrant: the first load holds it across refresh(), which takes it too
+        self._lock = threading.RLock()
+        self._refreshing = False
+        self._listener: Optional[threading.Thread] = None
+        self._listener_pid: Optional[int] = None
+
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.notifications = 0
+
+    def _load(self) -> Dict[str, bool]:
+        with get_conn() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT flag_name, enabled FROM feature_flags")
+                return {name: bool(enabled) for name, enabled in cursor.fetchall()}
+
+    def refresh(self) -> bool:
+        """Reload all flags in one query; keeps the old snapshot on failure."""
+        try:
+            snapshot = self._load()
+        except Exception as e:
+            with self._lock:
+                self.refresh_errors += 1
+                # Retry after a TTL rather than on every read while the DB is down
+                self._expires_at = time.monotonic() + self.ttl_seconds
+                if self._snapshot is None:
+                    self._snapshot = {}
+            print(f"⚠️ Feature flag refresh failed: {e}")
+            return False
+        with self._lock:
+            self._snapshot = snapshot
+            self._expires_at = time.monotonic() + self.ttl_seconds
+            self.refreshes += 1
+        return True
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=_run, name="feature-flag-refresh", daemon=True).start()
+
+    def invalidate(self):
+        """Force the next read to reload the snapshot."""
+        with self._lock:
+            self._expires_at = 0.0
+
+    def snapshot(self) -> Dict[str, bool]:
+        """Current flag values; only the very first call waits on the database."""
+        self._ensure_listener()
+        if self._snapshot is None:
+            # One thread does the blocking first load; the rest wait for its result
+            with self._lock:
+                if self._snapshot is None:
+                    self.refresh()
+        elif time.monotonic() >= self._expires_at:
+            # Serve the previous values while a background refresh runs
+            self._refresh_in_background()
+        return self._snapshot
+
+    def is_enabled(self, flag_name: str, default: bool = False) -> bool:
+        """Database value if the flag exists, else the environment, else default."""
+        value = self.snapshot().get(flag_name)
+        if value is not None:
+            return value
+        return get_feature_flag(flag_name, default)
+
+    def _ensure_listener(self):
+        """Start the LISTEN thread once per process when Postgres is configured."""
+        if not (FLAG_LISTEN_ENABLED and PSYCOPG2_AVAILABLE and os.getenv("DATABASE_URL")):
+            return
+        pid = os.getpid()
+        if self._listener_pid == pid:
+            return
+        with self._lock:
+            if self._listener_pid == pid:
+                return
+            self._listener_pid = pid
+            self._listener = threading.Thread(
+                target=self._listen, name="feature-flag-listener", daemon=True
+            )
+            self._listener.start()
+
+    def _listen(self):
+        """Invalidate the snapshot whenever feature_flags changes; reconnect on errors."""
+        backoff = 1.0
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(os.getenv("DATABASE_URL"))
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                backoff = 1.0
+                # Changes made while disconnected were not notified
+                self.invalidate()
+                while True:
+                    if select.select([conn], [], [], 60) == ([], [], []):
+                        continue
+                    conn.poll()
+                    if conn.notifies:
+                        conn.notifies.clear()
+                        self.notifications += 1
+                        self.refresh()
+            except Exception as e:
+                print(f"⚠️ Feature flag listener disconnected: {e}")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 60.0)
+            finally:
+                if conn is not None:
+                    with contextlib.suppress(Exception):
+                        conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Snapshot freshness and refresh counters for health checks."""
+        return {
+            "flags": dict(self._snapshot or {}),
+            "ttl_seconds": self.ttl_seconds,
+            "expires_in": round(max(0.0, self._expires_at - time.monotonic()), 1),
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "notifications": self.notifications,
+            "listening": self._listener is not None and self._listener.is_alive(),
+        }
+
+
+# Global feature flag service shared by every engine
+feature_flags = FeatureFlagService()
+
+
+def is_enabled(flag_name: str, default: bool = False) -> bool:
+    """Check a feature flag using the global service."""
+    return feature_flags.is_enabled(flag_name, default)
+
+
+def get_feature_flag_stats() -> Dict[str, Any]:
+    """Get feature flag service statistics."""
+    return feature_flags.get_stats()
@@ -1,10 +1,15 @@
+import asyncio
+import contextvars
+import importlib.util
+import json
 import logging
 import os
 import re
 import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 # Core dependencies
 from fastapi import (
@@ -17,12 +22,19 @@ from fastapi import (
     Response,
     UploadFile,
 )
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 # Safe imports - always available
 from .settings import get_feature_flag, get_settings
-from .startup_checks import startup_or_die
+from .async_storage import close_pool as close_async_pool
+from .async_storage import session_unit_of_work as async_session_unit_of_work
+from .feature_flags import feature_flags, get_feature_flag_stats
+from .maintenance import get_maintenance_stats, maintenance_scheduler
+from .startup_checks import deferred_startup, startup_or_die
+from .subsystems import SubsystemRegistry
 
 # Storage imports with optional auth functions
 try:
@@ -32,12 +44,14 @@ try:
         ensure_session,
         fetch_job_matches,
         get_conn,
+        get_pool_stats,
         get_session_data,
         latest_metrics,
         list_resume_versions,
         record_wimd_output,
         session_exists,
         session_summary,
+        session_unit_of_work,
         store_file_upload,
         store_job_matches,
         update_job_match_status,
@@ -93,11 +107,9 @@ except ImportError:
     IMPORTS_AVAILABLE['numpy'] = False
     print("⚠️  numpy not available")
 
-try:
-    import openai
-    IMPORTS_AVAILABLE['openai'] = True
-except ImportError:
-    IMPORTS_AVAILABLE['openai'] = False
+# Checked without importing: the SDK alone adds most of a second to cold start
+IMPORTS_AVAILABLE['openai'] = importlib.util.find_spec("openai") is not None
+if not IMPORTS_AVAILABLE['openai']:
     print("⚠️  openai not available")
 
 try:
@@ -124,14 +136,6 @@ except ImportError as e:
     print(f"⚠️  competitive_intelligence not available: {e}")
     get_competitive_intelligence_health = lambda: {"ok": False, "error": "module unavailable"}
 
-try:
-    from .corpus_reindex import get_reindex_status, reindex_corpus
-    IMPORTS_AVAILABLE['corpus_reindex'] = True
-except ImportError as e:
-    IMPORTS_AVAILABLE['corpus_reindex'] = False
-    print(f"⚠️  corpus_reindex not available: {e}")
-    get_reindex_status = lambda: {"error": "module unavailable"}
-    reindex_corpus = lambda *args, **kwargs: {"error": "module unavailable"}
 
 try:
     from .cost_controls import (
@@ -193,19 +197,18 @@ try:
         RemoteOKSource,
         SerpApiSource,
         ZipRecruiterSource,
+        search_job_sources,
     )
+    from .job_sources.aggregator import job_search_aggregator
+    from .job_sources.cache import get_job_cache_stats
+    from .job_sources.ingestion import get_ingestion_stats, job_ingestor
+    from .job_sources.search_index import job_search_index
+    from .job_sources.store import job_store
     IMPORTS_AVAILABLE['job_sources'] = True
 except ImportError as e:
     IMPORTS_AVAILABLE['job_sources'] = False
     print(f"⚠️  job_sources not available: {e}")
 
-try:
-    from .monitoring import attempt_system_recovery, run_health_check
-    IMPORTS_AVAILABLE['monitoring'] = True
-except ImportError as e:
-    IMPORTS_AVAILABLE['monitoring'] = False
-    print(f"⚠️  monitoring not available: {e}")
-    run_health_check = lambda: {"ok": False, "error": "module unavailable"}
 
 try:
     from .osint_forensics import analyze_company_osint, get_osint_health
@@ -215,14 +218,6 @@ except ImportError as e:
     print(f"⚠️  osint_forensics not available: {e}")
     get_osint_health = lambda: {"ok": False, "error": "module unavailable"}
 
-try:
-    from .prompt_selector import get_prompt_health, get_prompt_response
-    IMPORTS_AVAILABLE['prompt_selector'] = True
-except ImportError as e:
-    IMPORTS_AVAILABLE['prompt_selector'] = False
-    print(f"⚠️  prompt_selector not available: {e}")
-    get_prompt_health = lambda: {"ok": False, "error": "module unavailable"}
-    get_prompt_response = lambda *args, **kwargs: "Prompt selector unavailable"
 
 try:
     from .ps101 import router as ps101_router
@@ -249,39 +244,6 @@ except ImportError as e:
     IMPORTS_AVAILABLE['ps101_flow'] = False
     print(f"⚠️  ps101_flow not available: {e}")
 
-try:
-    from .rag_engine import (
-        batch_compute_embeddings,
-        compute_embedding,
-        discover_domain_adjacent_opportunities_rag,
-        get_rag_health,
-        get_rag_response,
-        retrieve_similar,
-    )
-    IMPORTS_AVAILABLE['rag_engine'] = True
-except ImportError as e:
-    IMPORTS_AVAILABLE['rag_engine'] = False
-    print(f"⚠️  rag_engine not available: {e}")
-    get_rag_health = lambda: {"ok": False, "error": "module unavailable"}
-
-try:
-    from .rag_source_discovery import (
-        discover_sources_for_query,
-        get_discovery_analytics,
-        get_optimal_sources_for_query,
-    )
-    IMPORTS_AVAILABLE['rag_source_discovery'] = True
-except ImportError as e:
-    IMPORTS_AVAILABLE['rag_source_discovery'] = False
-    print(f"⚠️  rag_source_discovery not available: {e}")
-
-try:
-    from .reranker import get_reranker_health
-    IMPORTS_AVAILABLE['reranker'] = True
-except ImportError as e:
-    IMPORTS_AVAILABLE['reranker'] = False
-    print(f"⚠️  reranker not available: {e}")
-    get_reranker_health = lambda: {"ok": False, "error": "module unavailable"}
 
 try:
     from .self_efficacy_engine import (
@@ -298,6 +260,55 @@ except ImportError as e:
     print(f"⚠️  self_efficacy_engine not available: {e}")
     get_self_efficacy_health = lambda: {"ok": False, "error": "module unavailable"}
 
+# Heavy subsystems (AI SDKs, RAG, reranker model) import on first use and warm up
+# in the background after startup, so workers pass /health without waiting on them
+subsystems = SubsystemRegistry(availability=IMPORTS_AVAILABLE)
+subsystems.register("prompt_selector", ".prompt_selector")
+subsystems.register("rag_engine", ".rag_engine", warm="warm_up_rag")
+subsystems.register("reranker", ".reranker", warm="warm_up_reranker")
+subsystems.register("monitoring", ".monitoring")
+subsystems.register("corpus_reindex", ".corpus_reindex")
+subsystems.register("rag_source_discovery", ".rag_source_discovery")
+
+
+def _module_unavailable(*args, **kwargs):
+    return {"ok": False, "error": "module unavailable"}
+
+
+async def _prompt_selector_unavailable_async(*args, **kwargs):
+    return "Prompt selector unavailable"
+
+
+get_prompt_health = subsystems.lazy("prompt_selector", "get_prompt_health", _module_unavailable)
+get_prompt_response = subsystems.lazy(
+    "prompt_selector", "get_prompt_response", lambda *args, **kwargs: "Prompt selector unavailable"
+)
+get_prompt_response_async = subsystems.lazy_async(
+    "prompt_selector", "get_prompt_response_async", _prompt_selector_unavailable_async
+)
+batch_compute_embeddings = subsystems.lazy("rag_engine", "batch_compute_embeddings")
+compute_embedding = subsystems.lazy("rag_engine", "compute_embedding")
+discover_domain_adjacent_opportunities_rag = subsystems.lazy(
+    "rag_engine", "discover_domain_adjacent_opportunities_rag"
+)
+get_rag_health = subsystems.lazy("rag_engine", "get_rag_health", _module_unavailable)
+get_rag_response = subsystems.lazy("rag_engine", "get_rag_response")
+retrieve_similar = subsystems.lazy("rag_engine", "retrieve_similar")
+get_reranker_health = subsystems.lazy("reranker", "get_reranker_health", _module_unavailable)
+attempt_system_recovery = subsystems.lazy("monitoring", "attempt_system_recovery")
+run_health_check = subsystems.lazy("monitoring", "run_health_check", _module_unavailable)
+get_reindex_status = subsystems.lazy(
+    "corpus_reindex", "get_reindex_status", lambda: {"error": "module unavailable"}
+)
+reindex_corpus = subsystems.lazy(
+    "corpus_reindex", "reindex_corpus", lambda *args, **kwargs: {"error": "module unavailable"}
+)
+discover_sources_for_query = subsystems.lazy("rag_source_discovery", "discover_sources_for_query")
+get_discovery_analytics = subsystems.lazy("rag_source_discovery", "get_discovery_analytics")
+get_optimal_sources_for_query = subsystems.lazy(
+    "rag_source_discovery", "get_optimal_sources_for_query"
+)
+
 
 app = FastAPI()
 logger = logging.getLogger(__name__)
@@ -477,8 +488,14 @@ def _update_metrics(prompt: str, current: Dict[str, Any]) -> Dict[str, int]:
     return {"clarity": clarity, "action": action, "momentum": momentum}
 
 
-def _coach_reply(prompt: str, metrics: Dict[str, int], session_id: str = None) -> str:
-    """Generate coach reply using PS101 flow or CSV→AI fallback system"""
+def _prepare_coach_reply(
+    prompt: str, metrics: Dict[str, int], session_id: str = None
+) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """Run the PS101 flow and build the prompt selector request.
+
+    Returns (reply, None) when the flow produced the final reply, otherwise
+    (None, request) with the keyword arguments for get_prompt_response.
+    """
     import json
 
     from .prompts_loader import read_registry
@@ -499,7 +516,7 @@ def _coach_reply(prompt: str, metrics: Dict[str, int], session_id: str = None) -
         # Return first PS101 step prompt
         first_step = get_ps101_step(1)
         if first_step:
-            return format_step_for_user(first_step)
+            return format_step_for_user(first_step), None
 
     ps101_active = session_data.get("ps101_active", False)
 
@@ -534,7 +551,7 @@ def _coach_reply(prompt: str, metrics: Dict[str, int], session_id: str = None) -
                 session_data = exit_ps101_flow(session_data)
                 session_data["ps101_exit_pending"] = False
                 update_session_data(session_id, session_data)
-                return "Understood. You can return to the guided process anytime by selecting 'Fast Track'. What would you like to explore next?"
+                return "Understood. You can return to the guided process anytime by selecting 'Fast Track'. What would you like to explore next?", None
             else:
                 # User didn't confirm, clear flag and continue
                 session_data["ps101_exit_pending"] = False
@@ -546,13 +563,13 @@ def _coach_reply(prompt: str, metrics: Dict[str, int], session_id: str = None) -
             # First exit attempt - ask for confirmation
             session_data["ps101_exit_pending"] = True
             update_session_data(session_id, session_data)
-            return get_exit_confirmation()
+            return get_exit_confirmation(), None
 
         # Check if step is complete
         if ps101_is_complete(current_step):
             session_data = exit_ps101_flow(session_data)
             update_session_data(session_id, session_data)
-            return get_completion_message()
+            return get_completion_message(), None
 
         # Generate conversational response
         response, should_advance = generate_conversational_response(
@@ -599,7 +616,7 @@ def _coach_reply(prompt: str, metrics: Dict[str, int], session_id: str = None) -
         update_session_data(session_id, session_data)
 
         # Return the conversational response (includes next question if advanced)
-        return response
+        return response, None
 
     # Normal CSV→AI fallback flow (PS101 not active)
     try:
@@ -610,10 +627,10 @@ def _coach_reply(prompt: str, metrics: Dict[str, int], session_id: str = None) -
             if not ps101_context_data:
                 # User has finished the flow, but context isn't extracted yet.
                 # Or, they haven't finished the flow at all.
-                return "Please complete the PS101 questionnaire first to get personalized coaching."
+                return "Please complete the PS101 questionnaire first to get personalized coaching.", None
         else:
             # No user_id associated with the session, so no context is possible.
-            return "It looks like you're not logged in. Please log in and complete the PS101 questionnaire for a personalized experience."
+            return "It looks like you're not logged in. Please log in and complete the PS101 questionnaire for a personalized experience.", None
 
         # Get CSV prompts data
         csv_prompts = None
@@ -626,7 +643,7 @@ def _coach_reply(prompt: str, metrics: Dict[str, int], session_id: str = None) -
                         try:
                             with open(version["file"], encoding="utf-8") as f:
                                 prompts_data = json.load(f)
-                            csv_prompts = {"prompts": prompts_data}
+                            csv_prompts = {"prompts": prompts_data, "sha256": active_sha}
                             break
                         except Exception:
                             continue
@@ -659,20 +676,88 @@ Keep your responses concise, empathetic, and relentlessly focused on helping the
             context = {"metrics": metrics}
 
         # Use prompt selector with CSV→AI fallback
-        result = get_prompt_response(
-            prompt=prompt,
-            session_id=session_id or "default",
-            csv_prompts=csv_prompts,
-            context=context,
-        )
+        return None, {
+            "prompt": prompt,
+            "session_id": session_id or "default",
+            "csv_prompts": csv_prompts,
+            "context": context,
+        }
+
+    except Exception:
+        return _fallback_reply(metrics), None
+
+
+def _coach_reply(prompt: str, metrics: Dict[str, int], session_id: str = None) -> str:
+    """Generate coach reply using PS101 flow or CSV→AI fallback system"""
+    reply, request = _prepare_coach_reply(prompt, metrics, session_id)
+    if reply is not None:
+        return reply
+    try:
+        result = get_prompt_response(**request)
+    except Exception:
+        return _fallback_reply(metrics)
+    return result.get("response") or _fallback_reply(metrics)
 
-        if result.get("response"):
-            return result["response"]
-        else:
-            return _fallback_reply(metrics)
 
+async def _coach_reply_async(prompt: str, metrics: Dict[str, int], session_id: str = None) -> str:
+    """Generate coach reply without blocking the event loop"""
+    # The PS101 flow is synchronous; run it in the threadpool with a copy of the
+    # current context so the request's session unit of work is still active there
+    ctx = contextvars.copy_context()
+    reply, request = await run_in_threadpool(
+        ctx.run, _prepare_coach_reply, prompt, metrics, session_id
+    )
+    if reply is not None:
+        return reply
+    try:
+        result = await get_prompt_response_async(**request)
     except Exception:
         return _fallback_reply(metrics)
+    return result.get("response") or _fallback_reply(metrics)
+
+
+async def _coach_reply_stream(
+    prompt: str, metrics: Dict[str, int], session_id: str = None
+) -> AsyncIterator[str]:
+    """Yield the coach reply in chunks as the AI provider generates it.
+
+    PS101, CSV and cached replies arrive as a single chunk.
+    """
+    ctx = contextvars.copy_context()
+    reply, request = await run_in_threadpool(
+        ctx.run, _prepare_coach_reply, prompt, metrics, session_id
+    )
+    if reply is not None:
+        yield reply
+        return
+
+    deltas: asyncio.Queue = asyncio.Queue()
+    task = asyncio.create_task(get_prompt_response_async(**request, on_delta=deltas.put))
+    streamed = False
+    try:
+        while True:
+            getter = asyncio.ensure_future(deltas.get())
+            await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if not getter.done():
+                getter.cancel()
+                break
+            streamed = True
+            yield getter.result()
+        while not deltas.empty():
+            streamed = True
+            yield deltas.get_nowait()
+    finally:
+        # The client went away mid-stream; stop generating
+        if not task.done():
+            task.cancel()
+
+    if streamed:
+        return
+    try:
+        response = task.result().get("response")
+    except Exception:
+        response = None
+    yield response or _fallback_reply(metrics)
 
 
 def _fallback_reply(metrics: Dict[str, int]) -> str:
@@ -689,26 +774,42 @@ def cosine_similarity(a: List[float], b: List[float]) -> float:
     return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
 
 
+def _request_embedding(text: str) -> List[float]:
+    settings = get_settings()
+    if not settings.OPENAI_API_KEY:
+        raise ValueError("OpenAI API key not configured")
+
+    import openai
+
+    client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+    response = client.embeddings.create(model="text-embedding-3-small", input=text)
+    return response.data[0].embedding
+
+
 def get_embeddings(text: str) -> List[float]:
     """Get OpenAI embeddings for text"""
-    try:
-        settings = get_settings()
-        if not settings.OPENAI_API_KEY:
-            raise ValueError("OpenAI API key not configured")
+    from .embedding_cache import get_cached_embedding
 
-        client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-        response = client.embeddings.create(model="text-embedding-3-small", input=text)
-        return response.data[0].embedding
+    try:
+        return get_cached_embedding(text, _request_embedding)
     except Exception as e:
         print(f"Error getting embeddings: {e}")
         return []
 
 
 def semantic_search(
-    user_prompt: str, prompts_data: List[Dict], session_history: List[str] = None
+    user_prompt: str,
+    prompts_data: List[Dict],
+    session_history: List[str] = None,
+    prompts_sha: Optional[str] = None,
 ) -> Optional[Dict]:
     """Find most semantically similar prompt using embeddings"""
+    from .prompts_loader import get_prompt_embeddings, prompts_digest, top_k_prompts
+
     try:
+        if not prompts_data:
+            return None
+
         # Include session history for context
         context_text = user_prompt
         if session_history:
@@ -719,29 +820,20 @@ def semantic_search(
         if not user_embedding:
             return None
 
-        best_match = None
-        best_score = 0.0
-
-        for prompt in prompts_data:
-            # Compare against the prompt field (user's potential input), not completion
-            prompt_text = prompt.get("prompt", "")
-            if not prompt_text:
-                continue
-
-            # Get prompt embedding
-            prompt_embedding = get_embeddings(prompt_text)
-            if not prompt_embedding:
-                continue
-
-            # Calculate similarity
-            similarity = cosine_similarity(user_embedding, prompt_embedding)
+        # Compare against the prompt field (user's potential input), not completion.
+        # Prompt vectors are embedded once per prompts version and memory-mapped;
+        # rows without a registry SHA are keyed by a hash of their content.
+        matrix = get_prompt_embeddings(prompts_sha or prompts_digest(prompts_data), prompts_data)
+        if matrix is None:
+            return None
 
-            if similarity > best_score:
-                best_score = similarity
-                best_match = prompt
+        matches = top_k_prompts(matrix, user_embedding, k=1)
+        if not matches:
+            return None
+        best_index, best_score = matches[0]
 
         # Return best match if similarity is above threshold (lowered to 0.6 for better matching)
-        return best_match if best_score > 0.6 else None
+        return prompts_data[best_index] if best_score > 0.6 else None
 
     except Exception as e:
         print(f"Error in semantic search: {e}")
@@ -805,23 +897,52 @@ def _resolve_session(
     return candidate
 
 
+# Strong references so background startup tasks aren't garbage collected mid-run
+_background_tasks: set = set()
+
+
+def _background_task_done(task: asyncio.Task):
+    _background_tasks.discard(task)
+    # Retrieve the exception here; otherwise it only surfaces as a GC-time warning
+    if not task.cancelled() and task.exception() is not None:
+        print(f"⚠️ Background startup task {task.get_name()} failed: {task.exception()!r}")
+
+
 @app.on_event("startup")
 async def _startup():
+    # Size the threadpool that sync endpoints and offloaded work share
+    import anyio.to_thread
+
+    anyio.to_thread.current_default_thread_limiter().total_tokens = int(
+        os.getenv("THREADPOOL_MAX_WORKERS", "40")
+    )
+
     await startup_or_die()
 
-    # Clear prompt cache on startup (cache was returning placeholder "Cached response")
-    try:
-        from .storage import get_conn
+    # Load the shared flag snapshot before serving so request paths never wait on it
+    await run_in_threadpool(feature_flags.snapshot)
 
-        with get_conn() as conn:
-            cursor = conn.cursor()  # OK: PostgreSQL pattern
-            cursor.execute("DELETE FROM prompt_selector_cache")
-            print("✓ Cleared prompt_selector_cache on startup")
-    except Exception as e:
-        print(f"⚠️ Failed to clear cache on startup: {e}")
+    # Keep the local job index filled; workers race for an advisory lock per run
+    if IMPORTS_AVAILABLE.get("job_sources") and os.getenv("DATABASE_URL"):
+        job_ingestor.start()
+
+    # Session expiry and stale-data cleanup; workers race for a lock per job
+    if os.getenv("DATABASE_URL"):
+        maintenance_scheduler.start()
 
     SERVICE_READY.set()
 
+    # Warm heavy subsystems and run housekeeping once the worker is already serving
+    subsystems.start_warm_up()
+    task = asyncio.create_task(deferred_startup())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_task_done)
+
+
+@app.on_event("shutdown")
+async def _shutdown():
+    await close_async_pool()
+
 
 @app.get("/")
 def root():
@@ -896,8 +1017,14 @@ def health():
                 logger.info("Health check in startup grace period: %s", status)
             return status
 
-        # Test critical prompt system functionality (if available)
-        if IMPORTS_AVAILABLE.get('prompt_selector'):
+        # Test critical prompt system functionality (if available). Until the
+        # background warm-up has imported it, report it warming instead of blocking.
+        prompt_warming = IMPORTS_AVAILABLE.get('prompt_selector') and not subsystems.is_loaded(
+            'prompt_selector'
+        )
+        if prompt_warming:
+            prompt_health = {"fallback_enabled": True, "ai_health": {"any_available": False}}
+        elif IMPORTS_AVAILABLE.get('prompt_selector'):
             prompt_health = get_prompt_health()
         else:
             prompt_health = {"fallback_enabled": False, "ai_health": {"any_available": False}}
@@ -940,7 +1067,9 @@ def health():
                 "prompt_system": prompt_system_ok,
                 "ai_fallback_enabled": fallback_enabled,
                 "ai_available": ai_available,
+                "prompt_system_warming": bool(prompt_warming),
             },
+            "db_pool": get_pool_stats(),
         }
 
         if HEALTH_DEBUG_ENABLED:
@@ -984,12 +1113,54 @@ def health_prompts():
         return {
             "ok": IMPORTS_AVAILABLE.get('prompt_selector', False),
             "prompt_selector": prompt_health,
+            "feature_flags": get_feature_flag_stats(),
             "timestamp": datetime.utcnow().isoformat() + "Z",
         }
     except Exception as e:
         return {"ok": False, "error": str(e), "timestamp": datetime.utcnow().isoformat() + "Z"}
 
 
+@app.get("/health/subsystems")
+def health_subsystems():
+    """Load state and load/warm-up time of each lazily imported subsystem"""
+    return {
+        "service_ready": SERVICE_READY.is_set(),
+        "subsystems": subsystems.get_status(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+@app.get("/health/maintenance")
+def health_maintenance():
+    """Run counts, timings and last results of the background maintenance jobs"""
+    stats = get_maintenance_stats()
+    failing = [name for name, job in stats["jobs"].items() if job["last_error"]]
+    return {
+        "ok": not failing,
+        "failing_jobs": failing,
+        **stats,
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+@app.get("/health/jobs")
+def health_jobs():
+    """Health check for job ingestion, the local job index and the search cache"""
+    if not IMPORTS_AVAILABLE.get('job_sources'):
+        return {"ok": False, "error": "job_sources module unavailable"}
+    try:
+        index_stats = job_store.get_stats()
+    except Exception as e:
+        index_stats = {"error": str(e)}
+    return {
+        "ok": "error" not in index_stats,
+        "ingestion": get_ingestion_stats(),
+        "index": index_stats,
+        "cache": get_job_cache_stats(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+
+
 @app.get("/health/booking")
 def health_booking():
     """Health check for booking router"""
@@ -1127,20 +1298,70 @@ async def wimd_chat(
     payload: WimdRequest,
     session_header: Optional[str] = Header(None, alias="X-Session-ID"),
 ):
-    session_id = _resolve_session(payload.session_id, session_header, allow_create=True)
-    current_metrics = latest_metrics(session_id) or DEFAULT_METRICS
-    metrics = _update_metrics(payload.prompt, current_metrics)
-    message = _coach_reply(payload.prompt, metrics, session_id)
-    record_wimd_output(
-        session_id,
-        payload.prompt,
-        message,
-        analysis_data={"context": payload.context or {}},
-        metrics=metrics,
-    )
+    # One load and one flush for the whole turn instead of a transaction per read/write;
+    # both go through asyncpg and the coach reply never blocks the event loop
+    async with async_session_unit_of_work(payload.session_id or session_header) as session:
+        session_id = session.session_id
+        current_metrics = session.metrics or DEFAULT_METRICS
+        metrics = _update_metrics(payload.prompt, current_metrics)
+        message = await _coach_reply_async(payload.prompt, metrics, session_id)
+        record_wimd_output(
+            session_id,
+            payload.prompt,
+            message,
+            analysis_data={"context": payload.context or {}},
+            metrics=metrics,
+        )
     return WimdResponse(session_id=session_id, message=message, metrics=metrics)
 
 
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _wimd_stream_events(
+    payload: WimdRequest, session_id: Optional[str]
+) -> AsyncIterator[str]:
+    async with async_session_unit_of_work(session_id) as session:
+        session_id = session.session_id
+        current_metrics = session.metrics or DEFAULT_METRICS
+        metrics = _update_metrics(payload.prompt, current_metrics)
+        yield _sse("start", {"session_id": session_id, "metrics": metrics})
+
+        parts = []
+        async for delta in _coach_reply_stream(payload.prompt, metrics, session_id):
+            parts.append(delta)
+            yield _sse("delta", {"text": delta})
+        message = "".join(parts)
+        record_wimd_output(
+            session_id,
+            payload.prompt,
+            message,
+            analysis_data={"context": payload.context or {}},
+            metrics=metrics,
+        )
+    # Sent after the turn is persisted, with the same payload /wimd returns
+    yield _sse("done", {"session_id": session_id, "message": message, "metrics": metrics})
+
+
+@app.post("/wimd/stream")
+async def wimd_chat_stream(
+    payload: WimdRequest,
+    session_header: Optional[str] = Header(None, alias="X-Session-ID"),
+):
+    """Streaming variant of /wimd: the reply is sent as Server-Sent Events.
+
+    Events are `start` (session_id, metrics), one `delta` per text chunk, and
+    `done` with the assembled message once it has been saved.
+    """
+    return StreamingResponse(
+        _wimd_stream_events(payload, payload.session_id or session_header),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/wimd/metrics")
 def wimd_metrics(session_header: Optional[str] = Header(None, alias="X-Session-ID")):
     session_id = _resolve_session(None, session_header, allow_create=False)
@@ -1865,53 +2086,69 @@ def health_rag():
 def jobs_search(query: str, location: str = None, limit: int = 10):
     """Search jobs across all sources"""
     try:
-        # Check cost limits first
-        cost_check = check_cost_limits("job_search", 0.01)  # $0.01 per job search
-        if not cost_check["allowed"]:
-            return {"error": f"Cost limit exceeded: {cost_check['reason']}", "cost_limit": True}
-
-        # Check resource limits
-        resource_check = check_resource_limits("job_search")
-        if not resource_check["allowed"]:
-            return {
-                "error": f"Resource limit exceeded: {resource_check['reason']}",
-                "resource_limit": True,
+        # Serve from the ingested job index when it has matches; the database
+        # search covers workers whose in-process index has not synced yet
+        try:
+            if len(job_search_index):
+                indexed_jobs = job_search_index.search(query, location, limit)
+            else:
+                indexed_jobs = job_store.search(query, location, limit)
+        except Exception as e:
+            print(f"⚠️ Job index search failed, falling back to live sources: {e}")
+            indexed_jobs = []
+
+        if indexed_jobs:
+            # Local index hits cost nothing, so they skip the limits and usage tracking
+            unique_jobs = indexed_jobs
+            details = {
+                "served_from": "index",
+                "sources_used": len({job.source for job in indexed_jobs}),
+                "partial": False,
+                "source_latency": {},
+                "cache_hits": [],
             }
+        else:
+            # Check cost limits first
+            cost_check = check_cost_limits("job_search", 0.01)  # $0.01 per job search
+            if not cost_check["allowed"]:
+                return {
+                    "error": f"Cost limit exceeded: {cost_check['reason']}",
+                    "cost_limit": True,
+                }
 
-        # Initialize job sources
-        greenhouse = GreenhouseSource()
-        serpapi = SerpApiSource()
-        reddit = RedditSource()
-
-        all_jobs = []
-        success_count = 0
-
-        # Search each source
-        for source in [greenhouse, serpapi, reddit]:
-            try:
-                jobs = source.search_jobs(query, location, limit)
-                all_jobs.extend(jobs)
-                success_count += 1
-            except Exception as e:
-                print(f"Error searching {source.name}: {e}")
-                continue
-
-        # Remove duplicates and limit results
-        unique_jobs = []
-        seen_ids = set()
-        for job in all_jobs:
-            if job.id not in seen_ids:
-                unique_jobs.append(job)
-                seen_ids.add(job.id)
+            # Check resource limits
+            resource_check = check_resource_limits("job_search")
+            if not resource_check["allowed"]:
+                return {
+                    "error": f"Resource limit exceeded: {resource_check['reason']}",
+                    "resource_limit": True,
+                }
 
-        # Record usage
-        record_usage("job_search", 0.01, success_count > 0)
+            # Initialize job sources
+            greenhouse = GreenhouseSource()
+            serpapi = SerpApiSource()
+            reddit = RedditSource()
+
+            # Search all sources concurrently under a shared deadline
+            result = search_job_sources([greenhouse, serpapi, reddit], query, location, limit)
+            unique_jobs = result.jobs
+            success_count = len(result.sources_used)
+
+            # Record usage
+            record_usage("job_search", 0.01, success_count > 0)
+            details = {
+                "served_from": "live",
+                "sources_used": success_count,
+                "partial": result.timed_out,
+                "source_latency": result.latency_report(),
+                "cache_hits": result.cache_hits,
+            }
 
         return {
             "query": query,
             "location": location,
             "total_results": len(unique_jobs),
-            "sources_used": success_count,
+            **details,
             "jobs": [
                 {
                     "id": job.id,
@@ -1969,47 +2206,30 @@ def jobs_search_rag(query: str, location: str = None, limit: int = 10):
                 }
             )
 
-        all_jobs = []
-        used_sources = []
+        # Search optimal sources first, concurrently, under one deadline for the request
+        deadline_at = time.monotonic() + job_search_aggregator.deadline_seconds
+        primary = [source_map[name] for name in optimal_sources if name in source_map]
+        result = search_job_sources(primary, query, location, limit, deadline_at)
+
+        # Fallback to other sources if needed, within whatever time remains
+        if len(result.jobs) < limit and time.monotonic() < deadline_at:
+            searched = {source.name for source in primary}
+            fallback = [source for name, source in source_map.items() if name not in searched]
+            result = result.merge(
+                search_job_sources(fallback, query, location, limit, deadline_at)
+            )
 
-        # Search optimal sources first
-        for source_name in optimal_sources:
-            if source_name in source_map:
-                try:
-                    source = source_map[source_name]
-                    jobs = source.search_jobs(query, location, limit)
-                    all_jobs.extend(jobs)
-                    used_sources.append(source_name)
-                except Exception as e:
-                    print(f"Error searching {source_name}: {e}")
-                    continue
-
-        # Fallback to other sources if needed
-        if len(all_jobs) < limit:
-            for source_name, source in source_map.items():
-                if source_name not in used_sources:
-                    try:
-                        jobs = source.search_jobs(query, location, limit)
-                        all_jobs.extend(jobs)
-                        used_sources.append(source_name)
-                    except Exception as e:
-                        print(f"Error searching {source_name}: {e}")
-                        continue
-
-        # Remove duplicates and limit results
-        unique_jobs = []
-        seen_ids = set()
-        for job in all_jobs:
-            if job.id not in seen_ids:
-                unique_jobs.append(job)
-                seen_ids.add(job.id)
+        unique_jobs = result.jobs
 
         return {
             "query": query,
             "location": location,
             "rag_optimized": True,
             "optimal_sources": optimal_sources,
-            "used_sources": used_sources,
+            "used_sources": result.sources_used,
+            "partial": result.timed_out,
+            "source_latency": result.latency_report(),
+            "cache_hits": result.cache_hits,
             "total_results": len(unique_jobs),
             "jobs": [
                 {
@@ -3,18 +3,23 @@ Job Sources Interface for Mosaic 2.0
 Provides standardized interface for different job data sources.
 """
 
+from .aggregator import AggregatedSearch, JobSearchAggregator, SourceReport, search_job_sources
 from .base import JobPosting, JobSource
+from .cache import JobSearchCache, get_job_cache_stats, job_search_cache
 from .careerbuilder import CareerBuilderSource
 from .dice import DiceSource
 from .glassdoor import GlassdoorSource
 from .greenhouse import GreenhouseSource
 from .hackernews import HackerNewsSource
 from .indeed import IndeedSource
+from .ingestion import JobIngestor, get_ingestion_stats, job_ingestor
 from .linkedin import LinkedInSource
 from .monster import MonsterSource
 from .reddit import RedditSource
 from .remoteok import RemoteOKSource
+from .search_index import JobSearchIndex, job_search_index
 from .serpapi import SerpApiSource
+from .store import JobStore, job_store
 from .weworkremotely import WeWorkRemotelySource
 from .ziprecruiter import ZipRecruiterSource
 
@@ -34,4 +39,18 @@ __all__ = [
     "ZipRecruiterSource",
     "CareerBuilderSource",
     "HackerNewsSource",
+    "JobSearchAggregator",
+    "AggregatedSearch",
+    "SourceReport",
+    "search_job_sources",
+    "JobSearchCache",
+    "job_search_cache",
+    "get_job_cache_stats",
+    "JobStore",
+    "job_store",
+    "JobSearchIndex",
+    "job_search_index",
+    "JobIngestor",
+    "job_ingestor",
+    "get_ingestion_stats",
 ]
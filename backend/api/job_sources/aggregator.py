@@ -0,0 +1,181 @@
+"""
+Concurrent job search aggregator.
+Fans a query out to several job sources at once under a global deadline and
+returns whatever finished in time, with per-source latency. Sources are read
+through the job search cache when one is configured.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from .base import JobPosting, JobSource
+from .cache import JobSearchCache, job_search_cache
+
+
+DEFAULT_DEADLINE_SECONDS = float(os.getenv("JOB_SEARCH_DEADLINE_SECONDS", "8"))
+DEFAULT_MAX_WORKERS = int(os.getenv("JOB_SEARCH_MAX_WORKERS", "8"))
+
+
+@dataclass
+class SourceReport:
+    """Outcome of one source within an aggregated search."""
+
+    name: str
+    status: str  # ok | error | timeout
+    jobs: int = 0
+    latency_ms: float = 0.0
+    error: Optional[str] = None
+    cache: Optional[str] = None  # fresh | stale | miss; None when not cached
+
+
+@dataclass
+class AggregatedSearch:
+    """Merged results of a fan-out search."""
+
+    jobs: List[JobPosting]
+    reports: List[SourceReport]
+    elapsed_ms: float
+    timed_out: bool
+
+    @property
+    def sources_used(self) -> List[str]:
+        return [r.name for r in self.reports if r.status == "ok"]
+
+    def merge(self, other: "AggregatedSearch") -> "AggregatedSearch":
+        """Append another search's results, skipping jobs already present."""
+        seen_ids = {job.id for job in self.jobs}
+        jobs = self.jobs + [job for job in other.jobs if job.id not in seen_ids]
+        return AggregatedSearch(
+            jobs=jobs,
+            reports=self.reports + other.reports,
+            elapsed_ms=round(self.elapsed_ms + other.elapsed_ms, 1),
+            timed_out=self.timed_out or other.timed_out,
+        )
+
+    @property
+    def cache_hits(self) -> List[str]:
+        return [r.name for r in self.reports if r.cache in ("fresh", "stale")]
+
+    def latency_report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-source status, latency and cache outcome for API responses."""
+        return {r.name: {k: v for k, v in asdict(r).items() if k != "name"} for r in self.reports}
+
+
+class JobSearchAggregator:
+    """Runs JobSource.search_jobs concurrently on a shared thread pool."""
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        deadline_seconds: float = DEFAULT_DEADLINE_SECONDS,
+        cache: Optional[JobSearchCache] = None,
+    ):
+        self.deadline_seconds = deadline_seconds
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="job-search"
+        )
+
+    def _run_source(self, source: JobSource, query: str, location: Optional[str], limit: int):
+        start = time.monotonic()
+        if self.cache is None:
+            jobs = source.search_jobs(query, location, limit)
+            return jobs, (time.monotonic() - start) * 1000, None
+
+        cached = self.cache.get(source.name, query, location, limit)
+        if cached is not None:
+            # Stale entries are served now and refreshed in the background
+            if cached.stale:
+                self.cache.revalidate(source, query, location, limit)
+            state = "stale" if cached.stale else "fresh"
+            return cached.jobs, (time.monotonic() - start) * 1000, state
+        jobs = source.search_jobs(query, location, limit)
+        self.cache.put(source.name, query, location, limit, jobs)
+        return jobs, (time.monotonic() - start) * 1000, "miss"
+
+    def search(
+        self,
+        sources: Sequence[JobSource],
+        query: str,
+        location: Optional[str] = None,
+        limit: int = 10,
+        deadline_at: Optional[float] = None,
+    ) -> AggregatedSearch:
+        """Search all sources at once; sources still running at the deadline are dropped."""
+        start = time.monotonic()
+        if deadline_at is None:
+            deadline_at = start + self.deadline_seconds
+
+        futures = {}
+        for source in sources:
+            # Sources consult the deadline to bound their own sub-requests
+            source.deadline = deadline_at
+            futures[self._executor.submit(self._run_source, source, query, location, limit)] = (
+                source
+            )
+
+        done, not_done = wait(futures, timeout=max(0.0, deadline_at - time.monotonic()))
+
+        reports: Dict[str, SourceReport] = {}
+        results: Dict[str, List[JobPosting]] = {}
+        for future in done:
+            source = futures[future]
+            try:
+                jobs, latency_ms, cache_state = future.result()
+                results[source.name] = jobs
+                reports[source.name] = SourceReport(
+                    source.name,
+                    "ok",
+                    jobs=len(jobs),
+                    latency_ms=round(latency_ms, 1),
+                    cache=cache_state,
+                )
+            except Exception as e:
+                print(f"Error searching {source.name}: {e}")
+                reports[source.name] = SourceReport(
+                    source.name,
+                    "error",
+                    latency_ms=round((time.monotonic() - start) * 1000, 1),
+                    error=str(e),
+                )
+        for future in not_done:
+            # Queued work is cancelled; running work finishes in the background and is ignored
+            future.cancel()
+            source = futures[future]
+            reports[source.name] = SourceReport(
+                source.name, "timeout", latency_ms=round((time.monotonic() - start) * 1000, 1)
+            )
+
+        # Merge in the caller's source order so results are deterministic
+        jobs: List[JobPosting] = []
+        seen_ids = set()
+        for source in sources:
+            for job in results.get(source.name, []):
+                if job.id not in seen_ids:
+                    seen_ids.add(job.id)
+                    jobs.append(job)
+
+        return AggregatedSearch(
+            jobs=jobs,
+            reports=[reports[source.name] for source in sources],
+            elapsed_ms=round((time.monotonic() - start) * 1000, 1),
+            timed_out=bool(not_done),
+        )
+
+
+# Global aggregator shared by the job search endpoints
+job_search_aggregator = JobSearchAggregator(cache=job_search_cache)
+
+
+def search_job_sources(
+    sources: Sequence[JobSource],
+    query: str,
+    location: Optional[str] = None,
+    limit: int = 10,
+    deadline_at: Optional[float] = None,
+) -> AggregatedSearch:
+    """Search several job sources concurrently using the global aggregator."""
+    return job_search_aggregator.search(sources, query, location, limit, deadline_at)
@@ -2,10 +2,22 @@
 Base classes for job sources interface.
 """
 
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from .http import HTTP_TIMEOUT_SECONDS, get_http_session
+
+
+# Shared pool for per-source sub-requests (boards, subreddits, items). Kept separate
+# from the aggregator pool so a source waiting on its sub-requests cannot deadlock.
+_SUBREQUEST_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="job-source")
 
 
 @dataclass
@@ -43,6 +55,8 @@ class JobSource(ABC):
         self.rate_limit = rate_limit
         self.last_request = datetime.min
         self.requests_this_minute = 0
+        # Absolute time.monotonic() deadline set by the aggregator; None means unbounded
+        self.deadline: Optional[float] = None
 
     @abstractmethod
     def search_jobs(self, query: str, location: str = None, limit: int = 10) -> List[JobPosting]:
@@ -54,6 +68,14 @@ class JobSource(ABC):
         """Get detailed information for a specific job."""
         pass
 
+    def fetch_feed(self, limit: int = 500) -> List[JobPosting]:
+        """Pull the source's current postings for ingestion.
+
+        Sources skip their query filter for an empty query, so by default this
+        is an unfiltered search; override when a source has a cheaper bulk feed.
+        """
+        return self.search_jobs("", None, limit)
+
     def _check_rate_limit(self) -> bool:
         """Check if we're within rate limits."""
         now = datetime.now()
@@ -67,6 +89,48 @@ class JobSource(ABC):
             return True
         return False
 
+    def _time_remaining(self) -> Optional[float]:
+        """Seconds left before the search deadline, or None when there is none."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def _request_timeout(self, default: float) -> float:
+        """HTTP timeout capped by the remaining search deadline."""
+        remaining = self._time_remaining()
+        if remaining is None:
+            return default
+        return max(0.1, min(default, remaining))
+
+    @property
+    def http(self) -> requests.Session:
+        """Shared pooled HTTP session."""
+        return get_http_session()
+
+    def _get(self, url: str, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+        """GET through the shared session with a deadline-capped timeout."""
+        timeout = self._request_timeout(timeout or HTTP_TIMEOUT_SECONDS)
+        return self.http.get(url, timeout=timeout, **kwargs)
+
+    def _map_concurrent(self, fn: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+        """Apply fn to items concurrently, returning results in item order.
+
+        Items that fail or miss the deadline yield None; unfinished work is cancelled.
+        """
+        futures = {_SUBREQUEST_EXECUTOR.submit(fn, item): i for i, item in enumerate(items)}
+        results: List[Any] = [None] * len(items)
+        try:
+            for future in as_completed(futures, timeout=self._time_remaining()):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    print(f"{self.name} sub-request failed: {e}")
+        except FuturesTimeoutError:
+            print(f"{self.name} sub-requests hit the search deadline")
+            for future in futures:
+                future.cancel()
+        return results
+
     def _normalize_job_data(self, raw_data: Dict[str, Any]) -> JobPosting:
         """Normalize raw job data to standard format."""
         return JobPosting(
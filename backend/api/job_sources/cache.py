@@ -0,0 +1,239 @@
+"""
+Job search result cache with stale-while-revalidate.
+Results are cached per (source, normalized query, location, limit) in a memory
+LRU backed by the Postgres job_search_cache table, which every worker shares.
+Entries past their per-source TTL are still served while one background
+refresh per key fetches a new copy.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ..caching import LRUTTLCache
+from ..storage import get_conn
+from .base import JobPosting, JobSource
+
+
+JOB_CACHE_ENABLED = os.getenv("JOB_CACHE_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+DEFAULT_TTL_SECONDS = float(os.getenv("JOB_CACHE_TTL_SECONDS", "900"))
+# How long past its TTL an entry may still be served while it is refreshed
+MAX_STALE_SECONDS = float(os.getenv("JOB_CACHE_MAX_STALE_SECONDS", str(24 * 60 * 60)))
+
+# Boards change slowly; social feeds churn faster. JOB_CACHE_TTL_<SOURCE> overrides.
+SOURCE_TTL_SECONDS = {
+    "greenhouse": 1800,
+    "hackernews": 1800,
+    "remoteok": 900,
+    "reddit": 600,
+    "serpapi": 3600,
+}
+
+
+def normalize(text: Optional[str]) -> str:
+    """Case- and whitespace-insensitive form of a query or location."""
+    return " ".join((text or "").lower().split())
+
+
+def job_to_dict(job: JobPosting) -> Dict[str, Any]:
+    data = asdict(job)
+    if job.posted_date is not None:
+        data["posted_date"] = job.posted_date.isoformat()
+    return data
+
+
+def job_from_dict(data: Dict[str, Any]) -> JobPosting:
+    data = dict(data)
+    if data.get("posted_date"):
+        data["posted_date"] = datetime.fromisoformat(data["posted_date"])
+    return JobPosting(**data)
+
+
+@dataclass
+class CachedResult:
+    """A cache hit; stale entries are past their TTL and being refreshed."""
+
+    jobs: List[JobPosting]
+    age_seconds: float
+    stale: bool
+
+
+class JobSearchCache:
+    """Memory LRU in front of the job_search_cache table, with background refresh."""
+
+    def __init__(self, enabled: bool = JOB_CACHE_ENABLED, persistent: bool = True):
+        self.enabled = enabled
+        self.persistent_enabled = persistent
+        # Entries are held until they are too stale to serve at all
+        self.memory = LRUTTLCache(
+            max_items=int(os.getenv("JOB_CACHE_MAX_ITEMS", "2000")),
+            max_bytes=int(os.getenv("JOB_CACHE_MAX_MB", "32")) * 1024 * 1024,
+            ttl_seconds=max(SOURCE_TTL_SECONDS.values()) + MAX_STALE_SECONDS,
+            sizeof=lambda entry: 256 + sum(len(job.description) + 512 for job in entry[1]),
+        )
+        self._refresher = ThreadPoolExecutor(max_workers=4, thread_name_prefix="job-cache")
+        self._refreshing: set = set()
+        self._lock = threading.Lock()
+        self.persistent_retry_seconds = 60
+        self._persistent_down_until = 0.0
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"fresh": 0, "stale": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0}
+        )
+
+    def ttl_for(self, source: str) -> float:
+        override = os.getenv(f"JOB_CACHE_TTL_{source.upper()}")
+        if override:
+            return float(override)
+        return float(SOURCE_TTL_SECONDS.get(source, DEFAULT_TTL_SECONDS))
+
+    def _key(self, source: str, query: str, location: Optional[str], limit: int) -> str:
+        raw = "|".join((source, normalize(query), normalize(location), str(limit)))
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _count(self, source: str, field: str):
+        with self._lock:
+            self.stats[source][field] += 1
+
+    def _persistent_available(self) -> bool:
+        return self.persistent_enabled and time.time() >= self._persistent_down_until
+
+    def _persistent_failed(self, e: Exception):
+        self._persistent_down_until = time.time() + self.persistent_retry_seconds
+        print(f"⚠️ Job search cache persistent tier unavailable: {e}")
+
+    def _load(self, key: str) -> Optional[tuple]:
+        """(fetched_at, jobs) from job_search_cache, if present."""
+        if not self._persistent_available():
+            return None
+        try:
+            with get_conn() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        """SELECT payload, EXTRACT(EPOCH FROM NOW() - fetched_at)
+                           FROM job_search_cache WHERE cache_key = %s""",
+                        (key,),
+                    )
+                    row = cursor.fetchone()
+        except Exception as e:
+            self._persistent_failed(e)
+            return None
+        if not row:
+            return None
+        payload = row[0] if isinstance(row[0], list) else json.loads(row[0])
+        entry = (time.time() - float(row[1]), [job_from_dict(job) for job in payload])
+        self.memory.set(key, entry)
+        return entry
+
+    def get(
+        self, source: str, query: str, location: Optional[str], limit: int
+    ) -> Optional[CachedResult]:
+        """Cached jobs for the search, fresh or stale; None on a miss."""
+        if not self.enabled:
+            return None
+        key = self._key(source, query, location, limit)
+        entry = self.memory.get(key) or self._load(key)
+        age = time.time() - entry[0] if entry else None
+        if entry is None or age > self.ttl_for(source) + MAX_STALE_SECONDS:
+            self._count(source, "misses")
+            return None
+        stale = age > self.ttl_for(source)
+        self._count(source, "stale" if stale else "fresh")
+        return CachedResult(jobs=entry[1], age_seconds=age, stale=stale)
+
+    def put(
+        self,
+        source: str,
+        query: str,
+        location: Optional[str],
+        limit: int,
+        jobs: List[JobPosting],
+    ):
+        """Store a result in both tiers; empty results are not cached."""
+        if not self.enabled or not jobs:
+            return
+        key = self._key(source, query, location, limit)
+        self.memory.set(key, (time.time(), list(jobs)))
+        if not self._persistent_available():
+            return
+        try:
+            with get_conn() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        """INSERT INTO job_search_cache (cache_key, source, payload, fetched_at)
+                           VALUES (%s, %s, %s::jsonb, NOW())
+                           ON CONFLICT (cache_key) DO UPDATE SET
+                           payload = EXCLUDED.payload,
+                           fetched_at = EXCLUDED.fetched_at""",
+                        (
+                            key,
+                            source,
+                            json.dumps([job_to_dict(job) for job in jobs], default=str),
+                        ),
+                    )
+        except Exception as e:
+            self._persistent_failed(e)
+
+    def revalidate(self, source: JobSource, query: str, location: Optional[str], limit: int):
+        """Refresh one entry in the background unless a refresh is already running."""
+        key = self._key(source.name, query, location, limit)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        # The request's deadline must not cut the refresh short
+        refresh_source = copy.copy(source)
+        refresh_source.deadline = None
+
+        def _run():
+            try:
+                jobs = refresh_source.search_jobs(query, location, limit)
+                self.put(source.name, query, location, limit, jobs)
+                self._count(source.name, "refreshes")
+            except Exception as e:
+                print(f"Error refreshing {source.name} cache: {e}")
+                self._count(source.name, "refresh_errors")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._refresher.submit(_run)
+
+    def prune(self) -> int:
+        """Delete persistent entries too stale to serve."""
+        with get_conn() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """DELETE FROM job_search_cache
+                       WHERE fetched_at < NOW() - make_interval(secs => %s)""",
+                    (max(SOURCE_TTL_SECONDS.values()) + MAX_STALE_SECONDS,),
+                )
+                return cursor.rowcount or 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-source hit counters plus memory tier stats."""
+        with self._lock:
+            sources = {name: dict(counts) for name, counts in self.stats.items()}
+        return {
+            "enabled": self.enabled,
+            "sources": sources,
+            "memory": self.memory.get_stats(),
+            "persistent_available": self._persistent_available(),
+        }
+
+
+# Global cache shared by the job search endpoints
+job_search_cache = JobSearchCache()
+
+
+def get_job_cache_stats() -> Dict[str, Any]:
+    """Get job search cache statistics."""
+    return job_search_cache.get_stats()
@@ -30,7 +30,7 @@ class CareerBuilderSource(JobSource):
                 "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
             }
 
-            response = requests.get(self.base_url, params=params, headers=headers, timeout=10)
+            response = self._get(self.base_url, params=params, headers=headers, timeout=10)
             response.raise_for_status()
 
             soup = BeautifulSoup(response.content, "html.parser")
@@ -36,7 +36,7 @@ class GlassdoorSource(JobSource):
                 "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
             }
 
-            response = requests.get(search_url, headers=headers, timeout=10)
+            response = self._get(search_url, headers=headers, timeout=10)
             response.raise_for_status()
 
             soup = BeautifulSoup(response.content, "html.parser")
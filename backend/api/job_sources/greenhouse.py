@@ -30,57 +30,44 @@ class GreenhouseSource(JobSource):
             all_jobs = []
             query_lower = query.lower() if query else ""
 
-            for board_token in board_tokens:
-                if len(all_jobs) >= limit:
-                    break
-
-                try:
-                    url = f"{self.base_url}/boards/{board_token}/jobs"
-                    headers = {"User-Agent": "Mosaic Career Platform (contact@whatismydelta.com)"}
-                    response = requests.get(url, headers=headers, timeout=5)
+            # Fetch all boards at once; filter in board order so results stay stable
+            boards = self._map_concurrent(self._fetch_board, board_tokens)
+
+            for board_token, jobs_data in zip(board_tokens, boards):
+                for job_data in jobs_data or []:
+                    if len(all_jobs) >= limit:
+                        break
+
+                    title = job_data.get("title", "")
+                    departments = [d.get("name", "") for d in job_data.get("departments", [])]
+
+                    # Filter by query
+                    if (
+                        query_lower
+                        and query_lower not in title.lower()
+                        and not any(query_lower in d.lower() for d in departments)
+                    ):
+                        continue
 
-                    if response.status_code != 200:
+                    # Filter by location if provided
+                    job_location = job_data.get("location", {}).get("name", "Unknown")
+                    if location and location.lower() not in job_location.lower():
                         continue
 
-                    jobs_data = response.json().get("jobs", [])
-
-                    for job_data in jobs_data:
-                        if len(all_jobs) >= limit:
-                            break
-
-                        title = job_data.get("title", "")
-                        departments = [d.get("name", "") for d in job_data.get("departments", [])]
-
-                        # Filter by query
-                        if (
-                            query_lower
-                            and query_lower not in title.lower()
-                            and not any(query_lower in d.lower() for d in departments)
-                        ):
-                            continue
-
-                        # Filter by location if provided
-                        job_location = job_data.get("location", {}).get("name", "Unknown")
-                        if location and location.lower() not in job_location.lower():
-                            continue
-
-                        job = {
-                            "id": f"greenhouse_{job_data.get('id')}",
-                            "title": title,
-                            "company": board_token.capitalize(),
-                            "location": job_location,
-                            "description": job_data.get("content", "")[:500],
-                            "url": job_data.get("absolute_url", ""),
-                            "posted_date": datetime.now(),
-                            "remote": "remote" in job_location.lower(),
-                            "skills": departments,
-                            "experience_level": "mid",
-                        }
-
-                        all_jobs.append(self._normalize_job_data(job))
-
-                except requests.RequestException:
-                    continue
+                    job = {
+                        "id": f"greenhouse_{job_data.get('id')}",
+                        "title": title,
+                        "company": board_token.capitalize(),
+                        "location": job_location,
+                        "description": job_data.get("content", "")[:500],
+                        "url": job_data.get("absolute_url", ""),
+                        "posted_date": datetime.now(),
+                        "remote": "remote" in job_location.lower(),
+                        "skills": departments,
+                        "experience_level": "mid",
+                    }
+
+                    all_jobs.append(self._normalize_job_data(job))
 
             return all_jobs
 
@@ -88,6 +75,19 @@ class GreenhouseSource(JobSource):
             print(f"Error searching Greenhouse jobs: {e}")
             return []
 
+    def _fetch_board(self, board_token: str) -> List[dict]:
+        """Fetch the raw job list for one company board."""
+        try:
+            url = f"{self.base_url}/boards/{board_token}/jobs"
+            response = self._get(url, timeout=5)
+
+            if response.status_code != 200:
+                return []
+
+            return response.json().get("jobs", [])
+        except requests.RequestException:
+            return []
+
     def get_job_details(self, job_id: str) -> Optional[JobPosting]:
         """Get detailed job information from Greenhouse - NOT IMPLEMENTED."""
         # Job details endpoint not implemented - users should click through to source URL
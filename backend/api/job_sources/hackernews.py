@@ -24,60 +24,54 @@ class HackerNewsSource(JobSource):
 
         try:
             # Get job story IDs
-            response = requests.get(f"{self.base_url}/jobstories.json", timeout=10)
+            response = self._get(f"{self.base_url}/jobstories.json", timeout=10)
             response.raise_for_status()
             job_ids = response.json()[: limit * 2]  # Get extra for filtering
 
             jobs = []
             query_lower = query.lower() if query else ""
 
-            for job_id in job_ids:
+            # Fetch item details concurrently; keep the job story ranking order
+            items = self._map_concurrent(self._fetch_item, job_ids)
+
+            for job_id, job_data in zip(job_ids, items):
                 if len(jobs) >= limit:
                     break
 
-                # Fetch job details
-                try:
-                    job_response = requests.get(f"{self.base_url}/item/{job_id}.json", timeout=5)
-                    job_response.raise_for_status()
-                    job_data = job_response.json()
-
-                    if not job_data or job_data.get("dead") or job_data.get("deleted"):
-                        continue
-
-                    title = job_data.get("title", "")
-                    text = job_data.get("text", "")
-
-                    # Filter by query if provided
-                    if (
-                        query_lower
-                        and query_lower not in title.lower()
-                        and query_lower not in text.lower()
-                    ):
-                        continue
-
-                    # Extract company from title (common format: "Company Name (Location) | Position")
-                    company = "Company"
-                    if "(" in title:
-                        company = title.split("(")[0].strip()
-
-                    job = {
-                        "id": f"hn_{job_id}",
-                        "title": title,
-                        "company": company,
-                        "location": "See description",
-                        "description": text[:500] if text else title,
-                        "url": f"https://news.ycombinator.com/item?id={job_id}",
-                        "posted_date": datetime.fromtimestamp(job_data.get("time", 0)),
-                        "job_type": "Full-time",
-                        "remote": "remote" in title.lower() or "remote" in text.lower(),
-                        "skills": [],
-                        "experience_level": "mid",
-                    }
-
-                    jobs.append(self._normalize_job_data(job))
-
-                except requests.RequestException:
-                    continue  # Skip failed individual job fetches
+                if not job_data or job_data.get("dead") or job_data.get("deleted"):
+                    continue
+
+                title = job_data.get("title", "")
+                text = job_data.get("text", "")
+
+                # Filter by query if provided
+                if (
+                    query_lower
+                    and query_lower not in title.lower()
+                    and query_lower not in text.lower()
+                ):
+                    continue
+
+                # Extract company from title (common format: "Company Name (Location) | Position")
+                company = "Company"
+                if "(" in title:
+                    company = title.split("(")[0].strip()
+
+                job = {
+                    "id": f"hn_{job_id}",
+                    "title": title,
+                    "company": company,
+                    "location": "See description",
+                    "description": text[:500] if text else title,
+                    "url": f"https://news.ycombinator.com/item?id={job_id}",
+                    "posted_date": datetime.fromtimestamp(job_data.get("time", 0)),
+                    "job_type": "Full-time",
+                    "remote": "remote" in title.lower() or "remote" in text.lower(),
+                    "skills": [],
+                    "experience_level": "mid",
+                }
+
+                jobs.append(self._normalize_job_data(job))
 
             return jobs
 
@@ -88,6 +82,15 @@ class HackerNewsSource(JobSource):
             print(f"Error processing Hacker News jobs: {e}")
             return []
 
+    def _fetch_item(self, job_id: int) -> Optional[dict]:
+        """Fetch one Hacker News item."""
+        try:
+            response = self._get(f"{self.base_url}/item/{job_id}.json", timeout=5)
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException:
+            return None  # Skip failed individual job fetches
+
     def get_job_details(self, job_id: str) -> Optional[JobPosting]:
         """Get detailed job information from Hacker News - NOT IMPLEMENTED."""
         # Job details endpoint not implemented - users should click through to source URL
@@ -0,0 +1,114 @@
+"""
+Shared HTTP client for job sources.
+One pooled requests.Session per process so board, subreddit and item fetches
+reuse keep-alive connections instead of reconnecting on every call.
+"""
+
+import os
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
+
+
+DEFAULT_USER_AGENT = "Mosaic Career Platform (contact@whatismydelta.com)"
+
+HTTP_TIMEOUT_SECONDS = float(os.getenv("JOB_SOURCE_HTTP_TIMEOUT", "10"))
+HTTP_POOL_HOSTS = int(os.getenv("JOB_SOURCE_HTTP_POOL_HOSTS", "16"))
+HTTP_POOL_PER_HOST = int(os.getenv("JOB_SOURCE_HTTP_POOL_PER_HOST", "8"))
+HTTP_RETRIES = int(os.getenv("JOB_SOURCE_HTTP_RETRIES", "2"))
+HTTP_BACKOFF_SECONDS = float(os.getenv("JOB_SOURCE_HTTP_BACKOFF", "0.3"))
+# A 429/503 asking to wait longer than this is returned instead of retried,
+# since the search deadline would pass while sleeping
+HTTP_MAX_RETRY_AFTER_SECONDS = float(os.getenv("JOB_SOURCE_HTTP_MAX_RETRY_AFTER", "2"))
+# How long a thread waits for a free pooled connection before giving up
+HTTP_POOL_TIMEOUT_SECONDS = float(os.getenv("JOB_SOURCE_HTTP_POOL_TIMEOUT", "5"))
+
+_SESSION: Optional[requests.Session] = None
+_SESSION_PID: Optional[int] = None
+_SESSION_LOCK = threading.Lock()
+
+
+class CappedRetry(Retry):
+    """Retry that gives up on a Retry-After longer than HTTP_MAX_RETRY_AFTER_SECONDS."""
+
+    def increment(
+        self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None
+    ):
+        retry_after = self.get_retry_after(response) if response is not None else None
+        if retry_after is not None and retry_after > HTTP_MAX_RETRY_AFTER_SECONDS:
+            raise MaxRetryError(_pool, url, ResponseError(f"Retry-After {retry_after:.0f}s"))
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+class _BoundedHTTPPool(HTTPConnectionPool):
+    def _get_conn(self, timeout=None):
+        # requests never passes a pool timeout, which makes pool_block wait forever
+        return super()._get_conn(HTTP_POOL_TIMEOUT_SECONDS if timeout is None else timeout)
+
+
+class _BoundedHTTPSPool(HTTPSConnectionPool):
+    def _get_conn(self, timeout=None):
+        return super()._get_conn(HTTP_POOL_TIMEOUT_SECONDS if timeout is None else timeout)
+
+
+class BoundedPoolAdapter(HTTPAdapter):
+    """HTTPAdapter whose blocking pools wait at most HTTP_POOL_TIMEOUT_SECONDS."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _BoundedHTTPPool,
+            "https": _BoundedHTTPSPool,
+        }
+
+
+def create_session() -> requests.Session:
+    """Build a session with per-host connection limits and retry/backoff."""
+    retry = CappedRetry(
+        total=HTTP_RETRIES,
+        connect=HTTP_RETRIES,
+        read=HTTP_RETRIES,
+        status=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF_SECONDS,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    # pool_block makes threads wait (boundedly) for a free connection rather than
+    # opening throwaway ones beyond the per-host limit
+    adapter = BoundedPoolAdapter(
+        pool_connections=HTTP_POOL_HOSTS,
+        pool_maxsize=HTTP_POOL_PER_HOST,
+        max_retries=retry,
+        pool_block=True,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(
+        {
+            "User-Agent": DEFAULT_USER_AGENT,
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        }
+    )
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """Return the process-wide session (recreated after fork)."""
+    global _SESSION, _SESSION_PID
+    pid = os.getpid()
+    if _SESSION is not None and pid == _SESSION_PID:
+        return _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None or pid != _SESSION_PID:
+            _SESSION = create_session()
+            _SESSION_PID = pid
+        return _SESSION
@@ -28,8 +28,7 @@ class IndeedSource(JobSource):
             if location:
                 params["l"] = location
 
-            headers = {"User-Agent": "Mosaic Career Platform (contact@whatismydelta.com)"}
-            response = requests.get(self.xml_url, params=params, headers=headers, timeout=10)
+            response = self._get(self.xml_url, params=params, timeout=10)
             response.raise_for_status()
 
             root = ET.fromstring(response.content)
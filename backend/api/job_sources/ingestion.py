@@ -0,0 +1,162 @@
+"""
+Background job feed ingestion.
+Periodically pulls each feed source, dedupes the postings and upserts them
+into the local job store. A Postgres advisory lock makes sure only one worker
+ingests at a time; every worker then syncs its in-process search index.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from ..storage import advisory_lock
+from .base import JobSource
+from .greenhouse import GreenhouseSource
+from .hackernews import HackerNewsSource
+from .reddit import RedditSource
+from .remoteok import RemoteOKSource
+from .search_index import JobSearchIndex, job_search_index
+from .store import JobStore, dedupe, job_store
+
+
+INGEST_ENABLED = os.getenv("JOB_INGEST_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+INGEST_INTERVAL_SECONDS = float(os.getenv("JOB_INGEST_INTERVAL_SECONDS", "900"))
+INGEST_FEED_LIMIT = int(os.getenv("JOB_INGEST_FEED_LIMIT", "500"))
+# Postings missing from feeds for this long are treated as filled or withdrawn
+INGEST_RETENTION_HOURS = float(os.getenv("JOB_INGEST_RETENTION_HOURS", "72"))
+INGEST_LOCK_ID = 7301
+
+# Sources that can be read without an API key
+FEED_SOURCES: Dict[str, Callable[[], JobSource]] = {
+    "greenhouse": GreenhouseSource,
+    "reddit": RedditSource,
+    "remoteok": RemoteOKSource,
+    "hackernews": HackerNewsSource,
+}
+
+
+@dataclass
+class IngestReport:
+    """Outcome of ingesting one source."""
+
+    source: str
+    fetched: int = 0
+    stored: int = 0
+    expired: int = 0
+    duration_ms: float = 0.0
+    error: Optional[str] = None
+
+
+class JobIngestor:
+    """Runs feed ingestion on a background thread."""
+
+    def __init__(
+        self,
+        store: JobStore = job_store,
+        sources: Dict[str, Callable[[], JobSource]] = FEED_SOURCES,
+        interval_seconds: float = INGEST_INTERVAL_SECONDS,
+        index: Optional[JobSearchIndex] = job_search_index,
+    ):
+        self.store = store
+        self.index = index
+        self.sources = sources
+        self.interval_seconds = interval_seconds
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.last_run: Optional[float] = None
+        self.last_reports: List[IngestReport] = []
+        self.runs = 0
+        self.skipped = 0
+
+    def ingest_source(self, name: str) -> IngestReport:
+        """Fetch one feed and upsert its postings."""
+        start = time.monotonic()
+        report = IngestReport(name)
+        try:
+            jobs = self.sources[name]().fetch_feed(INGEST_FEED_LIMIT)
+            report.fetched = len(jobs)
+            report.stored = self.store.upsert(dedupe(jobs))
+            # An empty feed usually means the upstream failed; keep what we have
+            if jobs:
+                report.expired = self.store.expire(name, INGEST_RETENTION_HOURS)
+        except Exception as e:
+            print(f"Error ingesting {name} jobs: {e}")
+            report.error = str(e)
+        report.duration_ms = round((time.monotonic() - start) * 1000, 1)
+        return report
+
+    def run_once(self) -> List[IngestReport]:
+        """Ingest every source concurrently."""
+        workers = max(1, len(self.sources))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job-ingest") as ex:
+            reports = list(ex.map(self.ingest_source, self.sources))
+        self.last_run = time.time()
+        self.last_reports = reports
+        self.runs += 1
+        return reports
+
+    def run_locked(self) -> Optional[List[IngestReport]]:
+        """run_once unless another worker holds the ingestion lock."""
+        with advisory_lock(INGEST_LOCK_ID) as acquired:
+            if not acquired:
+                self.skipped += 1
+                return None
+            return self.run_once()
+
+    def sync_index(self):
+        """Bring this worker's search index up to date with the store."""
+        if self.index is None:
+            return
+        try:
+            self.index.sync(self.store)
+        except Exception as e:
+            print(f"Error syncing job search index: {e}")
+
+    def _loop(self):
+        while not self._stop.is_set():
+            # Load what other workers already ingested before this worker's own run
+            self.sync_index()
+            try:
+                reports = self.run_locked()
+                if reports:
+                    print(f"Job ingestion: {[asdict(r) for r in reports]}")
+                    self.sync_index()
+            except Exception as e:
+                print(f"Error running job ingestion: {e}")
+            self._stop.wait(self.interval_seconds)
+
+    def start(self) -> bool:
+        """Start the ingestion thread once per process."""
+        if not INGEST_ENABLED or (self._thread is not None and self._thread.is_alive()):
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="job-ingestion", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": INGEST_ENABLED,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "interval_seconds": self.interval_seconds,
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "last_run": self.last_run,
+            "last_reports": [asdict(r) for r in self.last_reports],
+            "index": self.index.get_stats() if self.index is not None else None,
+        }
+
+
+# Global ingestor started by the API on startup
+job_ingestor = JobIngestor()
+
+
+def get_ingestion_stats() -> Dict[str, Any]:
+    """Get job ingestion statistics."""
+    return job_ingestor.get_stats()
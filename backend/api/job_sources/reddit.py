@@ -26,64 +26,50 @@ class RedditSource(JobSource):
             all_jobs = []
             query_lower = query.lower() if query else ""
 
-            for subreddit in self.subreddits:
-                if len(all_jobs) >= limit:
-                    break
-
-                try:
-                    url = f"https://www.reddit.com/r/{subreddit}/new.json"
-                    headers = {"User-Agent": "Mosaic Career Platform (contact@whatismydelta.com)"}
-                    response = requests.get(url, headers=headers, params={"limit": 25}, timeout=10)
-                    response.raise_for_status()
-
-                    data = response.json()
-                    posts = data.get("data", {}).get("children", [])
-
-                    for post in posts:
-                        if len(all_jobs) >= limit:
-                            break
-
-                        post_data = post.get("data", {})
-                        title = post_data.get("title", "")
-                        selftext = post_data.get("selftext", "")
-
-                        # Filter: must be hiring post and match query
-                        if "[hiring]" not in title.lower() and "hiring" not in title.lower():
-                            continue
-
-                        if (
-                            query_lower
-                            and query_lower not in title.lower()
-                            and query_lower not in selftext.lower()
-                        ):
-                            continue
-
-                        # Extract company (heuristic)
-                        company = "Company"
-                        if "]" in title:
-                            parts = title.split("]", 1)
-                            if len(parts) > 1 and "-" in parts[1]:
-                                company = parts[1].split("-")[0].strip()
-
-                        job = {
-                            "id": f"reddit_{post_data.get('id', '')}",
-                            "title": title.replace("[HIRING]", "").replace("[Hiring]", "").strip(),
-                            "company": company,
-                            "location": (
-                                "Remote" if "remote" in title.lower() else "See description"
-                            ),
-                            "description": selftext[:500] if selftext else title,
-                            "url": f"https://reddit.com{post_data.get('permalink', '')}",
-                            "posted_date": datetime.fromtimestamp(post_data.get("created_utc", 0)),
-                            "remote": "remote" in title.lower() or "remote" in selftext.lower(),
-                            "skills": [],
-                            "experience_level": "mid",
-                        }
-
-                        all_jobs.append(self._normalize_job_data(job))
-
-                except requests.RequestException:
-                    continue
+            # Fetch all subreddits at once; filter in subreddit order
+            listings = self._map_concurrent(self._fetch_subreddit, self.subreddits)
+
+            for posts in listings:
+                for post in posts or []:
+                    if len(all_jobs) >= limit:
+                        break
+
+                    post_data = post.get("data", {})
+                    title = post_data.get("title", "")
+                    selftext = post_data.get("selftext", "")
+
+                    # Filter: must be hiring post and match query
+                    if "[hiring]" not in title.lower() and "hiring" not in title.lower():
+                        continue
+
+                    if (
+                        query_lower
+                        and query_lower not in title.lower()
+                        and query_lower not in selftext.lower()
+                    ):
+                        continue
+
+                    # Extract company (heuristic)
+                    company = "Company"
+                    if "]" in title:
+                        parts = title.split("]", 1)
+                        if len(parts) > 1 and "-" in parts[1]:
+                            company = parts[1].split("-")[0].strip()
+
+                    job = {
+                        "id": f"reddit_{post_data.get('id', '')}",
+                        "title": title.replace("[HIRING]", "").replace("[Hiring]", "").strip(),
+                        "company": company,
+                        "location": ("Remote" if "remote" in title.lower() else "See description"),
+                        "description": selftext[:500] if selftext else title,
+                        "url": f"https://reddit.com{post_data.get('permalink', '')}",
+                        "posted_date": datetime.fromtimestamp(post_data.get("created_utc", 0)),
+                        "remote": "remote" in title.lower() or "remote" in selftext.lower(),
+                        "skills": [],
+                        "experience_level": "mid",
+                    }
+
+                    all_jobs.append(self._normalize_job_data(job))
 
             return all_jobs
 
@@ -91,6 +77,16 @@ class RedditSource(JobSource):
             print(f"Error searching Reddit jobs: {e}")
             return []
 
+    def _fetch_subreddit(self, subreddit: str) -> List[dict]:
+        """Fetch the newest posts for one subreddit."""
+        try:
+            url = f"https://www.reddit.com/r/{subreddit}/new.json"
+            response = self._get(url, params={"limit": 25}, timeout=10)
+            response.raise_for_status()
+            return response.json().get("data", {}).get("children", [])
+        except requests.RequestException:
+            return []
+
     def get_job_details(self, job_id: str) -> Optional[JobPosting]:
         """Get detailed job information from Reddit - NOT IMPLEMENTED."""
         # Job details endpoint not implemented - users should click through to source URL
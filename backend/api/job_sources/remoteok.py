@@ -19,8 +19,7 @@ class RemoteOKSource(JobSource):
     def search_jobs(self, query: str, location: str = None, limit: int = 10) -> List[JobPosting]:
         """Search RemoteOK jobs via public API."""
         try:
-            headers = {"User-Agent": "Mosaic Career Platform (contact@whatismydelta.com)"}
-            response = requests.get(self.base_url, headers=headers, timeout=10)
+            response = self._get(self.base_url, timeout=10)
             response.raise_for_status()
 
             # RemoteOK returns JSON array, first item is metadata
@@ -0,0 +1,316 @@
+"""
+In-process inverted index over ingested job postings with BM25 ranking.
+Each worker keeps its own copy, synced incrementally from the job store, so
+/jobs/search ranks multi-word queries without a database round trip.
+Quoted phrases in a query must appear verbatim (after stemming) in one field.
+"""
+
+import math
+import os
+import re
+import threading
+from collections import defaultdict
+from dataclasses import replace
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .base import JobPosting
+from .cache import normalize
+from .store import JobStore, fingerprint
+
+
+BM25_K1 = float(os.getenv("JOB_INDEX_BM25_K1", "1.2"))
+BM25_B = float(os.getenv("JOB_INDEX_BM25_B", "0.75"))
+# Results only show a preview, so the index keeps this much of each description
+DESCRIPTION_PREVIEW_CHARS = int(os.getenv("JOB_INDEX_DESCRIPTION_CHARS", "500"))
+
+# Matches in a title count more than matches in a long description
+FIELD_WEIGHTS = {"title": 3.0, "skills": 2.0, "company": 1.5, "description": 1.0}
+# Position gap between fields so phrases never match across them
+_FIELD_GAP = 1000
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+_PHRASE = re.compile(r'"([^"]+)"')
+STOPWORDS = frozenset(
+    [
+        "a",
+        "an",
+        "and",
+        "are",
+        "as",
+        "at",
+        "be",
+        "by",
+        "for",
+        "from",
+        "in",
+        "is",
+        "it",
+        "of",
+        "on",
+        "or",
+        "that",
+        "the",
+        "this",
+        "to",
+        "with",
+    ]
+)
+
+
+def stem(word: str) -> str:
+    """Light suffix stripping so plurals and verb forms share a term."""
+    if len(word) <= 3 or not word.isalpha():
+        return word
+    for suffix, keep in (("ies", "y"), ("sses", "ss"), ("ing", ""), ("ed", ""), ("s", "")):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            if suffix == "s" and word.endswith(("ss", "us", "is")):
+                return word
+            return word[: -len(suffix)] + keep
+    return word
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercased, stemmed terms with stopwords removed."""
+    terms = []
+    for token in _TOKEN.findall((text or "").lower()):
+        token = token.rstrip(".")
+        if token and token not in STOPWORDS:
+            terms.append(stem(token))
+    return terms
+
+
+def parse_query(query: str) -> Tuple[List[str], List[List[str]]]:
+    """Split a query into scoring terms and quoted phrases."""
+    phrases = [tokenize(p) for p in _PHRASE.findall(query)]
+    terms = tokenize(_PHRASE.sub(" ", query)) + [t for phrase in phrases for t in phrase]
+    return terms, [p for p in phrases if len(p) > 1]
+
+
+class JobSearchIndex:
+    """Inverted index with positional postings and BM25 scoring.
+
+    Documents live in dense slots so scoring and filtering run as numpy array
+    operations; per-term arrays are rebuilt lazily after a term's postings change.
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        # term -> slot -> (weighted term frequency, positions)
+        self.postings: Dict[str, Dict[int, Tuple[float, List[int]]]] = defaultdict(dict)
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.slots: Dict[str, int] = {}
+        self.docs: List[Optional[JobPosting]] = []
+        self.doc_terms: List[List[str]] = []
+        self.fingerprints: List[str] = []
+        # normalized location -> id, so a location filter tests each place once
+        self.places: Dict[str, int] = {}
+        self._free: List[int] = []
+        self.lengths = np.zeros(0)
+        self.posted = np.zeros(0)
+        self.remote = np.zeros(0, dtype=bool)
+        self.place = np.zeros(0, dtype=np.int64)
+        self.alive = np.zeros(0, dtype=bool)
+        self.total_length = 0.0
+        self.synced_at: Optional[datetime] = None
+        self._lock = threading.RLock()
+        self.searches = 0
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def _analyze(self, job: JobPosting) -> Tuple[Dict[str, Tuple[float, List[int]]], float]:
+        fields = {
+            "title": job.title,
+            "skills": " ".join(job.skills or []),
+            "company": job.company,
+            "description": job.description,
+        }
+        terms: Dict[str, Tuple[float, List[int]]] = {}
+        length = 0.0
+        for offset, (field, text) in enumerate(fields.items()):
+            weight = FIELD_WEIGHTS[field]
+            for position, term in enumerate(tokenize(text)):
+                tf, positions = terms.get(term, (0.0, []))
+                positions.append(offset * _FIELD_GAP + position)
+                terms[term] = (tf + weight, positions)
+                length += weight
+        return terms, length
+
+    def _new_slot(self) -> int:
+        slot = len(self.docs)
+        if slot >= len(self.lengths):
+            size = max(1024, 2 * len(self.lengths))
+            for name in ("lengths", "posted", "remote", "place", "alive"):
+                array = getattr(self, name)
+                grown = np.zeros(size, dtype=array.dtype)
+                grown[: len(array)] = array
+                setattr(self, name, grown)
+        self.docs.append(None)
+        self.doc_terms.append([])
+        self.fingerprints.append("")
+        return slot
+
+    def add(self, job: JobPosting):
+        """Index a posting, replacing any earlier version with the same id."""
+        terms, length = self._analyze(job)
+        preview = replace(job, description=job.description[:DESCRIPTION_PREVIEW_CHARS])
+        location = normalize(job.location)
+        with self._lock:
+            self._remove(job.id)
+            slot = self._free.pop() if self._free else self._new_slot()
+            self.slots[job.id] = slot
+            self.docs[slot] = preview
+            self.doc_terms[slot] = list(terms)
+            self.fingerprints[slot] = fingerprint(job)
+            self.place[slot] = self.places.setdefault(location, len(self.places))
+            self.lengths[slot] = length
+            self.posted[slot] = job.posted_date.timestamp() if job.posted_date else 0.0
+            self.remote[slot] = bool(job.remote)
+            self.alive[slot] = True
+            for term, entry in terms.items():
+                self.postings[term][slot] = entry
+                self._arrays.pop(term, None)
+            self.total_length += length
+
+    def add_many(self, jobs: Sequence[JobPosting]):
+        for job in jobs:
+            self.add(job)
+
+    def remove(self, job_id: str) -> bool:
+        with self._lock:
+            return self._remove(job_id)
+
+    def _remove(self, job_id: str) -> bool:
+        slot = self.slots.pop(job_id, None)
+        if slot is None:
+            return False
+        for term in self.doc_terms[slot]:
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(slot, None)
+                if not docs:
+                    del self.postings[term]
+            self._arrays.pop(term, None)
+        self.total_length -= self.lengths[slot]
+        self.alive[slot] = False
+        self.docs[slot] = None
+        self.doc_terms[slot] = []
+        self._free.append(slot)
+        return True
+
+    def _term_arrays(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(slots, weighted term frequencies) for a term."""
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            docs = self.postings.get(term, {})
+            arrays = (
+                np.fromiter(docs.keys(), dtype=np.int64, count=len(docs)),
+                np.fromiter((tf for tf, _ in docs.values()), dtype=float, count=len(docs)),
+            )
+            self._arrays[term] = arrays
+        return arrays
+
+    def _has_phrase(self, slot: int, phrase: List[str]) -> bool:
+        entries = [self.postings.get(term, {}).get(slot) for term in phrase]
+        if not all(entries):
+            return False
+        starts = set(entries[0][1])
+        for shift, entry in enumerate(entries[1:], start=1):
+            starts &= {position - shift for position in entry[1]}
+            if not starts:
+                return False
+        return True
+
+    def _in_location(self, slots: np.ndarray, location: str) -> np.ndarray:
+        places = [place_id for place, place_id in self.places.items() if location in place]
+        return self.remote[slots] | np.isin(self.place[slots], places)
+
+    def search(
+        self, query: str, location: Optional[str] = None, limit: int = 10
+    ) -> List[JobPosting]:
+        """Top postings by BM25 score, one per cross-posted job."""
+        terms, phrases = parse_query(query)
+        location = normalize(location)
+        with self._lock:
+            self.searches += 1
+            if not self.slots:
+                return []
+            size = len(self.docs)
+            scores = np.zeros(size)
+            if terms:
+                mask = np.zeros(size, dtype=bool)
+                self._score(set(terms), scores, mask)
+            else:
+                # No scoring terms: newest postings that pass the filters
+                mask = self.alive[:size].copy()
+            for term in {term for phrase in phrases for term in phrase}:
+                has_term = np.zeros(size, dtype=bool)
+                has_term[self._term_arrays(term)[0]] = True
+                mask &= has_term
+            candidates = np.flatnonzero(mask)
+            if location:
+                candidates = candidates[self._in_location(candidates, location)]
+            # Over-fetch so dropping cross-posted duplicates still fills the page;
+            # phrase checks may reject any number of candidates, so those sort fully
+            keep = limit * 3
+            if not phrases and len(candidates) > keep:
+                primary = scores if terms else self.posted[:size]
+                top = np.argpartition(-primary[candidates], keep - 1)[:keep]
+                candidates = candidates[top]
+            order = np.lexsort((-self.posted[candidates], -scores[candidates]))
+
+            results, seen = [], set()
+            for slot in candidates[order]:
+                slot = int(slot)
+                if self.fingerprints[slot] in seen:
+                    continue
+                if phrases and not all(self._has_phrase(slot, p) for p in phrases):
+                    continue
+                seen.add(self.fingerprints[slot])
+                results.append(self.docs[slot])
+                if len(results) >= limit:
+                    break
+            return results
+
+    def _score(self, terms: Set[str], scores: np.ndarray, matched: np.ndarray):
+        """Add each term's BM25 contribution to scores and flag matching slots."""
+        n = len(self.slots)
+        size = len(scores)
+        avg_length = self.total_length / n or 1.0
+        norms = self.k1 * (1 - self.b + self.b * self.lengths[:size] / avg_length)
+        for term in terms:
+            slots, tfs = self._term_arrays(term)
+            if not len(slots):
+                continue
+            idf = math.log(1 + (n - len(slots) + 0.5) / (len(slots) + 0.5))
+            scores[slots] += idf * tfs * (self.k1 + 1) / (tfs + norms[slots])
+            matched[slots] = True
+
+    def sync(self, store: JobStore) -> Dict[str, int]:
+        """Pull postings changed since the last sync and drop ones the store expired."""
+        synced_at, changed = store.changed_since(self.synced_at)
+        self.add_many(changed)
+        live: Set[str] = store.ids()
+        with self._lock:
+            removed = [job_id for job_id in list(self.slots) if job_id not in live]
+            for job_id in removed:
+                self._remove(job_id)
+        self.synced_at = synced_at
+        return {"added": len(changed), "removed": len(removed)}
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "postings": len(self.slots),
+                "terms": len(self.postings),
+                "searches": self.searches,
+                "synced_at": self.synced_at.isoformat() if self.synced_at else None,
+            }
+
+
+# Global index each worker keeps in sync with the job store
+job_search_index = JobSearchIndex()
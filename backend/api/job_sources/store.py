@@ -0,0 +1,186 @@
+"""
+Local job store backed by the job_postings table (migration 009).
+Ingested postings are upserted here and searched with Postgres full-text
+search, so user searches never wait on upstream job boards.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from ..storage import get_conn
+from .base import JobPosting
+from .cache import normalize
+
+
+_COLUMNS = (
+    "id",
+    "source",
+    "title",
+    "company",
+    "location",
+    "description",
+    "url",
+    "posted_date",
+    "salary_range",
+    "job_type",
+    "remote",
+    "skills",
+    "experience_level",
+    "metadata",
+)
+# Columns whose change bumps updated_at (migration 010)
+_CONTENT_COLUMNS = ("title", "company", "location", "description", "skills", "remote")
+# Re-read window covering upserts that were still uncommitted at the last sync
+SYNC_OVERLAP_MINUTES = 10
+
+
+def fingerprint(job: JobPosting) -> str:
+    """Identity of a posting across sources: normalized title and company."""
+    return hashlib.sha256(f"{normalize(job.title)}|{normalize(job.company)}".encode()).hexdigest()
+
+
+def dedupe(jobs: Sequence[JobPosting]) -> List[JobPosting]:
+    """Drop repeated ids and cross-posted duplicates, keeping the first seen."""
+    seen = set()
+    unique = []
+    for job in jobs:
+        keys = (job.id, fingerprint(job))
+        if job.id and not seen.intersection(keys):
+            seen.update(keys)
+            unique.append(job)
+    return unique
+
+
+def _row(job: JobPosting) -> tuple:
+    return (
+        job.id,
+        job.source,
+        job.title,
+        job.company,
+        job.location,
+        job.description,
+        job.url,
+        job.posted_date,
+        job.salary_range,
+        job.job_type,
+        bool(job.remote),
+        json.dumps(job.skills or [], default=str),
+        job.experience_level,
+        json.dumps(job.metadata or {}, default=str),
+        fingerprint(job),
+    )
+
+
+def _job(row: Sequence[Any]) -> JobPosting:
+    data = dict(zip(_COLUMNS, row))
+    for key, empty in (("skills", []), ("metadata", {})):
+        value = data[key]
+        data[key] = json.loads(value) if isinstance(value, str) else (value or empty)
+    return JobPosting(**data)
+
+
+class JobStore:
+    """Upserts and full-text searches over job_postings."""
+
+    def upsert(self, jobs: Sequence[JobPosting]) -> int:
+        """Insert new postings and refresh last_seen_at on known ones."""
+        rows = [_row(job) for job in dedupe(jobs)]
+        if not rows:
+            return 0
+        columns = (*_COLUMNS, "fingerprint")
+        updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns if c != "id")
+        current = ", ".join(f"job_postings.{c}" for c in _CONTENT_COLUMNS)
+        incoming = ", ".join(f"EXCLUDED.{c}" for c in _CONTENT_COLUMNS)
+        with get_conn() as conn:
+            with conn.cursor() as cursor:
+                cursor.executemany(
+                    f"""INSERT INTO job_postings ({", ".join(columns)}, last_seen_at)
+                        VALUES ({", ".join(["%s"] * len(columns))}, NOW())
+                        ON CONFLICT (id) DO UPDATE SET {updates}, last_seen_at = NOW(),
+                        updated_at = CASE WHEN ({current}) IS DISTINCT FROM ({incoming})
+                            THEN NOW() ELSE job_postings.updated_at END""",
+                    rows,
+                )
+        return len(rows)
+
+    def expire(self, source: str, max_age_hours: float) -> int:
+        """Remove a source's postings not seen by recent ingestion runs."""
+        with get_conn() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """DELETE FROM job_postings
+                       WHERE source = %s AND last_seen_at < NOW() - make_interval(hours => %s)""",
+                    (source, max_age_hours),
+                )
+                return cursor.rowcount or 0
+
+    def search(
+        self, query: str, location: Optional[str] = None, limit: int = 10
+    ) -> List[JobPosting]:
+        """Best matches for the query, one per fingerprint, newest first on ties."""
+        rank, where, params = "0", [], []
+        if query.strip():
+            rank = "ts_rank(search_vector, websearch_to_tsquery('english', %s))"
+            where.append("search_vector @@ websearch_to_tsquery('english', %s)")
+            params += [query, query]
+        if location:
+            where.append("(location ILIKE %s OR remote)")
+            params.append(f"%{location}%")
+        columns = ", ".join(_COLUMNS)
+        with get_conn() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    f"""SELECT {columns} FROM (
+                            SELECT DISTINCT ON (fingerprint) {columns}, {rank} AS rank
+                            FROM job_postings
+                            {"WHERE " + " AND ".join(where) if where else ""}
+                            ORDER BY fingerprint, last_seen_at DESC
+                        ) matches
+                        ORDER BY rank DESC, posted_date DESC NULLS LAST
+                        LIMIT %s""",
+                    [*params, limit],
+                )
+                return [_job(row) for row in cursor.fetchall()]
+
+    def changed_since(self, since: Optional[datetime]) -> Tuple[datetime, List[JobPosting]]:
+        """Postings added or edited since the given sync time, plus the new sync time."""
+        with get_conn() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT NOW()")
+                now = cursor.fetchone()[0]
+                query = f"SELECT {', '.join(_COLUMNS)} FROM job_postings"
+                params: tuple = ()
+                if since is not None:
+                    query += " WHERE updated_at > %s - make_interval(mins => %s)"
+                    params = (since, SYNC_OVERLAP_MINUTES)
+                cursor.execute(query, params)
+                return now, [_job(row) for row in cursor.fetchall()]
+
+    def ids(self) -> Set[str]:
+        """Ids of every stored posting."""
+        with get_conn() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT id FROM job_postings")
+                return {row[0] for row in cursor.fetchall()}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Posting counts and freshness per source."""
+        with get_conn() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """SELECT source, COUNT(*), MAX(last_seen_at)
+                       FROM job_postings GROUP BY source"""
+                )
+                return {
+                    source: {
+                        "postings": count,
+                        "last_seen_at": last_seen.isoformat() if last_seen else None,
+                    }
+                    for source, count, last_seen in cursor.fetchall()
+                }
+
+
+# Global job store shared by ingestion and the search endpoint
+job_store = JobStore()
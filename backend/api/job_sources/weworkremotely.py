@@ -20,8 +20,7 @@ class WeWorkRemotelySource(JobSource):
     def search_jobs(self, query: str, location: str = None, limit: int = 10) -> List[JobPosting]:
         """Search WeWorkRemotely jobs via RSS feed."""
         try:
-            headers = {"User-Agent": "Mosaic Career Platform (contact@whatismydelta.com)"}
-            response = requests.get(self.rss_url, headers=headers, timeout=10)
+            response = self._get(self.rss_url, timeout=10)
             response.raise_for_status()
 
             # Parse RSS XML
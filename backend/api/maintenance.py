@@ -0,0 +1,267 @@
+"""
+Background maintenance scheduler for Mosaic 2.0.
+Periodic housekeeping (session expiry, upload and experiment cleanup,
+analytics retention, cache pruning) runs on one daemon thread per worker,
+off the request path. Each job takes a Postgres advisory lock so only one
+worker runs it at a time, works in small batches, and has its next run
+jittered so workers started together don't line up.
+"""
+
+import os
+import random
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from .storage import advisory_lock
+
+
+MAINTENANCE_ENABLED = os.getenv("MAINTENANCE_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+MAINTENANCE_TICK_SECONDS = float(os.getenv("MAINTENANCE_TICK_SECONDS", "15"))
+# Fraction of each interval added or removed at random
+MAINTENANCE_JITTER = float(os.getenv("MAINTENANCE_JITTER", "0.1"))
+MAINTENANCE_BATCH_SIZE = int(os.getenv("MAINTENANCE_BATCH_SIZE", "200"))
+# A job stops taking new batches after this long and resumes on its next run
+MAINTENANCE_JOB_BUDGET_SECONDS = float(os.getenv("MAINTENANCE_JOB_BUDGET_SECONDS", "20"))
+# Pause between batches so cleanup doesn't crowd out request queries
+MAINTENANCE_BATCH_PAUSE_SECONDS = float(os.getenv("MAINTENANCE_BATCH_PAUSE_SECONDS", "0.05"))
+SESSION_EXPIRY_INTERVAL_SECONDS = float(os.getenv("SESSION_EXPIRY_INTERVAL_SECONDS", "600"))
+UPLOAD_CLEANUP_INTERVAL_SECONDS = float(os.getenv("UPLOAD_CLEANUP_INTERVAL_SECONDS", "3600"))
+STALE_EXPERIMENT_DAYS = int(os.getenv("STALE_EXPERIMENT_DAYS", "30"))
+MAINTENANCE_LOCK_CLASS = 7302
+
+
+@dataclass
+class Job:
+    """A periodic maintenance job and its run history."""
+
+    name: str
+    fn: Callable[[], Any]
+    interval_seconds: float
+    next_run: float
+    runs: int = 0
+    failures: int = 0
+    skipped_locked: int = 0
+    last_run: Optional[str] = None
+    last_duration_ms: Optional[float] = None
+    total_duration_ms: float = 0.0
+    last_result: Any = None
+    last_error: Optional[str] = None
+
+
+def run_batches(
+    batch: Callable[[], int],
+    budget_seconds: float = MAINTENANCE_JOB_BUDGET_SECONDS,
+    pause_seconds: float = MAINTENANCE_BATCH_PAUSE_SECONDS,
+) -> Dict[str, Any]:
+    """Call batch until it returns 0 or the time budget runs out."""
+    deadline = time.monotonic() + budget_seconds
+    total = batches = 0
+    while True:
+        done = batch()
+        batches += 1
+        total += done
+        if not done:
+            return {"processed": total, "batches": batches, "complete": True}
+        if time.monotonic() >= deadline:
+            return {"processed": total, "batches": batches, "complete": False}
+        time.sleep(pause_seconds)
+
+
+class MaintenanceScheduler:
+    """Runs registered jobs on a background thread, one worker per job at a time."""
+
+    def __init__(
+        self,
+        tick_seconds: float = MAINTENANCE_TICK_SECONDS,
+        jitter: float = MAINTENANCE_JITTER,
+        locking: bool = True,
+    ):
+        self.tick_seconds = tick_seconds
+        self.jitter = jitter
+        self.locking = locking
+        self.jobs: Dict[str, Job] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _jittered(self, seconds: float) -> float:
+        return seconds * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[[], Any],
+        interval_seconds: float,
+        initial_delay: Optional[float] = None,
+    ):
+        """Register fn to run every interval_seconds, first after initial_delay."""
+        delay = self._jittered(interval_seconds if initial_delay is None else initial_delay)
+        self.jobs[name] = Job(name, fn, interval_seconds, time.monotonic() + delay)
+
+    @contextmanager
+    def _job_lock(self, name: str) -> Iterator[bool]:
+        """Hold a session advisory lock for the job; yields False if another worker has it."""
+        if not self.locking:
+            yield True
+            return
+        # Own autocommit connection: the job's queries commit on pooled connections
+        # without leaving this one idle in a transaction for the whole run
+        with advisory_lock(MAINTENANCE_LOCK_CLASS, zlib.crc32(name.encode()) & 0x7FFFFFFF) as held:
+            yield held
+
+    def run_job(self, name: str) -> bool:
+        """Run one job now under its lock; False if it was skipped or failed."""
+        job = self.jobs[name]
+        job.next_run = time.monotonic() + self._jittered(job.interval_seconds)
+        try:
+            with self._job_lock(name) as acquired:
+                if not acquired:
+                    job.skipped_locked += 1
+                    return False
+                start = time.monotonic()
+                job.last_run = datetime.utcnow().isoformat() + "Z"
+                try:
+                    job.last_result = job.fn()
+                    job.last_error = None
+                    return True
+                except Exception as e:
+                    job.failures += 1
+                    job.last_error = str(e)
+                    print(f"⚠️ Maintenance job {name} failed: {e}")
+                    return False
+                finally:
+                    job.runs += 1
+                    job.last_duration_ms = round((time.monotonic() - start) * 1000, 1)
+                    job.total_duration_ms += job.last_duration_ms
+        except Exception as e:
+            # Couldn't reach the database to take the lock; try again next interval
+            job.failures += 1
+            job.last_error = f"lock failed: {e}"
+            print(f"⚠️ Maintenance job {name} could not take its lock: {e}")
+            return False
+
+    def run_pending(self) -> int:
+        """Run every job that is due; returns how many ran successfully."""
+        now = time.monotonic()
+        due = [job.name for job in self.jobs.values() if job.next_run <= now]
+        return sum(self.run_job(name) for name in due)
+
+    def _loop(self):
+        while not self._stop.wait(self.tick_seconds):
+            self.run_pending()
+
+    def start(self) -> bool:
+        """Start the scheduler thread once per process."""
+        if not MAINTENANCE_ENABLED or (self._thread is not None and self._thread.is_alive()):
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="maintenance", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "enabled": MAINTENANCE_ENABLED,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "jobs": {
+                name: {
+                    "interval_seconds": job.interval_seconds,
+                    "next_run_in_seconds": round(max(job.next_run - now, 0.0), 1),
+                    "runs": job.runs,
+                    "failures": job.failures,
+                    "skipped_locked": job.skipped_locked,
+                    "last_run": job.last_run,
+                    "last_duration_ms": job.last_duration_ms,
+                    "avg_duration_ms": round(job.total_duration_ms / job.runs, 1)
+                    if job.runs
+                    else None,
+                    "last_result": job.last_result,
+                    "last_error": job.last_error,
+                }
+                for name, job in self.jobs.items()
+            },
+        }
+
+
+def _expire_sessions() -> Dict[str, Any]:
+    from .storage import purge_expired_sessions
+
+    files = 0
+
+    def batch() -> int:
+        nonlocal files
+        purged = purge_expired_sessions(MAINTENANCE_BATCH_SIZE)
+        files += purged["files"]
+        return purged["sessions"]
+
+    return {**run_batches(batch), "files": files}
+
+
+def _delete_orphan_uploads() -> Dict[str, Any]:
+    from .storage import delete_orphan_uploads
+
+    return {"files": delete_orphan_uploads(batch_size=MAINTENANCE_BATCH_SIZE)}
+
+
+def _clean_stale_experiments() -> Dict[str, Any]:
+    from .self_efficacy_engine import cleanup_stale_experiments
+
+    def batch() -> int:
+        result = cleanup_stale_experiments(STALE_EXPERIMENT_DAYS, MAINTENANCE_BATCH_SIZE)
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        return result["cleaned"]
+
+    return run_batches(batch)
+
+
+def _analytics_retention() -> Dict[str, Any]:
+    from .analytics_store import run_maintenance
+
+    return run_maintenance()
+
+
+def _prune_caches() -> Dict[str, Any]:
+    from .job_sources.cache import job_search_cache
+    from .prompt_selector import prompt_selector
+
+    return {"prompt_cache": prompt_selector.prune_cache(), "job_cache": job_search_cache.prune()}
+
+
+def _prune_embedding_cache() -> Dict[str, Any]:
+    from .embedding_cache import embedding_cache
+
+    return run_batches(lambda: embedding_cache.prune(MAINTENANCE_BATCH_SIZE))
+
+
+def register_default_jobs(scheduler: "MaintenanceScheduler"):
+    # Staggered first runs keep a fresh worker's first minutes quiet
+    scheduler.add("session_expiry", _expire_sessions, SESSION_EXPIRY_INTERVAL_SECONDS, 60)
+    scheduler.add("orphan_uploads", _delete_orphan_uploads, UPLOAD_CLEANUP_INTERVAL_SECONDS, 300)
+    scheduler.add("stale_experiments", _clean_stale_experiments, 6 * 3600, 600)
+    scheduler.add("analytics_retention", _analytics_retention, 3600, 120)
+    scheduler.add("cache_prune", _prune_caches, 3600, 900)
+    scheduler.add("embedding_cache_prune", _prune_embedding_cache, 3600, 1200)
+
+
+# Global scheduler instance
+maintenance_scheduler = MaintenanceScheduler()
+register_default_jobs(maintenance_scheduler)
+
+
+def get_maintenance_stats() -> Dict[str, Any]:
+    """Get maintenance job stats from the global scheduler."""
+    return maintenance_scheduler.get_stats()
@@ -8,7 +8,8 @@ import time
 from datetime import datetime
 from typing import Any, Dict
 
-from .prompt_selector import get_prompt_health, get_prompt_response
+from .feature_flags import feature_flags
+from .prompt_selector import get_prompt_health, get_prompt_response, prompt_selector
 from .storage import get_conn
 
 
@@ -39,7 +40,7 @@ class PromptMonitor:
                             try:
                                 with open(version["file"], encoding="utf-8") as f:
                                     prompts_data = json.load(f)
-                                csv_prompts = {"prompts": prompts_data}
+                                csv_prompts = {"prompts": prompts_data, "sha256": active_sha}
                                 break
                             except Exception:
                                 continue
@@ -111,12 +112,9 @@ class PromptMonitor:
         recovery_actions = []
 
         try:
-            # 1. Clear prompt cache
-            with get_conn() as conn:
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM prompt_selector_cache")
-                result = cursor.rowcount
-                recovery_actions.append(f"Cleared {result} cache entries")
+            # 1. Clear prompt cache (memory and table)
+            result = prompt_selector.clear_cache()
+            recovery_actions.append(f"Cleared {result} cache entries")
 
             # 2. Ensure AI fallback is enabled
             with get_conn() as conn:
@@ -128,7 +126,8 @@ class PromptMonitor:
                     WHERE flag_name = 'AI_FALLBACK_ENABLED'
                 """
                 )
-                recovery_actions.append("Enabled AI fallback")
+            feature_flags.refresh()
+            recovery_actions.append("Enabled AI fallback")
 
             # 3. Test system again
             test_result = self.test_prompt_system()
@@ -2,11 +2,25 @@ import csv
 import hashlib
 import json
 import os
-from typing import Dict, List
+import threading
+from typing import Callable, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ships with the API image
+    np = None
 
 REQUIRED_COLS = ["prompt", "completion", "tag"]
 REGISTRY_FILE = "data/prompts_registry.json"
 
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_BATCH_SIZE = 256
+
+# Loaded embedding matrices keyed by prompts SHA (memory-mapped, read-only)
+_EMBEDDING_MATRICES: Dict[str, "np.ndarray"] = {}
+_EMBEDDING_LOCK = threading.Lock()
+_BUILD_LOCK = threading.Lock()
+
 
 def sha256_file(path: str) -> str:
     h = hashlib.sha256()
@@ -16,6 +30,15 @@ def sha256_file(path: str) -> str:
     return h.hexdigest()
 
 
+def prompts_digest(rows: List[Dict[str, str]]) -> str:
+    """Content hash of the prompt texts, for rows that have no registry SHA."""
+    h = hashlib.sha256()
+    for row in rows:
+        h.update((row.get("prompt") or "").encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
 def load_csv(path: str) -> List[Dict[str, str]]:
     with open(path, newline="", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -59,12 +82,148 @@ def ingest_prompts(csv_path: str):
     out = f"data/prompts_{digest[:12]}.json"
     with open(out, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False)
-    reg["versions"].append({"sha256": digest, "file": out})
+    version = {"sha256": digest, "file": out}
+    # Build the embedding matrix once per version; a failure here (no API key,
+    # OpenAI outage) is not fatal - the matrix is built lazily on first search.
+    try:
+        if build_prompt_embeddings(digest, data):
+            version["embeddings"] = embeddings_path(digest)
+    except Exception as e:
+        print(f"⚠️ Prompt embeddings not built for {digest[:12]}: {e}")
+    reg["versions"].append(version)
     reg["active"] = digest
     write_registry(reg)
-    return {"status": "ok", "active": digest, "file": out}
+    return {"status": "ok", "active": digest, "file": out, "embeddings": version.get("embeddings")}
 
 
 def get_active():
     reg = read_registry()
     return {"active": reg.get("active")}
+
+
+def embeddings_path(digest: str) -> str:
+    """Path of the embedding matrix stored next to data/prompts_<sha>.json."""
+    return f"data/prompts_{digest[:12]}.npy"
+
+
+def _embed_texts(texts: List[str]) -> List[List[float]]:
+    """Embed a batch of texts with a single OpenAI request."""
+    import openai
+
+    from .settings import get_settings
+
+    settings = get_settings()
+    if not settings.OPENAI_API_KEY:
+        raise ValueError("OpenAI API key not configured")
+
+    client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+    response = client.embeddings.create(model=EMBEDDING_MODEL, input=texts)
+    return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+
+def _normalize_rows(matrix: "np.ndarray") -> "np.ndarray":
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+def build_prompt_embeddings(
+    digest: str,
+    rows: List[Dict[str, str]],
+    embed_fn: Optional[Callable[[List[str]], List[List[float]]]] = None,
+) -> Optional[str]:
+    """Embed every prompt row and persist an L2-normalized float32 matrix.
+
+    Row i of the matrix corresponds to rows[i]; rows without prompt text get a
+    zero vector so they can never win a similarity search.
+    """
+    if np is None:
+        return None
+
+    embed_fn = embed_fn or _embed_texts
+    texts = [(row.get("prompt") or "").strip() for row in rows]
+    indexed = [(i, text) for i, text in enumerate(texts) if text]
+    if not indexed:
+        return None
+
+    vectors: Dict[int, List[float]] = {}
+    for start in range(0, len(indexed), EMBEDDING_BATCH_SIZE):
+        batch = indexed[start : start + EMBEDDING_BATCH_SIZE]
+        embeddings = embed_fn([text for _, text in batch])
+        if len(embeddings) != len(batch):
+            raise ValueError("Embedding response size does not match request")
+        for (i, _), embedding in zip(batch, embeddings):
+            vectors[i] = embedding
+
+    dim = len(next(iter(vectors.values())))
+    matrix = np.zeros((len(rows), dim), dtype=np.float32)
+    for i, embedding in vectors.items():
+        matrix[i] = embedding
+    matrix = _normalize_rows(matrix)
+
+    path = embeddings_path(digest)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, matrix)
+    os.replace(tmp_path, path)
+
+    with _EMBEDDING_LOCK:
+        _EMBEDDING_MATRICES.pop(digest, None)
+    return path
+
+
+def load_prompt_embeddings(digest: str, expected_rows: Optional[int] = None):
+    """Memory-map the persisted embedding matrix for a prompts version."""
+    if np is None:
+        return None
+
+    with _EMBEDDING_LOCK:
+        matrix = _EMBEDDING_MATRICES.get(digest)
+    if matrix is None:
+        path = embeddings_path(digest)
+        if not os.path.exists(path):
+            return None
+        try:
+            matrix = np.load(path, mmap_mode="r")
+        except Exception as e:
+            print(f"⚠️ Failed to load prompt embeddings {path}: {e}")
+            return None
+        with _EMBEDDING_LOCK:
+            _EMBEDDING_MATRICES[digest] = matrix
+
+    if expected_rows is not None and matrix.shape[0] != expected_rows:
+        return None
+    return matrix
+
+
+def get_prompt_embeddings(
+    digest: str,
+    rows: List[Dict[str, str]],
+    embed_fn: Optional[Callable[[List[str]], List[List[float]]]] = None,
+):
+    """Return the embedding matrix for a prompts version, building it if missing."""
+    matrix = load_prompt_embeddings(digest, expected_rows=len(rows))
+    if matrix is not None:
+        return matrix
+
+    # Serialize builds so concurrent first requests don't all embed the library
+    with _BUILD_LOCK:
+        matrix = load_prompt_embeddings(digest, expected_rows=len(rows))
+        if matrix is None and build_prompt_embeddings(digest, rows, embed_fn):
+            matrix = load_prompt_embeddings(digest, expected_rows=len(rows))
+    return matrix
+
+
+def top_k_prompts(matrix, query_embedding: List[float], k: int = 1) -> List[tuple]:
+    """Return [(row_index, cosine_similarity)] for the k best rows, best first."""
+    query = np.asarray(query_embedding, dtype=np.float32)
+    norm = np.linalg.norm(query)
+    if norm == 0:
+        return []
+    scores = matrix @ (query / norm)
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return []
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return [(int(i), float(scores[i])) for i in top]
@@ -0,0 +1,324 @@
+"""
+Latency-aware routing across AI providers for Mosaic 2.0.
+Tracks EWMA latency and error rate per provider, orders providers fastest
+healthy first, fires a hedged request at the next provider when the first has
+not answered by its p95 latency, and opens a circuit breaker on providers that
+keep failing.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+EWMA_ALPHA = float(os.getenv("AI_ROUTING_EWMA_ALPHA", "0.2"))
+HEDGING_ENABLED = os.getenv("AI_HEDGING_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+HEDGE_DEFAULT_MS = float(os.getenv("AI_HEDGE_DEFAULT_MS", "2500"))
+HEDGE_MIN_MS = float(os.getenv("AI_HEDGE_MIN_MS", "800"))
+HEDGE_MAX_MS = float(os.getenv("AI_HEDGE_MAX_MS", "10000"))
+BREAKER_FAILURES = int(os.getenv("AI_BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN_SECONDS = float(os.getenv("AI_BREAKER_COOLDOWN_SECONDS", "30"))
+# Threads for sync provider calls. Hedge losers keep their slot until they finish,
+# so when every slot is busy calls run on the caller's thread without a hedge
+AI_ROUTING_MAX_WORKERS = int(os.getenv("AI_ROUTING_MAX_WORKERS", "16"))
+
+# Samples needed before the observed p95 replaces HEDGE_DEFAULT_MS
+MIN_P95_SAMPLES = 20
+
+SyncCall = Tuple[str, Callable[[], Optional[str]]]
+AsyncCall = Tuple[str, Callable[[], Awaitable[Optional[str]]]]
+
+
+class ProviderStats:
+    """Latency and health of one provider."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.ewma_latency_ms: Optional[float] = None
+        self.error_rate = 0.0
+        self.latencies: deque = deque(maxlen=200)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    def p95_ms(self) -> Optional[float]:
+        if len(self.latencies) < MIN_P95_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def circuit_state(self, now: float) -> str:
+        if self.consecutive_failures < BREAKER_FAILURES:
+            return "closed"
+        return "open" if now < self.open_until else "half_open"
+
+
+class ProviderRouter:
+    """Chooses provider order and runs hedged calls."""
+
+    def __init__(
+        self,
+        providers: Sequence[str],
+        alpha: float = EWMA_ALPHA,
+        hedging_enabled: bool = HEDGING_ENABLED,
+        max_workers: int = AI_ROUTING_MAX_WORKERS,
+    ):
+        self.alpha = alpha
+        self.hedging_enabled = hedging_enabled
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._stats: Dict[str, ProviderStats] = {name: ProviderStats(name) for name in providers}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="ai-provider"
+        )
+        self._in_flight = 0
+
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.hedges_skipped = 0
+        self.inline_calls = 0
+
+    def record(self, provider: str, latency_ms: float, success: bool):
+        """Fold one call outcome into the provider's EWMA, p95 and breaker state."""
+        with self._lock:
+            stats = self._stats[provider]
+            stats.requests += 1
+            stats.error_rate += self.alpha * ((0.0 if success else 1.0) - stats.error_rate)
+            if success:
+                stats.latencies.append(latency_ms)
+                stats.ewma_latency_ms = (
+                    latency_ms
+                    if stats.ewma_latency_ms is None
+                    else stats.ewma_latency_ms + self.alpha * (latency_ms - stats.ewma_latency_ms)
+                )
+                stats.consecutive_failures = 0
+                return
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            if stats.consecutive_failures >= BREAKER_FAILURES:
+                stats.open_until = time.monotonic() + BREAKER_COOLDOWN_SECONDS
+
+    def is_open(self, provider: str) -> bool:
+        """True while the breaker is rejecting calls (half-open counts as closed)."""
+        return self._stats[provider].circuit_state(time.monotonic()) == "open"
+
+    def allow(self, provider: str) -> bool:
+        """Admit a call; a half-open breaker lets one probe through per cooldown."""
+        now = time.monotonic()
+        with self._lock:
+            stats = self._stats[provider]
+            state = stats.circuit_state(now)
+            if state == "open":
+                return False
+            if state == "half_open":
+                stats.open_until = now + BREAKER_COOLDOWN_SECONDS
+            return True
+
+    def rank(self, providers: Sequence[str]) -> List[str]:
+        """Providers with closed breakers, fastest first after penalizing errors."""
+
+        def score(name: str) -> float:
+            stats = self._stats[name]
+            latency = stats.ewma_latency_ms
+            if latency is None:
+                latency = HEDGE_DEFAULT_MS
+            return latency * (1 + 4 * stats.error_rate)
+
+        # sorted() is stable, so the configured order breaks ties
+        return sorted((p for p in providers if not self.is_open(p)), key=score)
+
+    def hedge_delay(self, provider: str) -> float:
+        """Seconds to wait on a provider before hedging: its p95, clamped."""
+        p95 = self._stats[provider].p95_ms()
+        delay_ms = HEDGE_DEFAULT_MS if p95 is None else p95
+        return min(max(delay_ms, HEDGE_MIN_MS), HEDGE_MAX_MS) / 1000
+
+    def _timed(self, provider: str, fn: Callable[[], Optional[str]]) -> Optional[str]:
+        start = time.monotonic()
+        try:
+            response = fn()
+        except Exception as e:
+            print(f"⚠️ {provider} call failed: {e}")
+            response = None
+        self.record(provider, (time.monotonic() - start) * 1000, bool(response))
+        return response
+
+    async def _timed_async(
+        self, provider: str, fn: Callable[[], Awaitable[Optional[str]]]
+    ) -> Optional[str]:
+        start = time.monotonic()
+        try:
+            response = await fn()
+        except asyncio.CancelledError:
+            # Lost a hedge race; says nothing about the provider's health
+            raise
+        except Exception as e:
+            print(f"⚠️ {provider} call failed: {e}")
+            response = None
+        self.record(provider, (time.monotonic() - start) * 1000, bool(response))
+        return response
+
+    def _next_call(self, queue: list):
+        """Pop the next call whose breaker admits it, or None."""
+        while queue:
+            provider, fn = queue.pop(0)
+            if self.allow(provider):
+                return provider, fn
+        return None
+
+    async def run_async(
+        self, provider: str, fn: Callable[[], Awaitable[Optional[str]]]
+    ) -> Optional[str]:
+        """Run a single call outside a hedge (e.g. a stream), recording its outcome."""
+        if not self.allow(provider):
+            return None
+        return await self._timed_async(provider, fn)
+
+    def _note_winner(self, calls, provider: str, hedged: bool):
+        if hedged and provider != calls[0][0]:
+            with self._lock:
+                self.hedge_wins += 1
+
+    def _submit(self, provider: str, fn: Callable[[], Optional[str]]):
+        """Run a call on a free pool thread; (future, started) or None if all are busy.
+
+        Only submitting to a free thread means a call never queues behind
+        hedge losers that are still running.
+        """
+        with self._lock:
+            if self._in_flight >= self.max_workers:
+                return None
+            self._in_flight += 1
+        started = threading.Event()
+
+        def _run():
+            started.set()
+            try:
+                return self._timed(provider, fn)
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+
+        return self._executor.submit(_run), started
+
+    def call(self, calls: Sequence[SyncCall]) -> Tuple[Optional[str], Optional[str]]:
+        """Run calls in order with hedging; returns (provider, response) of the first answer.
+
+        A call still running when another answers is left to finish in the
+        background so its latency is still recorded.
+        """
+        queue = list(calls)
+        pending: Dict[Any, str] = {}
+        hedged = False
+        while True:
+            if not pending:
+                nxt = self._next_call(queue)
+                if nxt is None:
+                    return None, None
+                submitted = self._submit(*nxt)
+                if submitted is None:
+                    with self._lock:
+                        self.inline_calls += 1
+                    response = self._timed(*nxt)
+                    if response:
+                        return nxt[0], response
+                    continue
+                future, started = submitted
+                pending[future] = nxt[0]
+                # The hedge delay counts from when the call starts running
+                started.wait(HEDGE_MAX_MS / 1000)
+            last = list(pending.values())[-1]
+            timeout = self.hedge_delay(last) if queue and self.hedging_enabled else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                if self._in_flight >= self.max_workers:
+                    # No free thread to hedge on; wait for the running call instead
+                    with self._lock:
+                        self.hedges_skipped += 1
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                else:
+                    nxt = self._next_call(queue)
+                    submitted = self._submit(*nxt) if nxt is not None else None
+                    if submitted is not None:
+                        pending[submitted[0]] = nxt[0]
+                        hedged = True
+                        with self._lock:
+                            self.hedges += 1
+                        submitted[1].wait(HEDGE_MAX_MS / 1000)
+                    elif nxt is not None:
+                        queue.insert(0, nxt)  # Lost the last free thread to another call
+                    continue
+            for future in done:
+                provider = pending.pop(future)
+                response = future.result()
+                if response:
+                    self._note_winner(calls, provider, hedged)
+                    return provider, response
+
+    async def call_async(self, calls: Sequence[AsyncCall]) -> Tuple[Optional[str], Optional[str]]:
+        """Async variant of call; the losing request of a hedge is cancelled."""
+        queue = list(calls)
+        pending: Dict[asyncio.Future, str] = {}
+        hedged = False
+        try:
+            while True:
+                if not pending:
+                    nxt = self._next_call(queue)
+                    if nxt is None:
+                        return None, None
+                    pending[asyncio.ensure_future(self._timed_async(*nxt))] = nxt[0]
+                last = list(pending.values())[-1]
+                timeout = self.hedge_delay(last) if queue and self.hedging_enabled else None
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    nxt = self._next_call(queue)
+                    if nxt is not None:
+                        pending[asyncio.ensure_future(self._timed_async(*nxt))] = nxt[0]
+                        hedged = True
+                        with self._lock:
+                            self.hedges += 1
+                    continue
+                for task in done:
+                    provider = pending.pop(task)
+                    response = task.result()
+                    if response:
+                        self._note_winner(calls, provider, hedged)
+                        return provider, response
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-provider latency, error rate and breaker state for health checks."""
+        now = time.monotonic()
+        with self._lock:
+            providers = {
+                name: {
+                    "ewma_latency_ms": (
+                        round(s.ewma_latency_ms, 1) if s.ewma_latency_ms is not None else None
+                    ),
+                    "p95_ms": s.p95_ms(),
+                    "error_rate": round(s.error_rate, 3),
+                    "requests": s.requests,
+                    "failures": s.failures,
+                    "circuit": s.circuit_state(now),
+                }
+                for name, s in self._stats.items()
+            }
+            return {
+                "hedging_enabled": self.hedging_enabled,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "hedges_skipped": self.hedges_skipped,
+                "inline_calls": self.inline_calls,
+                "in_flight": self._in_flight,
+                "max_workers": self.max_workers,
+                "providers": providers,
+            }
@@ -33,7 +33,6 @@ import os
 import time
 from typing import Dict, List
 
-import anthropic
 from fastapi import APIRouter, Header, HTTPException
 from pydantic import BaseModel, Field, ValidationError
 
@@ -104,6 +103,9 @@ def retry_with_exponential_backoff(func, max_retries=MAX_RETRIES):
     Raises:
         Last exception if all retries exhausted
     """
+    # Imported on first use; the SDK adds about a second to API cold start
+    import anthropic
+
     for attempt in range(max_retries + 1):
         try:
             return func()
@@ -163,6 +165,8 @@ def extract_ps101_context_from_responses(ps101_responses: Dict[str, str]) -> PS1
         logger.error("CLAUDE_API_KEY not set in environment")
         raise HTTPException(status_code=500, detail="Claude API not configured")
 
+    import anthropic
+
     client = anthropic.Anthropic(api_key=api_key)
 
     extraction_prompt = f"""Analyze these career reflection responses and extract structured context.
@@ -6,7 +6,9 @@ Implements embedding pipeline, retrieval wrapper, and job feeds integration.
 import hashlib
 import json
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, Dict, List, Optional
@@ -14,9 +16,13 @@ from typing import Any, Dict, List, Optional
 from .ai_clients import get_ai_fallback_response
 from .cost_controls import check_cost_limits, check_resource_limits, record_usage
 from .domain_adjacent_search import discover_domain_adjacent_opportunities
+from .embedding_cache import embedding_cache
+from .feature_flags import feature_flags
 from .reranker import rerank_documents
-from .settings import get_settings
+from .settings import get_feature_flag, get_settings
 from .storage import get_conn
+from .vector_codec import decode_embedding, encode_float32, quantize_int8
+from .vector_index import VectorIndex
 
 
 @dataclass
@@ -28,6 +34,7 @@ class EmbeddingResult:
     hash: str
     created_at: str
     model: str = "text-embedding-3-small"
+    cached: bool = False
 
 
 @dataclass
@@ -47,9 +54,8 @@ class RAGEngine:
     def __init__(self):
         self.settings = get_settings()
         self.rag_enabled = self._check_feature_flag("RAG_BASELINE")
-        self.embedding_cache = {}
+        self.embedding_cache = embedding_cache  # Shared memory LRU + Postgres tier
         self.retrieval_cache = {}
-        self.cache_ttl = 24 * 60 * 60  # 24 hours
 
         # Rate limiting
         self.rate_limits = {
@@ -62,16 +68,29 @@ class RAGEngine:
         self.min_confidence_threshold = 0.7
         self.fallback_threshold = 0.5
 
+        # Vector index over the whole embeddings table, loaded incrementally
+        self.vector_index = VectorIndex()
+        self.index_refresh_interval = 30  # seconds between incremental loads
+        self.index_page_size = 5000
+        self.retrieval_candidates = 50  # Matches the reranker's candidate window
+        self._index_lock = threading.Lock()
+        self._index_watermark = None  # (created_at, text_hash) of the newest row loaded
+        self._index_synced_at = 0.0
+        # Deletes by other workers only show up in a full id scan, so run one less often
+        self.index_reconcile_interval = 300
+        self._index_reconciled_at = time.time()
+        self.store_int8_copy = get_feature_flag("EMBEDDING_STORE_INT8", False)
+
+        # Batched embedding requests (OpenAI accepts up to 2048 inputs per call)
+        self.embedding_cost = 0.0001  # $ per embedded text
+        self.batch_max_items = min(int(os.getenv("EMBEDDING_BATCH_MAX_ITEMS", "512")), 2048)
+        self.batch_max_tokens = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "100000"))
+        self.batch_max_in_flight = int(os.getenv("EMBEDDING_BATCH_MAX_IN_FLIGHT", "4"))
+        self._openai_client = None
+
     def _check_feature_flag(self, flag_name: str) -> bool:
         """Check if a feature flag is enabled."""
-        try:
-            with get_conn() as conn:
-                row = conn.execute(
-                    "SELECT enabled FROM feature_flags WHERE flag_name = ?", (flag_name,)
-                ).fetchone()
-                return row and row[0] if row else False
-        except Exception:
-            return False
+        return feature_flags.is_enabled(flag_name)
 
     def _check_rate_limit(self, operation: str) -> bool:
         """Check if we're within rate limits for an operation."""
@@ -92,26 +111,36 @@ class RAGEngine:
         return hashlib.sha256(text.encode()).hexdigest()
 
     def _get_cached_embedding(self, text_hash: str) -> Optional[List[float]]:
-        """Get cached embedding if available and not expired."""
-        if text_hash in self.embedding_cache:
-            cached_data = self.embedding_cache[text_hash]
-            if datetime.now().timestamp() - cached_data["timestamp"] < self.cache_ttl:
-                return cached_data["embedding"]
-        return None
+        """Get cached embedding from the shared embedding cache."""
+        vector = self.embedding_cache.get(text_hash)
+        return vector.tolist() if vector is not None else None
+
+    def _get_cached_embeddings(self, text_hashes: List[str]) -> Dict[str, List[float]]:
+        """Get cached embeddings for many hashes with one persistent-tier query."""
+        return {h: v.tolist() for h, v in self.embedding_cache.get_many(text_hashes).items()}
 
     def _cache_embedding(self, text_hash: str, embedding: List[float]):
-        """Cache embedding with timestamp."""
-        self.embedding_cache[text_hash] = {
-            "embedding": embedding,
-            "timestamp": datetime.now().timestamp(),
-        }
+        """Cache embedding in both cache tiers."""
+        self.embedding_cache.put(text_hash, embedding)
 
     def compute_embedding(self, text: str) -> Optional[EmbeddingResult]:
         """Compute embedding for text using OpenAI ADA model."""
         if not self.rag_enabled:
             return None
 
-        # Check cost limits first
+        # Check cache first; hits cost nothing and don't count toward any limit
+        text_hash = self._get_text_hash(text)
+        cached_embedding = self._get_cached_embedding(text_hash)
+        if cached_embedding:
+            return EmbeddingResult(
+                text=text,
+                embedding=cached_embedding,
+                hash=text_hash,
+                created_at=datetime.utcnow().isoformat(),
+                cached=True,
+            )
+
+        # Check cost limits
         cost_check = check_cost_limits("embedding", 0.0001)  # $0.0001 per embedding
         if not cost_check["allowed"]:
             print(f"Cost limit exceeded: {cost_check['reason']}")
@@ -128,18 +157,6 @@ class RAGEngine:
             return None
 
         try:
-            # Check cache first
-            text_hash = self._get_text_hash(text)
-            cached_embedding = self._get_cached_embedding(text_hash)
-
-            if cached_embedding:
-                record_usage("embedding", 0.0, True)  # Cache hit = no cost
-                return EmbeddingResult(
-                    text=text,
-                    embedding=cached_embedding,
-                    hash=text_hash,
-                    created_at=datetime.utcnow().isoformat(),
-                )
 
             # Generate embedding using OpenAI text-embedding-3-small
             try:
@@ -188,43 +205,255 @@ class RAGEngine:
             print(f"Error computing embedding: {e}")
             return None
 
-    def batch_compute_embeddings(self, texts: List[str]) -> List[EmbeddingResult]:
-        """Compute embeddings for multiple texts with rate limiting."""
-        results = []
+    def _estimate_tokens(self, text: str) -> int:
+        """Rough token estimate (~4 characters per token) used for batch packing."""
+        return len(text) // 4 + 1
 
+    def _pack_batches(self, texts: List[str]) -> List[List[str]]:
+        """Pack texts into batches bounded by item count and estimated tokens."""
+        batches, current, current_tokens = [], [], 0
         for text in texts:
-            if not self._check_rate_limit("embeddings"):
-                print("Rate limit exceeded, stopping batch processing")
-                break
+            tokens = self._estimate_tokens(text)
+            if current and (
+                len(current) >= self.batch_max_items
+                or current_tokens + tokens > self.batch_max_tokens
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(text)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of texts with one OpenAI request and record its usage once."""
+        cost = self.embedding_cost * len(texts)
+        try:
+            if self._openai_client is None:
+                import openai
 
-            embedding_result = self.compute_embedding(text)
-            if embedding_result:
-                results.append(embedding_result)
+                api_key = os.getenv("OPENAI_API_KEY")
+                if not api_key:
+                    raise ValueError("OPENAI_API_KEY not found in environment")
+                self._openai_client = openai.OpenAI(api_key=api_key)
 
-            # Rate limiting delay
-            time.sleep(0.1)
+            response = self._openai_client.embeddings.create(
+                model="text-embedding-3-small", input=texts
+            )
+            embeddings = [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+        except Exception:
+            record_usage("embedding", cost, False)
+            raise
 
-        return results
+        record_usage("embedding", cost, True)
+        return embeddings
+
+    def batch_compute_embeddings(self, texts: List[str]) -> List[EmbeddingResult]:
+        """Compute embeddings for multiple texts with batched, concurrent API requests."""
+        if not self.rag_enabled or not texts:
+            return []
+
+        # Dedupe by hash and serve cache hits without touching the API
+        created_at = datetime.utcnow().isoformat()
+        hashes = [self._get_text_hash(text) for text in texts]
+        embeddings: Dict[str, List[float]] = self._get_cached_embeddings(hashes)
+        cached_hashes = set(embeddings)
+        misses: Dict[str, str] = {}
+        for text, text_hash in zip(texts, hashes):
+            if text_hash not in embeddings:
+                misses[text_hash] = text
+
+        if misses:
+            cost_check = check_cost_limits("embedding", self.embedding_cost * len(misses))
+            resource_check = check_resource_limits("embedding")
+            if not cost_check["allowed"]:
+                print(f"Cost limit exceeded: {cost_check['reason']}")
+                misses = {}
+            elif not resource_check["allowed"]:
+                print(f"Resource limit exceeded: {resource_check['reason']}")
+                misses = {}
+
+        batches = []
+        for batch in self._pack_batches(list(misses.values())):
+            if not self._check_rate_limit("embeddings"):
+                print("Rate limit exceeded, stopping batch processing")
+                break
+            batches.append(batch)
+
+        if batches:
+            workers = max(1, min(self.batch_max_in_flight, len(batches)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [(batch, executor.submit(self._embed_batch, batch)) for batch in batches]
+                for batch, future in futures:
+                    try:
+                        computed = {
+                            self._get_text_hash(text): embedding
+                            for text, embedding in zip(batch, future.result())
+                        }
+                        self.embedding_cache.put_many(computed)
+                        embeddings.update(computed)
+                    except Exception as e:
+                        print(f"Error computing embedding batch of {len(batch)}: {e}")
+
+        # One result per input text, in input order
+        return [
+            EmbeddingResult(
+                text=text,
+                embedding=embeddings[text_hash],
+                hash=text_hash,
+                created_at=created_at,
+                cached=text_hash in cached_hashes,
+            )
+            for text, text_hash in zip(texts, hashes)
+            if text_hash in embeddings
+        ]
 
     def store_embedding(self, embedding_result: EmbeddingResult, metadata: Dict[str, Any] = None):
         """Store embedding in database with metadata."""
+        self.store_embeddings([(embedding_result, metadata)])
+
+    def store_embeddings(self, items: List[tuple]) -> int:
+        """Store many (EmbeddingResult, metadata) pairs in a single transaction."""
+        if not items:
+            return 0
         try:
-            with get_conn() as conn:
-                conn.execute(
-                    """INSERT OR REPLACE INTO embeddings
-                       (text_hash, text, embedding, model, metadata, created_at)
-                       VALUES (?, ?, ?, ?, ?, ?)""",
+            rows = []
+            for embedding_result, metadata in items:
+                # Optional int8 copy (4x smaller again) for memory-constrained loads
+                q8, q8_scale = None, None
+                if self.store_int8_copy:
+                    q8, q8_scale = quantize_int8(embedding_result.embedding)
+                rows.append(
                     (
                         embedding_result.hash,
                         embedding_result.text,
-                        json.dumps(embedding_result.embedding),
+                        encode_float32(embedding_result.embedding),
+                        len(embedding_result.embedding),
+                        q8,
+                        q8_scale,
                         embedding_result.model,
                         json.dumps(metadata or {}),
                         embedding_result.created_at,
-                    ),
+                    )
                 )
+
+            with get_conn() as conn:
+                with conn.cursor() as cursor:
+                    cursor.executemany(
+                        """INSERT INTO embeddings
+                           (text_hash, text, embedding, embedding_vec, embedding_dim,
+                            embedding_q8, embedding_q8_scale, model, metadata, created_at)
+                           VALUES (%s, %s, NULL, %s, %s, %s, %s, %s, %s, %s)
+                           ON CONFLICT (text_hash) DO UPDATE SET
+                               text = EXCLUDED.text,
+                               embedding = NULL,
+                               embedding_vec = EXCLUDED.embedding_vec,
+                               embedding_dim = EXCLUDED.embedding_dim,
+                               embedding_q8 = EXCLUDED.embedding_q8,
+                               embedding_q8_scale = EXCLUDED.embedding_q8_scale,
+                               model = EXCLUDED.model,
+                               metadata = EXCLUDED.metadata,
+                               created_at = EXCLUDED.created_at""",
+                        rows,
+                    )
+            self.vector_index.add_many(
+                [
+                    (
+                        embedding_result.hash,
+                        embedding_result.embedding,
+                        {"text": embedding_result.text, "metadata": metadata or {}},
+                    )
+                    for embedding_result, metadata in items
+                ]
+            )
+            return len(rows)
         except Exception as e:
             print(f"Error storing embedding: {e}")
+            return 0
+
+    def delete_embedding(self, text_hash: str) -> bool:
+        """Delete a stored embedding and drop it from the vector index."""
+        try:
+            with get_conn() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("DELETE FROM embeddings WHERE text_hash = %s", (text_hash,))
+            return self.vector_index.remove(text_hash)
+        except Exception as e:
+            print(f"Error deleting embedding: {e}")
+            return False
+
+    def _sync_vector_index(self, force: bool = False):
+        """Load rows past the index watermark and drop rows other workers deleted."""
+        if not force and time.time() - self._index_synced_at < self.index_refresh_interval:
+            return
+        if not self._index_lock.acquire(blocking=force or self._index_watermark is None):
+            return  # Another request is already refreshing the index
+        try:
+            while True:
+                with get_conn() as conn:
+                    with conn.cursor() as cursor:
+                        if self._index_watermark is None:
+                            cursor.execute(
+                                """SELECT text_hash, text, embedding_vec, embedding, metadata, created_at
+                                   FROM embeddings ORDER BY created_at, text_hash LIMIT %s""",
+                                (self.index_page_size,),
+                            )
+                        else:
+                            # Keyset paging on (created_at, text_hash) so a bulk insert
+                            # sharing one timestamp can span several pages
+                            cursor.execute(
+                                """SELECT text_hash, text, embedding_vec, embedding, metadata, created_at
+                                   FROM embeddings WHERE (created_at, text_hash) > (%s, %s)
+                                   ORDER BY created_at, text_hash LIMIT %s""",
+                                (*self._index_watermark, self.index_page_size),
+                            )
+                        rows = cursor.fetchall()
+
+                self._add_index_rows(rows)
+                if rows:
+                    self._index_watermark = (rows[-1][5], rows[-1][0])
+                if len(rows) < self.index_page_size:
+                    break
+            if force or time.time() - self._index_reconciled_at >= self.index_reconcile_interval:
+                self._reconcile_vector_index()
+            self._index_synced_at = time.time()
+        except Exception as e:
+            print(f"Error loading vector index: {e}")
+        finally:
+            self._index_lock.release()
+
+    def _add_index_rows(self, rows):
+        items = []
+        for text_hash, text, embedding_vec, embedding, metadata, _created_at in rows:
+            try:
+                # Binary rows decode via frombuffer; legacy JSON rows still load
+                vector = decode_embedding(embedding_vec if embedding_vec is not None else embedding)
+                meta = json.loads(metadata) if isinstance(metadata, str) else metadata
+                items.append((text_hash, vector, {"text": text, "metadata": meta or {}}))
+            except Exception as e:
+                print(f"Error processing embedding: {e}")
+        self.vector_index.add_many(items)
+
+    def _reconcile_vector_index(self):
+        """Match the index to the table's ids: drop deleted rows, load ones paging missed."""
+        with get_conn() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT text_hash FROM embeddings")
+                live = {row[0] for row in cursor.fetchall()}
+                indexed = set(self.vector_index.keys())
+                # Rows committed late with an older created_at sit behind the watermark
+                missing = list(live - indexed)
+                for start in range(0, len(missing), self.index_page_size):
+                    cursor.execute(
+                        """SELECT text_hash, text, embedding_vec, embedding, metadata, created_at
+                           FROM embeddings WHERE text_hash = ANY(%s)""",
+                        (missing[start : start + self.index_page_size],),
+                    )
+                    self._add_index_rows(cursor.fetchall())
+        for text_hash in indexed - live:
+            self.vector_index.remove(text_hash)
+        self._index_reconciled_at = time.time()
 
     def retrieve_similar(
         self, query: str, limit: int = 5, min_similarity: float = 0.7
@@ -253,32 +482,30 @@ class RAGEngine:
                     retrieval_time=time.time() - start_time,
                 )
 
-            # Retrieve similar embeddings from database
-            with get_conn() as conn:
-                rows = conn.execute(
-                    "SELECT text, embedding, metadata FROM embeddings ORDER BY created_at DESC LIMIT 100"
-                ).fetchall()
+            # Search the vector index; the keyword boost can lift a score by at most
+            # 20%, so prefilter on the unboosted threshold that could still pass
+            self._sync_vector_index()
+            query_norm = sum(a * a for a in query_embedding.embedding) ** 0.5
+            candidates = self.vector_index.search(
+                query_embedding.embedding,
+                k=self.retrieval_candidates,
+                min_similarity=min_similarity / 1.2,
+            )
 
             matches = []
-            for row in rows:
-                try:
-                    stored_embedding = json.loads(row[1])
-                    similarity = self._cosine_similarity(
-                        query_embedding.embedding, stored_embedding
+            for candidate in candidates:
+                similarity = self._apply_keyword_boost(
+                    candidate["similarity"], query_norm, candidate["norm"]
+                )
+                if similarity >= min_similarity:
+                    matches.append(
+                        {
+                            "text": candidate["text"],
+                            "similarity": similarity,
+                            "metadata": candidate["metadata"],
+                        }
                     )
 
-                    if similarity >= min_similarity:
-                        matches.append(
-                            {
-                                "text": row[0],
-                                "similarity": similarity,
-                                "metadata": json.loads(row[2]) if row[2] else {},
-                            }
-                        )
-                except Exception as e:
-                    print(f"Error processing embedding: {e}")
-                    continue
-
             # Sort by similarity and limit results
             matches.sort(key=lambda x: x["similarity"], reverse=True)
 
@@ -329,36 +556,9 @@ class RAGEngine:
                 retrieval_time=time.time() - start_time,
             )
 
-    def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
-        """Calculate normalized cosine similarity between two vectors."""
-        try:
-            # Calculate dot product
-            dot_product = sum(a * b for a, b in zip(vec1, vec2))
-
-            # Calculate norms
-            norm1 = sum(a * a for a in vec1) ** 0.5
-            norm2 = sum(b * b for b in vec2) ** 0.5
-
-            if norm1 == 0 or norm2 == 0:
-                return 0.0
-
-            # Normalized cosine similarity
-            similarity = dot_product / (norm1 * norm2)
-
-            # Apply keyword boost if available
-            return self._apply_keyword_boost(similarity, vec1, vec2)
-        except Exception:
-            return 0.0
-
-    def _apply_keyword_boost(
-        self, similarity: float, vec1: List[float], vec2: List[float]
-    ) -> float:
+    def _apply_keyword_boost(self, similarity: float, magnitude1: float, magnitude2: float) -> float:
         """Apply simple keyword boost to similarity score."""
         try:
-            # Simple keyword boost based on vector magnitude
-            magnitude1 = sum(a * a for a in vec1) ** 0.5
-            magnitude2 = sum(b * b for b in vec2) ** 0.5
-
             # Boost factor based on vector magnitudes (simple heuristic)
             boost_factor = min(1.2, 1.0 + (magnitude1 + magnitude2) / 1000.0)
 
@@ -464,7 +664,9 @@ class RAGEngine:
         return {
             "rag_enabled": self.rag_enabled,
             "feature_flag": "RAG_BASELINE",
-            "cache_size": len(self.embedding_cache),
+            "cache_size": len(self.embedding_cache.memory),
+            "embedding_cache": self.embedding_cache.get_stats(),
+            "vector_index": self.vector_index.get_stats(),
             "rate_limits": {
                 "embeddings": self.rate_limits["embeddings"]["requests_this_minute"],
                 "retrieval": self.rate_limits["retrieval"]["requests_this_minute"],
@@ -502,6 +704,12 @@ def get_rag_health() -> Dict[str, Any]:
     return rag_engine.get_health_status()
 
 
+def warm_up_rag():
+    """Load the vector index before the first retrieval needs it."""
+    if rag_engine.rag_enabled:
+        rag_engine._sync_vector_index(force=True)
+
+
 def discover_domain_adjacent_opportunities_rag(
     user_skills: List[str], user_domains: List[str]
 ) -> Dict[str, Any]:
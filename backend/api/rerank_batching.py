@@ -0,0 +1,190 @@
+"""
+Cross-request micro-batching for reranker inference.
+Concurrent rerank calls queue their (query, document) pairs; one worker thread
+collects pairs for a few milliseconds or until the batch is full, sorts them
+by length so each padded sub-batch wastes little compute, runs the model and
+hands each caller its own scores.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+RERANK_BATCH_ENABLED = os.getenv("RERANK_BATCH_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+RERANK_BATCH_MAX_PAIRS = int(os.getenv("RERANK_BATCH_MAX_PAIRS", "256"))
+RERANK_BATCH_MAX_WAIT_MS = float(os.getenv("RERANK_BATCH_MAX_WAIT_MS", "5"))
+# Pairs per forward pass; sorted by length so padding stays small
+RERANK_BUCKET_SIZE = int(os.getenv("RERANK_BUCKET_SIZE", "32"))
+# How long a caller waits for its scores before reranking is skipped
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "2000"))
+
+Pair = Tuple[str, str]
+
+
+@dataclass
+class _Request:
+    pairs: List[Pair]
+    future: Future
+    enqueued: float
+    deadline: float
+
+
+class RerankScheduler:
+    """Batches reranker calls from concurrent requests onto one worker thread."""
+
+    def __init__(
+        self,
+        predict: Callable[[Sequence[Pair]], Sequence[float]],
+        max_pairs: int = RERANK_BATCH_MAX_PAIRS,
+        max_wait_ms: float = RERANK_BATCH_MAX_WAIT_MS,
+        bucket_size: int = RERANK_BUCKET_SIZE,
+    ):
+        self.predict = predict
+        self.max_pairs = max_pairs
+        self.max_wait = max_wait_ms / 1000
+        self.bucket_size = bucket_size
+        self._queue: queue.Queue[_Request] = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.queued_pairs = 0
+        self.max_queued_pairs = 0
+        self.batches = 0
+        self.batched_pairs = 0
+        self.batched_requests = 0
+        self.total_wait_ms = 0.0
+        self.total_inference_ms = 0.0
+        self.budget_exceeded = 0
+        self.expired = 0
+        self.errors = 0
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="rerank-batcher", daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, pairs: Sequence[Pair], budget_ms: float = RERANK_BUDGET_MS) -> Future:
+        """Queue pairs for the next batch; the future resolves to their scores."""
+        now = time.monotonic()
+        request = _Request(list(pairs), Future(), now, now + budget_ms / 1000)
+        with self._lock:
+            self.queued_pairs += len(request.pairs)
+            self.max_queued_pairs = max(self.max_queued_pairs, self.queued_pairs)
+        self._ensure_worker()
+        self._queue.put(request)
+        return request.future
+
+    def score(self, pairs: Sequence[Pair], budget_ms: float = RERANK_BUDGET_MS) -> List[float]:
+        """Scores for the pairs; raises FuturesTimeoutError when the budget runs out."""
+        if not pairs:
+            return []
+        future = self.submit(pairs, budget_ms)
+        try:
+            return future.result(timeout=budget_ms / 1000)
+        except FuturesTimeoutError:
+            # Still queued: drop it so the worker doesn't score it for nobody
+            future.cancel()
+            with self._lock:
+                self.budget_exceeded += 1
+            raise
+
+    def _collect(self) -> List[_Request]:
+        """Block for one request, then take more until the batch is full or the wait ends."""
+        batch = [self._queue.get()]
+        size = len(batch[0].pairs)
+        close_at = time.monotonic() + self.max_wait
+        while size < self.max_pairs:
+            remaining = close_at - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.pairs)
+        with self._lock:
+            self.queued_pairs -= size
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            now = time.monotonic()
+            live = []
+            for request in batch:
+                if not request.future.set_running_or_notify_cancel():
+                    continue
+                if now > request.deadline:
+                    with self._lock:
+                        self.expired += 1
+                    request.future.set_exception(
+                        FuturesTimeoutError("rerank budget exceeded in queue")
+                    )
+                    continue
+                live.append(request)
+            if live:
+                self._execute(live, now)
+
+    def _execute(self, requests: List[_Request], started: float):
+        flat = [(r, i) for r, request in enumerate(requests) for i in range(len(request.pairs))]
+        pairs = [requests[r].pairs[i] for r, i in flat]
+        order = sorted(range(len(pairs)), key=lambda k: len(pairs[k][0]) + len(pairs[k][1]))
+        scores = [0.0] * len(pairs)
+        try:
+            for start in range(0, len(order), self.bucket_size):
+                bucket = order[start : start + self.bucket_size]
+                for k, score in zip(bucket, self.predict([pairs[k] for k in bucket])):
+                    scores[k] = float(score)
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            for request in requests:
+                request.future.set_exception(e)
+            return
+
+        results: List[List[float]] = [[0.0] * len(request.pairs) for request in requests]
+        for (r, i), score in zip(flat, scores):
+            results[r][i] = score
+        for request, result in zip(requests, results):
+            request.future.set_result(result)
+
+        with self._lock:
+            self.batches += 1
+            self.batched_pairs += len(pairs)
+            self.batched_requests += len(requests)
+            self.total_wait_ms += sum((started - r.enqueued) * 1000 for r in requests)
+            self.total_inference_ms += (time.monotonic() - started) * 1000
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            batches = self.batches or 1
+            requests = self.batched_requests or 1
+            return {
+                "queue_depth": self.queued_pairs,
+                "max_queue_depth": self.max_queued_pairs,
+                "batches": self.batches,
+                "avg_batch_pairs": round(self.batched_pairs / batches, 1),
+                "avg_batch_requests": round(self.batched_requests / batches, 2),
+                "avg_queue_wait_ms": round(self.total_wait_ms / requests, 2),
+                "avg_inference_ms": round(self.total_inference_ms / batches, 2),
+                "budget_exceeded": self.budget_exceeded,
+                "expired_in_queue": self.expired,
+                "errors": self.errors,
+                "max_pairs": self.max_pairs,
+                "max_wait_ms": self.max_wait * 1000,
+                "bucket_size": self.bucket_size,
+            }
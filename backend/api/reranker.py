@@ -1,12 +1,24 @@
 """
 Cross-Encoder Reranker for Mosaic 2.0
-Implements CPU-hosted cross-encoder reranking using sentence-transformers
-Falls back to mock reranker if sentence-transformers unavailable (Render free tier)
+Implements CPU-hosted cross-encoder reranking with a pluggable inference backend:
+an int8-quantized ONNX export run by onnxruntime (tokenizer-only dependency), or
+the PyTorch model through sentence-transformers.
+Falls back to mock reranker if neither backend is available (Render free tier)
 """
 
+import hashlib
+import os
+import threading
 import time
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .caching import LRUTTLCache
+from .rerank_batching import RERANK_BATCH_ENABLED, RERANK_BUDGET_MS, RerankScheduler
 
 # Try to import sentence-transformers, use mock if unavailable (Render free tier)
 try:
@@ -16,6 +28,99 @@ except ImportError:
     SENTENCE_TRANSFORMERS_AVAILABLE = False
     CrossEncoder = None  # Will use mock implementation
 
+# ONNX backend needs only onnxruntime and the tokenizers library, no PyTorch
+try:
+    import onnxruntime
+    from tokenizers import Tokenizer
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+    onnxruntime = None
+    Tokenizer = None
+
+RERANKER_MODEL_NAME = os.getenv("RERANKER_MODEL_NAME", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+# "onnx", "torch", or "auto" (ONNX when the exported model is present, else PyTorch)
+RERANKER_BACKEND = os.getenv("RERANKER_BACKEND", "auto").lower()
+# Written by scripts/export_reranker_onnx.py
+RERANKER_ONNX_DIR = os.getenv(
+    "RERANKER_ONNX_DIR", str(Path(__file__).resolve().parent.parent / "models" / "reranker-onnx")
+)
+RERANKER_ONNX_FILE = os.getenv("RERANKER_ONNX_FILE", "model.int8.onnx")
+RERANKER_MAX_LENGTH = int(os.getenv("RERANKER_MAX_LENGTH", "512"))
+RERANKER_THREADS = int(os.getenv("RERANKER_THREADS", "0"))  # 0 lets onnxruntime decide
+
+# Cross-encoder scores are deterministic, so entries only leave the cache by LRU
+RERANK_CACHE_ENABLED = os.getenv("RERANK_CACHE_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+RERANK_CACHE_MAX_ITEMS = int(os.getenv("RERANK_CACHE_MAX_ITEMS", "100000"))
+RERANK_CACHE_MAX_MB = int(os.getenv("RERANK_CACHE_MAX_MB", "32"))
+
+
+class TorchBackend:
+    """PyTorch cross-encoder through sentence-transformers."""
+
+    name = "torch"
+
+    def __init__(self, model_name: str):
+        self.model = CrossEncoder(model_name, device="cpu")
+
+    def predict(self, pairs: Sequence[Tuple[str, str]]) -> List[float]:
+        return [float(score) for score in self.model.predict(list(pairs))]
+
+
+class OnnxBackend:
+    """Quantized ONNX export of the cross-encoder run by onnxruntime on CPU."""
+
+    name = "onnx"
+
+    def __init__(self, model_dir: str, model_file: str = RERANKER_ONNX_FILE):
+        directory = Path(model_dir)
+        self.tokenizer = Tokenizer.from_file(str(directory / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=RERANKER_MAX_LENGTH)
+        self.tokenizer.enable_padding()
+        options = onnxruntime.SessionOptions()
+        if RERANKER_THREADS:
+            options.intra_op_num_threads = RERANKER_THREADS
+        self.session = onnxruntime.InferenceSession(
+            str(directory / model_file), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def predict(self, pairs: Sequence[Tuple[str, str]]) -> List[float]:
+        encodings = self.tokenizer.encode_batch(list(pairs))
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        logits = self.session.run(
+            None, {k: v for k, v in feeds.items() if k in self.input_names}
+        )[0]
+        # Same sigmoid CrossEncoder.predict applies to single-label models, so
+        # scores stay on the 0-1 scale the similarity blend expects
+        return (1 / (1 + np.exp(-logits[:, 0]))).tolist()
+
+
+def onnx_model_available(model_dir: str = RERANKER_ONNX_DIR) -> bool:
+    directory = Path(model_dir)
+    return (directory / RERANKER_ONNX_FILE).exists() and (directory / "tokenizer.json").exists()
+
+
+def load_backend(backend: str = RERANKER_BACKEND) -> Optional[Any]:
+    """Load the configured inference backend, or None to use the mock."""
+    if backend in ("onnx", "auto") and ONNXRUNTIME_AVAILABLE and onnx_model_available():
+        return OnnxBackend(RERANKER_ONNX_DIR)
+    if backend == "onnx":
+        print(f"WARNING: ONNX reranker requested but not available in {RERANKER_ONNX_DIR}")
+    if backend in ("torch", "auto") and SENTENCE_TRANSFORMERS_AVAILABLE:
+        return TorchBackend(RERANKER_MODEL_NAME)
+    return None
+
+
 @dataclass
 class RerankResult:
     """Result of reranking operation"""
@@ -31,10 +136,19 @@ class RerankResult:
 class CrossEncoderReranker:
     """CPU-hosted cross-encoder reranker for semantic matching."""
 
-    def __init__(self):
-        self.model_name = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    def __init__(self, backend: str = RERANKER_BACKEND):
+        self.model_name = RERANKER_MODEL_NAME
+        self.backend_name = backend
         self.model = None
         self.initialized = False
+        self.init_error: Optional[str] = None
+        self.scheduler: Optional[RerankScheduler] = None
+        # (model, query hash, document hash) -> cross-encoder score
+        self.score_cache = LRUTTLCache(
+            max_items=RERANK_CACHE_MAX_ITEMS,
+            max_bytes=RERANK_CACHE_MAX_MB * 1024 * 1024,
+            sizeof=lambda score: 240,
+        )
         self.max_candidates = 50  # Rerank top 50 candidates
         self.final_top_k = 12  # Return top 12 results
 
@@ -43,30 +157,87 @@ class CrossEncoderReranker:
         self.total_processing_time = 0.0
         self.average_latency = 0.0
 
-        # Initialize model
-        self._initialize_model()
+        # The model loads on first use or during background warm-up, not at import
+        self.load_attempted = False
+        self._load_lock = threading.Lock()
 
-    def _initialize_model(self):
-        """Initialize the cross-encoder model."""
-        if not SENTENCE_TRANSFORMERS_AVAILABLE:
-            print("WARNING: sentence-transformers not available - using mock reranker")
-            print("This is expected on Render free tier (memory constraints)")
-            self.initialized = False
+    def _ensure_model(self):
+        """Load the backend once, on whichever thread needs it first."""
+        if self.load_attempted:
             return
+        with self._load_lock:
+            if not self.load_attempted:
+                self._initialize_model()
+                self.load_attempted = True
+
+    def warm_up(self):
+        """Load the model and run one tiny batch so the first request pays neither."""
+        self._ensure_model()
+        if self.initialized:
+            self.model.predict([("warm up", "warm up")])
 
+    def _initialize_model(self):
+        """Initialize the cross-encoder model."""
         try:
-            print(f"Initializing cross-encoder model: {self.model_name}")
-            self.model = CrossEncoder(self.model_name, device="cpu")
+            print(f"Initializing cross-encoder model: {self.model_name} ({self.backend_name})")
+            self.model = load_backend(self.backend_name)
+            if self.model is None:
+                print("WARNING: no reranker backend available - using mock reranker")
+                print("This is expected on Render free tier without the ONNX export")
+                self.initialized = False
+                return
             self.initialized = True
-            print("Cross-encoder model initialized successfully")
+            if RERANK_BATCH_ENABLED:
+                self.scheduler = RerankScheduler(self.model.predict)
+            print(f"Cross-encoder model initialized successfully ({self.model.name} backend)")
         except Exception as e:
             print(f"CRITICAL: Error initializing cross-encoder: {e}")
+            self.init_error = str(e)
             print("Falling back to mock reranker")
             self.initialized = False
 
-    def rerank_documents(self, query: str, documents: List[Dict[str, Any]]) -> RerankResult:
-        """Rerank documents using cross-encoder."""
+    def _score_key(self, query: str, text: str) -> tuple:
+        # The model is uncased, so case and spacing don't change a query's scores
+        normalized = " ".join(query.lower().split())
+        return (
+            f"{self.model_name}:{self.model.name}",
+            hashlib.sha256(normalized.encode()).hexdigest(),
+            hashlib.sha256(text.encode()).hexdigest(),
+        )
+
+    def _score_uncached(self, pairs: List[Tuple[str, str]], budget_ms: float) -> List[float]:
+        """Score pairs, batched with concurrent callers when the scheduler is on."""
+        if self.scheduler is not None:
+            return self.scheduler.score(pairs, budget_ms)
+        return [float(score) for score in self.model.predict(pairs)]
+
+    def _predict(self, pairs: List[Tuple[str, str]], budget_ms: float) -> List[float]:
+        """Scores for the pairs; only pairs missing from the score cache reach the model."""
+        if not RERANK_CACHE_ENABLED:
+            return self._score_uncached(pairs, budget_ms)
+        keys = [self._score_key(query, text) for query, text in pairs]
+        scores = [self.score_cache.get(key) for key in keys]
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            fresh = self._score_uncached([pairs[i] for i in missing], budget_ms)
+            for i, score in zip(missing, fresh):
+                scores[i] = score
+                self.score_cache.set(keys[i], score)
+        return scores
+
+    def rerank_documents(
+        self,
+        query: str,
+        documents: List[Dict[str, Any]],
+        budget_ms: float = RERANK_BUDGET_MS,
+    ) -> RerankResult:
+        """Rerank documents using cross-encoder.
+
+        If the scores don't arrive within budget_ms, the documents come back
+        in their original order.
+        """
         start_time = time.time()
+        self._ensure_model()
 
         if not self.initialized or not self.model:
             # This will now be the main failure path if initialization fails.
@@ -93,7 +264,7 @@ class CrossEncoderReranker:
             query_doc_pairs = [(query, text) for text in texts]
 
             # Get rerank scores
-            rerank_scores = self.model.predict(query_doc_pairs)
+            rerank_scores = self._predict(query_doc_pairs, budget_ms)
 
             # Combine with original scores (weighted average)
             combined_scores = []
@@ -135,6 +306,16 @@ class CrossEncoderReranker:
                 processing_time=processing_time,
             )
 
+        except FuturesTimeoutError:
+            print(f"⚠️ Reranking skipped: no scores within {budget_ms:.0f}ms")
+            return RerankResult(
+                query=query,
+                reranked_documents=documents,
+                pre_rerank_scores=[d.get("similarity", 0.0) for d in documents],
+                post_rerank_scores=[d.get("similarity", 0.0) for d in documents],
+                improvement_pct=0.0,
+                processing_time=time.time() - start_time,
+            )
         except Exception as e:
             print(f"Error in reranking: {e}")
             # Fallback to returning original documents in case of an unexpected error
@@ -169,15 +350,23 @@ class CrossEncoderReranker:
 
     def get_health_status(self) -> Dict[str, Any]:
         """Get reranker health status."""
+        status = "operational" if self.initialized else ("error" if self.init_error else "mock")
+        if not self.load_attempted:
+            status = "not_loaded"
         return {
             "initialized": self.initialized,
             "model_name": self.model_name if self.initialized else "mock-reranker",
+            "backend": self.model.name if self.initialized else "mock",
             "sentence_transformers_available": SENTENCE_TRANSFORMERS_AVAILABLE,
+            "onnxruntime_available": ONNXRUNTIME_AVAILABLE,
             "total_reranks": self.total_reranks,
             "average_latency": self.average_latency,
+            "score_cache_hit_ratio": self.score_cache.get_stats()["hit_ratio"],
+            "score_cache": self.score_cache.get_stats(),
             "max_candidates": self.max_candidates,
             "final_top_k": self.final_top_k,
-            "status": "mock" if not SENTENCE_TRANSFORMERS_AVAILABLE else ("operational" if self.initialized else "error"),
+            "status": status,
+            "batching": self.scheduler.get_stats() if self.scheduler is not None else None,
         }
 
 
@@ -185,9 +374,16 @@ class CrossEncoderReranker:
 reranker = CrossEncoderReranker()
 
 
-def rerank_documents(query: str, documents: List[Dict[str, Any]]) -> RerankResult:
+def rerank_documents(
+    query: str, documents: List[Dict[str, Any]], budget_ms: float = RERANK_BUDGET_MS
+) -> RerankResult:
     """Rerank documents using the global reranker."""
-    return reranker.rerank_documents(query, documents)
+    return reranker.rerank_documents(query, documents, budget_ms)
+
+
+def warm_up_reranker():
+    """Load and warm the global reranker's model."""
+    reranker.warm_up()
 
 
 def get_reranker_health() -> Dict[str, Any]:
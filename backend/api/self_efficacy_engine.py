@@ -8,6 +8,7 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional, Tuple
 
+from .feature_flags import feature_flags
 from .settings import get_settings
 from .storage import get_conn
 
@@ -39,14 +40,7 @@ class SelfEfficacyEngine:
 
     def _check_feature_flag(self, flag_name: str) -> bool:
         """Check if a feature flag is enabled."""
-        try:
-            with get_conn() as conn:
-                row = conn.execute(
-                    "SELECT enabled FROM feature_flags WHERE flag_name = ?", (flag_name,)
-                ).fetchone()
-                return row and row[0] if row else False
-        except Exception:
-            return False
+        return feature_flags.is_enabled(flag_name)
 
     def compute_session_metrics(self, session_id: str) -> SelfEfficacyMetrics:
         """Compute comprehensive self-efficacy metrics for a session."""
@@ -242,32 +236,33 @@ Metrics Summary:
 Recommended Action: Contact Damian for personalized coaching intervention.
 """
 
-    def cleanup_stale_experiments(self, days_threshold: int = 30) -> Dict[str, Any]:
-        """Clean up stale experiments and related data."""
+    def cleanup_stale_experiments(
+        self, days_threshold: int = 30, batch_size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Clean up stale experiments and related data, at most batch_size at a time."""
         cutoff_date = datetime.utcnow() - timedelta(days=days_threshold)
 
         try:
             with get_conn() as conn:
-                # Find stale experiments
-                stale_experiments = conn.execute(
-                    """SELECT id FROM experiments
-                       WHERE status = 'active' AND created_at < ?""",
-                    (cutoff_date.isoformat(),),
-                ).fetchall()
-
-                if not stale_experiments:
-                    return {"cleaned": 0, "message": "No stale experiments found"}
+                with conn.cursor() as cursor:
+                    # Find stale experiments; LIMIT NULL means no limit
+                    cursor.execute(
+                        """SELECT id FROM experiments
+                           WHERE status = 'active' AND created_at < %s
+                           ORDER BY created_at LIMIT %s""",
+                        (cutoff_date, batch_size),
+                    )
+                    experiment_ids = [row[0] for row in cursor.fetchall()]
 
-                # Clean up related data by iterating to avoid S608 SQL injection warnings.
-                # While less performant than a single IN clause, this is demonstrably safe.
-                experiment_ids = [row[0] for row in stale_experiments]
+                    if not experiment_ids:
+                        return {"cleaned": 0, "message": "No stale experiments found"}
 
-                for experiment_id in experiment_ids:
-                    conn.execute(
-                        "DELETE FROM learning_data WHERE experiment_id = ?",
-                        (experiment_id,),
+                    # Clean up related data; the id list is passed as a bound array
+                    cursor.execute(
+                        "DELETE FROM learning_data WHERE experiment_id = ANY(%s)",
+                        (experiment_ids,),
                     )
-                    conn.execute("DELETE FROM experiments WHERE id = ?", (experiment_id,))
+                    cursor.execute("DELETE FROM experiments WHERE id = ANY(%s)", (experiment_ids,))
 
                 return {
                     "cleaned": len(experiment_ids),
@@ -339,9 +334,11 @@ def get_escalation_prompt(session_id: str) -> Optional[str]:
     return self_efficacy_engine.get_escalation_prompt(session_id)
 
 
-def cleanup_stale_experiments(days_threshold: int = 30) -> Dict[str, Any]:
+def cleanup_stale_experiments(
+    days_threshold: int = 30, batch_size: Optional[int] = None
+) -> Dict[str, Any]:
     """Cleanup using the global engine."""
-    return self_efficacy_engine.cleanup_stale_experiments(days_threshold)
+    return self_efficacy_engine.cleanup_stale_experiments(days_threshold, batch_size)
 
 
 def record_analytics_entry(session_id: str, metrics: SelfEfficacyMetrics) -> None:
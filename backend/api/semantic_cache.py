@@ -0,0 +1,189 @@
+"""
+Semantic response cache for Mosaic 2.0 AI fallback.
+Answers are stored with the embedding of the prompt that produced them and
+served again for prompts whose cosine similarity passes a threshold. Entries
+are grouped by a fingerprint of the system prompt so an answer is never
+reused under different instructions or user context.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_TTL_SECONDS = float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", str(6 * 60 * 60)))
+SEMANTIC_CACHE_MAX_PER_NAMESPACE = int(os.getenv("SEMANTIC_CACHE_MAX_PER_NAMESPACE", "500"))
+SEMANTIC_CACHE_MAX_NAMESPACES = int(os.getenv("SEMANTIC_CACHE_MAX_NAMESPACES", "1000"))
+
+
+def namespace_for(system_prompt: str, extra: Any = None) -> str:
+    """Fingerprint of everything besides the prompt that shapes the answer."""
+    payload = json.dumps([system_prompt, extra], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class _Namespace:
+    """Per-fingerprint entries in LRU order, with a cached matrix of unit vectors."""
+
+    def __init__(self):
+        # prompt hash -> (unit vector, entry dict, expires_at)
+        self.entries: OrderedDict[str, tuple] = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._keys: List[str] = []
+
+    def invalidate(self):
+        self._matrix = None
+
+    def matrix(self):
+        if self._matrix is None:
+            self._keys = list(self.entries)
+            self._matrix = (
+                np.stack([self.entries[k][0] for k in self._keys]) if self._keys else None
+            )
+        return self._keys, self._matrix
+
+
+class SemanticResponseCache:
+    """Thread-safe cosine-similarity cache, LRU-bounded per namespace."""
+
+    def __init__(
+        self,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        ttl_seconds: float = SEMANTIC_CACHE_TTL_SECONDS,
+        max_per_namespace: int = SEMANTIC_CACHE_MAX_PER_NAMESPACE,
+        max_namespaces: int = SEMANTIC_CACHE_MAX_NAMESPACES,
+        embed_fn: Optional[Callable[[str], List[float]]] = None,
+        enabled: bool = SEMANTIC_CACHE_ENABLED,
+    ):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_per_namespace = max_per_namespace
+        self.max_namespaces = max_namespaces
+        self.enabled = enabled
+        self._embed_fn = embed_fn
+        self._lock = threading.Lock()
+        self._namespaces: OrderedDict[str, _Namespace] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.embed_errors = 0
+
+    def _embed(self, prompt: str) -> Optional[np.ndarray]:
+        """Unit-length embedding of the prompt, or None if embedding failed."""
+        try:
+            vector = np.asarray(self._embed_fn(prompt), dtype=np.float32)
+        except Exception as e:
+            print(f"⚠️ Semantic cache embedding failed: {e}")
+            vector = np.empty(0, dtype=np.float32)
+        norm = float(np.linalg.norm(vector)) if vector.size else 0.0
+        if not norm:
+            with self._lock:
+                self.embed_errors += 1
+            return None
+        return vector / norm
+
+    def embed(self, prompt: str) -> Optional[np.ndarray]:
+        """Embed a prompt for lookup and store; None when the cache is off."""
+        if not self.enabled or self._embed_fn is None:
+            return None
+        return self._embed(" ".join(prompt.split()))
+
+    def lookup(self, namespace: str, vector: Optional[np.ndarray]) -> Optional[Dict[str, Any]]:
+        """Best cached entry in the namespace at or above the threshold."""
+        if vector is None:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            space = self._namespaces.get(namespace)
+            if space is None:
+                self.misses += 1
+                return None
+            self._namespaces.move_to_end(namespace)
+            expired = [k for k, (_, _, expires_at) in space.entries.items() if expires_at <= now]
+            for key in expired:
+                del space.entries[key]
+            if expired:
+                self.expirations += len(expired)
+                space.invalidate()
+
+            keys, matrix = space.matrix()
+            if matrix is None or matrix.shape[1] != vector.shape[0]:
+                self.misses += 1
+                return None
+            scores = matrix @ vector
+            best = int(np.argmax(scores))
+            similarity = float(scores[best])
+            if similarity < self.threshold:
+                self.misses += 1
+                return None
+            space.entries.move_to_end(keys[best])
+            self.hits += 1
+            return {**space.entries[keys[best]][1], "similarity": round(similarity, 4)}
+
+    def store(
+        self,
+        namespace: str,
+        prompt: str,
+        vector: Optional[np.ndarray],
+        entry: Dict[str, Any],
+    ):
+        """Cache an answer, evicting the namespace's least recently used entries."""
+        if vector is None:
+            return
+        key = hashlib.sha256(" ".join(prompt.split()).encode()).hexdigest()
+        with self._lock:
+            space = self._namespaces.get(namespace)
+            if space is None:
+                space = self._namespaces[namespace] = _Namespace()
+                while len(self._namespaces) > self.max_namespaces:
+                    _, dropped = self._namespaces.popitem(last=False)
+                    self.evictions += len(dropped.entries)
+            self._namespaces.move_to_end(namespace)
+            space.entries.pop(key, None)
+            space.entries[key] = (vector, dict(entry), time.monotonic() + self.ttl_seconds)
+            while len(space.entries) > self.max_per_namespace:
+                space.entries.popitem(last=False)
+                self.evictions += 1
+            space.invalidate()
+            self.stores += 1
+
+    def clear(self):
+        """Drop every cached answer."""
+        with self._lock:
+            self._namespaces.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters for health checks."""
+        with self._lock:
+            entries = sum(len(space.entries) for space in self._namespaces.values())
+            total = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "threshold": self.threshold,
+                "ttl_seconds": self.ttl_seconds,
+                "namespaces": len(self._namespaces),
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "embed_errors": self.embed_errors,
+            }
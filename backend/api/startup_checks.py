@@ -4,7 +4,7 @@ import os
 import httpx
 
 from .settings import get_settings
-from .storage import cleanup_expired_sessions, init_db
+from .storage import init_db
 
 
 async def ping_openai(client):
@@ -44,8 +44,11 @@ async def ping_anthropic(client):
 async def run():
     _ = get_settings()
     init_db()
-    cleanup_expired_sessions()
     print("Settings loaded successfully")
+
+
+async def deferred_startup():
+    """Checks that don't gate readiness; run after the worker is serving."""
     async with httpx.AsyncClient() as client:
         await asyncio.gather(ping_openai(client), ping_anthropic(client))
 
@@ -1,18 +1,32 @@
+import copy
 import json
 import os
+import threading
+import time
 import uuid
 from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import psycopg2
+from psycopg2 import pool as pg_pool
 
 
 # DATA_ROOT and UPLOAD_ROOT are still used for file uploads, not the DB
 DATA_ROOT = Path(os.getenv("DATA_ROOT", "data"))
 UPLOAD_ROOT = Path(os.getenv("UPLOAD_ROOT", DATA_ROOT / "uploads"))
 SESSION_TTL_DAYS = int(os.getenv("SESSION_TTL_DAYS", "30"))
+# File name part of file_uploads.file_path; idx_file_uploads_basename indexes this expression
+UPLOAD_BASENAME_SQL = "regexp_replace(file_path, '^.*/', '')"
+
+# Connection pool sizing (per worker process)
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+# Connections idle longer than this are pinged before being handed out
+DB_POOL_IDLE_CHECK_SECONDS = float(os.getenv("DB_POOL_IDLE_CHECK_SECONDS", "30"))
 
 UPLOAD_ROOT.mkdir(parents=True, exist_ok=True)
 DATA_ROOT.mkdir(parents=True, exist_ok=True)
@@ -31,24 +45,197 @@ def _json_load(raw: Optional[str]) -> Any:
         return None
 
 
-@contextmanager
-def get_conn():
-    """Establishes a connection to the PostgreSQL database."""
+class ConnectionPool:
+    """ThreadedConnectionPool that blocks when exhausted and checks idle connections."""
+
+    def __init__(
+        self,
+        dsn: str,
+        minconn: int = DB_POOL_MIN,
+        maxconn: int = DB_POOL_MAX,
+        timeout: float = DB_POOL_TIMEOUT,
+        idle_check_seconds: float = DB_POOL_IDLE_CHECK_SECONDS,
+    ):
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.idle_check_seconds = idle_check_seconds
+        self._pool = pg_pool.ThreadedConnectionPool(minconn, maxconn, dsn)
+        # psycopg2 raises immediately when exhausted; the semaphore makes callers wait
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._last_used: Dict[int, float] = {}
+
+        self.in_use = 0
+        self.acquired = 0
+        self.waits = 0
+        self.wait_time_total = 0.0
+        self.timeouts = 0
+        self.discarded = 0
+
+    def _is_healthy(self, conn) -> bool:
+        if conn.closed:
+            return False
+        last_used = self._last_used.get(id(conn))
+        if last_used is None or time.monotonic() - last_used < self.idle_check_seconds:
+            return True  # Freshly opened or recently used
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def getconn(self):
+        """Borrow a connection, waiting up to timeout seconds for a free slot."""
+        start = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.waits += 1
+            if not self._slots.acquire(timeout=self.timeout):
+                with self._lock:
+                    self.timeouts += 1
+                raise pg_pool.PoolError(
+                    f"connection pool exhausted (waited {self.timeout:.0f}s for one of {self.maxconn})"
+                )
+        try:
+            conn = self._pool.getconn()
+            # One retry with a fresh connection if the pooled one went stale
+            if not self._is_healthy(conn):
+                self._discard(conn)
+                conn = self._pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self.in_use += 1
+            self.acquired += 1
+            self.wait_time_total += time.monotonic() - start
+        return conn
+
+    def _discard(self, conn):
+        self._last_used.pop(id(conn), None)
+        with self._lock:
+            self.discarded += 1
+        self._pool.putconn(conn, close=True)
+
+    def putconn(self, conn, close: bool = False):
+        """Return a borrowed connection; broken connections are closed, not reused."""
+        try:
+            if close or conn.closed:
+                self._discard(conn)
+            else:
+                if conn.autocommit:
+                    conn.autocommit = False
+                self._last_used[id(conn)] = time.monotonic()
+                self._pool.putconn(conn)
+        finally:
+            with self._lock:
+                self.in_use -= 1
+            self._slots.release()
+
+    def closeall(self):
+        self._pool.closeall()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool size and wait statistics."""
+        with self._lock:
+            return {
+                "min": self.minconn,
+                "max": self.maxconn,
+                "in_use": self.in_use,
+                "idle": len(self._pool._pool),
+                "acquired": self.acquired,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "discarded": self.discarded,
+                "avg_wait_ms": round(self.wait_time_total / self.acquired * 1000, 3)
+                if self.acquired
+                else 0.0,
+            }
+
+
+_POOL: Optional[ConnectionPool] = None
+_POOL_PID: Optional[int] = None
+_POOL_LOCK = threading.Lock()
+
+
+def _get_pool() -> ConnectionPool:
+    """Return this process's pool, creating it lazily (gunicorn forks after import)."""
+    global _POOL, _POOL_PID
     DATABASE_URL = os.getenv("DATABASE_URL")
     if not DATABASE_URL:
         raise ValueError("DATABASE_URL environment variable is not set")
 
-    conn = psycopg2.connect(DATABASE_URL)
+    pool = _POOL
+    if pool is not None and _POOL_PID == os.getpid() and pool.dsn == DATABASE_URL:
+        return pool
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_PID != os.getpid() or _POOL.dsn != DATABASE_URL:
+            # Connections inherited across fork belong to the parent; just drop them
+            _POOL = ConnectionPool(DATABASE_URL)
+            _POOL_PID = os.getpid()
+        return _POOL
+
+
+@contextmanager
+def get_conn():
+    """Borrows a pooled connection to the PostgreSQL database."""
+    pool = _get_pool()
+    conn = pool.getconn()
+    broken = False
     try:
         yield conn
         conn.commit()
     except Exception as e:
-        conn.rollback()
+        try:
+            conn.rollback()
+        except Exception:
+            broken = True
         raise e
     finally:
+        pool.putconn(conn, close=broken)
+
+
+@contextmanager
+def advisory_lock(*key: int):
+    """Try a session advisory lock on its own autocommit connection; yields whether it was taken.
+
+    The lock lives outside the pool and outside any transaction, so holding it
+    for a long job neither takes a pool slot nor leaves a session idle in
+    transaction.
+    """
+    DATABASE_URL = os.getenv("DATABASE_URL")
+    if not DATABASE_URL:
+        raise ValueError("DATABASE_URL environment variable is not set")
+    placeholders = ", ".join(["%s"] * len(key))
+    conn = psycopg2.connect(DATABASE_URL)
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f"SELECT pg_try_advisory_lock({placeholders})", key)
+            acquired = cursor.fetchone()[0]
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                with conn.cursor() as cursor:
+                    cursor.execute(f"SELECT pg_advisory_unlock({placeholders})", key)
+    finally:
+        # Closing the session releases the lock even if the unlock failed
         conn.close()
 
 
+def get_pool_stats() -> Dict[str, Any]:
+    """Get connection pool statistics for this worker."""
+    if _POOL is None or _POOL_PID != os.getpid():
+        return {"initialized": False}
+    return {"initialized": True, **_POOL.get_stats()}
+
+
 def init_db() -> None:
     """Initializes the database tables for PostgreSQL."""
     with get_conn() as conn:
@@ -137,12 +324,159 @@ def init_db() -> None:
                 )
                 """
             )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_file_uploads_basename "
+                f"ON file_uploads (({UPLOAD_BASENAME_SQL}))"
+            )
 
 
 def _expiry_ts() -> datetime:
     return datetime.utcnow() + timedelta(days=SESSION_TTL_DAYS)
 
 
+def _load_user_data(raw: Any) -> Dict[str, Any]:
+    if isinstance(raw, dict):
+        return raw  # JSONB columns come back already parsed
+    return _json_load(raw) or {}
+
+
+class SessionUnitOfWork:
+    """Request-scoped view of one session: loaded once, flushed once."""
+
+    def __init__(self, session_id: Optional[str] = None):
+        self.session_id = session_id or uuid.uuid4().hex
+        self.user_data: Dict[str, Any] = {}
+        self.original: Dict[str, Any] = {}
+        self.metrics: Optional[Dict[str, Any]] = None
+        self.dirty = False
+        self.pending_outputs: List[tuple] = []
+
+    def load(self) -> "SessionUnitOfWork":
+        """Create-or-touch the session and read its data and latest metrics in one transaction."""
+        with get_conn() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO sessions (id, expires_at, user_data) VALUES (%s, %s, %s)
+                    ON CONFLICT (id) DO UPDATE SET expires_at = EXCLUDED.expires_at
+                    RETURNING user_data
+                    """,
+                    (self.session_id, _expiry_ts(), _json_dump({})),
+                )
+                row = cursor.fetchone()
+                user_data = row[0] if row else None
+                cursor.execute(
+                    "SELECT metrics FROM wimd_outputs WHERE session_id = %s ORDER BY created_at DESC LIMIT 1",
+                    (self.session_id,),
+                )
+                row = cursor.fetchone()
+        return self.loaded(user_data, row[0] if row else None)
+
+    def loaded(self, user_data: Any, metrics: Any) -> "SessionUnitOfWork":
+        """Record the state read from the database."""
+        self.user_data = _load_user_data(user_data)
+        self.metrics = _load_user_data(metrics) or None
+        self.original = copy.deepcopy(self.user_data)
+        return self
+
+    def get_data(self) -> Dict[str, Any]:
+        return copy.deepcopy(self.user_data)
+
+    def set_data(self, data: Dict[str, Any]) -> None:
+        self.user_data = copy.deepcopy(data)
+        self.dirty = True
+
+    def add_output(self, prompt, response, analysis_data, metrics) -> None:
+        self.pending_outputs.append(
+            (
+                self.session_id,
+                prompt,
+                response,
+                _json_dump(analysis_data or {}),
+                _json_dump(metrics or {}),
+            )
+        )
+        if metrics:
+            self.metrics = metrics
+
+    def flush(self) -> None:
+        """Write the session UPDATE and queued wimd_outputs rows in a single transaction."""
+        if not self.dirty and not self.pending_outputs:
+            return
+        with get_conn() as conn:
+            with conn.cursor() as cursor:
+                if self.dirty:
+                    # Lock the row and merge at key level so a concurrent tab's
+                    # changes to keys this turn did not touch are preserved
+                    cursor.execute(
+                        "SELECT user_data FROM sessions WHERE id = %s FOR UPDATE",
+                        (self.session_id,),
+                    )
+                    row = cursor.fetchone()
+                    cursor.execute(
+                        "UPDATE sessions SET user_data = %s WHERE id = %s",
+                        (_json_dump(self.merge_into(row[0] if row else None)), self.session_id),
+                    )
+                if self.pending_outputs:
+                    cursor.executemany(
+                        """
+                        INSERT INTO wimd_outputs (session_id, prompt, response, analysis_data, metrics)
+                        VALUES (%s, %s, %s, %s, %s)
+                        """,
+                        self.pending_outputs,
+                    )
+        self.flushed()
+
+    def merge_into(self, current: Any) -> Dict[str, Any]:
+        """Apply this turn's key-level changes on top of the row's current user_data."""
+        merged = _load_user_data(current)
+        for key, value in self.user_data.items():
+            if key not in self.original or self.original[key] != value:
+                merged[key] = value
+        for key in self.original:
+            if key not in self.user_data:
+                merged.pop(key, None)
+        return merged
+
+    def flushed(self) -> None:
+        self.original = copy.deepcopy(self.user_data)
+        self.dirty = False
+        self.pending_outputs = []
+
+
+_ACTIVE_SESSION: ContextVar[Optional[SessionUnitOfWork]] = ContextVar(
+    "active_session", default=None
+)
+
+
+def _active_session(session_id: Optional[str]) -> Optional[SessionUnitOfWork]:
+    uow = _ACTIVE_SESSION.get()
+    if uow is not None and session_id == uow.session_id:
+        return uow
+    return None
+
+
+def activate_session(uow: Optional[SessionUnitOfWork]):
+    """Make uow the active session for the current context; returns a reset token."""
+    return _ACTIVE_SESSION.set(uow)
+
+
+def deactivate_session(token) -> None:
+    _ACTIVE_SESSION.reset(token)
+
+
+@contextmanager
+def session_unit_of_work(session_id: Optional[str] = None):
+    """Scope session reads/writes for one request; flushed on success, discarded on error."""
+    uow = SessionUnitOfWork(session_id).load()
+    token = activate_session(uow)
+    try:
+        yield uow
+        uow.flush()
+    finally:
+        deactivate_session(token)
+
+
 def create_session(user_data: Optional[Dict[str, Any]] = None) -> str:
     session_id = uuid.uuid4().hex
     payload = _json_dump(user_data or {})
@@ -158,6 +492,11 @@ def create_session(user_data: Optional[Dict[str, Any]] = None) -> str:
 def ensure_session(session_id: Optional[str], user_data: Optional[Dict[str, Any]] = None) -> str:
     if not session_id:
         return create_session(user_data)
+    uow = _active_session(session_id)
+    if uow is not None:
+        if user_data is not None:
+            uow.set_data(user_data)
+        return session_id  # Already created/touched when the unit of work loaded
     with get_conn() as conn:
         with conn.cursor() as cursor:
             cursor.execute("SELECT id FROM sessions WHERE id = %s", (session_id,))
@@ -188,6 +527,9 @@ def session_exists(session_id: str) -> bool:
 
 def get_session_data(session_id: str) -> Dict[str, Any]:
     """Get session user_data JSON field."""
+    uow = _active_session(session_id)
+    if uow is not None:
+        return uow.get_data()
     with get_conn() as conn:
         with conn.cursor() as cursor:
             cursor.execute("SELECT user_data FROM sessions WHERE id = %s", (session_id,))
@@ -199,6 +541,10 @@ def get_session_data(session_id: str) -> Dict[str, Any]:
 
 def update_session_data(session_id: str, data: Dict[str, Any]) -> None:
     """Update session user_data JSON field."""
+    uow = _active_session(session_id)
+    if uow is not None:
+        uow.set_data(data)
+        return
     with get_conn() as conn:
         with conn.cursor() as cursor:
             cursor.execute(
@@ -213,6 +559,10 @@ def record_wimd_output(
     analysis_data: Optional[Dict[str, Any]] = None,
     metrics: Optional[Dict[str, Any]] = None,
 ) -> None:
+    uow = _active_session(session_id)
+    if uow is not None:
+        uow.add_output(prompt, response, analysis_data, metrics)
+        return
     with get_conn() as conn:
         with conn.cursor() as cursor:
             cursor.execute(
@@ -231,6 +581,9 @@ def record_wimd_output(
 
 
 def latest_metrics(session_id: str) -> Optional[Dict[str, Any]]:
+    uow = _active_session(session_id)
+    if uow is not None:
+        return uow.metrics
     with get_conn() as conn:
         with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cursor:
             cursor.execute(
@@ -387,39 +740,103 @@ def list_files(session_id: str) -> List[Dict[str, Any]]:
     return [dict(row) for row in rows]
 
 
-def cleanup_expired_sessions() -> None:
+def _unlink_files(paths: List[str]) -> int:
+    removed = 0
+    for raw in paths:
+        try:
+            path = Path(raw)
+            if path.exists() and path.is_file():
+                path.unlink()
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def purge_expired_sessions(batch_size: int = 200) -> Dict[str, int]:
+    """Delete one batch of expired sessions, their rows and their uploaded files."""
     cutoff = datetime.utcnow()
     with get_conn() as conn:
         with conn.cursor() as cursor:
-            cursor.execute("SELECT id FROM sessions WHERE expires_at <= %s", (cutoff,))
+            # SKIP LOCKED lets concurrent purges take disjoint batches
+            cursor.execute(
+                """SELECT id FROM sessions WHERE expires_at <= %s
+                   ORDER BY expires_at LIMIT %s FOR UPDATE SKIP LOCKED""",
+                (cutoff, batch_size),
+            )
             expired_ids = [row[0] for row in cursor.fetchall()]
-            if expired_ids:
-                placeholders = ",".join(["%s"] * len(expired_ids))
+            if not expired_ids:
+                return {"sessions": 0, "files": 0}
+            cursor.execute(
+                "SELECT file_path FROM file_uploads WHERE session_id = ANY(%s)", (expired_ids,)
+            )
+            file_paths = [row[0] for row in cursor.fetchall() if row[0]]
+
+            # Deletions
+            for table in [
+                "file_uploads",
+                "resume_versions",
+                "job_matches",
+                "wimd_outputs",
+                "sessions",
+            ]:
+                cursor.execute(f"DELETE FROM {table} WHERE session_id = ANY(%s)", (expired_ids,))
+
+    # Files go only once the rows pointing at them are committed
+    return {"sessions": len(expired_ids), "files": _unlink_files(file_paths)}
+
+
+def cleanup_expired_sessions() -> None:
+    while purge_expired_sessions()["sessions"]:
+        pass
+
+
+def _upload_rows_resolve(sample_size: int = 20) -> bool:
+    """True if recent file_uploads rows point at files present under UPLOAD_ROOT."""
+    with get_conn() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT file_path FROM file_uploads WHERE file_path IS NOT NULL "
+                "ORDER BY id DESC LIMIT %s",
+                (sample_size,),
+            )
+            paths = [row[0] for row in cursor.fetchall()]
+    return any((UPLOAD_ROOT / Path(path).name).exists() for path in paths)
+
+
+def delete_orphan_uploads(min_age_seconds: float = 3600, batch_size: int = 500) -> int:
+    """Delete upload files no file_uploads row points at, checking the DB in batches."""
+    cutoff = time.time() - min_age_seconds
+    candidates = []
+    for path in UPLOAD_ROOT.iterdir():
+        try:
+            # Young files may belong to an upload whose row isn't committed yet
+            if path.is_file() and path.stat().st_mtime < cutoff:
+                candidates.append(str(path))
+        except OSError:
+            pass
+    if not candidates:
+        return 0
+    # If no known row maps onto this directory (wrong UPLOAD_ROOT or database),
+    # every file would look orphaned; leave them all alone
+    if not _upload_rows_resolve():
+        print(f"⚠️ Orphan upload cleanup skipped: no file_uploads row resolves under {UPLOAD_ROOT}")
+        return 0
+    removed = 0
+    for start in range(0, len(candidates), batch_size):
+        batch = candidates[start : start + batch_size]
+        # Match on the file name: stored paths may be relative or under an older UPLOAD_ROOT
+        names = [Path(path).name for path in batch]
+        with get_conn() as conn:
+            with conn.cursor() as cursor:
                 cursor.execute(
-                    f"SELECT file_path FROM file_uploads WHERE session_id IN ({placeholders})",
-                    expired_ids,
+                    f"SELECT {UPLOAD_BASENAME_SQL} FROM file_uploads "
+                    f"WHERE {UPLOAD_BASENAME_SQL} = ANY(%s)",
+                    (names,),
                 )
-                file_rows = cursor.fetchall()
-
-                # Deletions
-                for table in [
-                    "file_uploads",
-                    "resume_versions",
-                    "job_matches",
-                    "wimd_outputs",
-                    "sessions",
-                ]:
-                    cursor.execute(
-                        f"DELETE FROM {table} WHERE session_id IN ({placeholders})", expired_ids
-                    )
-
-                for row in file_rows:
-                    try:
-                        path = Path(row[0])
-                        if path.exists() and path.is_file():
-                            path.unlink()
-                    except OSError:
-                        pass
+                referenced = {row[0] for row in cursor.fetchall()}
+        removed += _unlink_files([path for path in batch if Path(path).name not in referenced])
+    return removed
 
 
 def session_summary(session_id: str) -> Dict[str, Any]:
@@ -589,8 +1006,10 @@ def diagnose_user_hash(email: str) -> Dict[str, Any]:
 
 __all__ = [
     "UPLOAD_ROOT",
+    "advisory_lock",
     "create_session",
     "ensure_session",
+    "session_unit_of_work",
     "session_exists",
     "get_session_data",
     "update_session_data",
@@ -607,7 +1026,10 @@ __all__ = [
     "cleanup_expired_sessions",
     "init_db",
     "session_summary",
+    "purge_expired_sessions",
+    "delete_orphan_uploads",
     "get_conn",
+    "get_pool_stats",
     # Auth functions
     "authenticate_user",
     "create_user",
@@ -0,0 +1,145 @@
+"""
+Lazy subsystem registry for Mosaic 2.0.
+Heavy optional modules (AI SDKs, RAG, reranker models) are imported on first
+use instead of at API import time, so a worker can pass /health right after
+start. After readiness a background warm-up imports them and runs their
+warm-up hooks, recording per-subsystem load and warm times.
+"""
+
+import asyncio
+import importlib
+import importlib.util
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class Subsystem:
+    """One lazily imported module and its load state."""
+
+    name: str
+    module_path: str
+    warm: Optional[str] = None  # module-level function called during warm-up
+    state: str = "registered"  # registered | loaded | warm | failed
+    load_ms: Optional[float] = None
+    warm_ms: Optional[float] = None
+    error: Optional[str] = None
+    module: Any = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class SubsystemRegistry:
+    """Imports registered modules on first use and warms them in the background."""
+
+    def __init__(self, package: str = __package__, availability: Optional[Dict[str, bool]] = None):
+        self.package = package
+        # Kept in sync with load outcomes, e.g. the API's IMPORTS_AVAILABLE map
+        self.availability = availability if availability is not None else {}
+        self.subsystems: Dict[str, Subsystem] = {}
+        self._warm_thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, module_path: str, warm: Optional[str] = None):
+        self.subsystems[name] = Subsystem(name, module_path, warm)
+        # Optimistic until a load says otherwise; a missing module is known now
+        found = importlib.util.find_spec(module_path, self.package) is not None
+        self.availability[name] = found
+        if not found:
+            self._fail(self.subsystems[name], f"module {module_path} not found")
+
+    def _fail(self, subsystem: Subsystem, error: str):
+        subsystem.state = "failed"
+        subsystem.error = error
+        self.availability[subsystem.name] = False
+        print(f"⚠️  {subsystem.name} not available: {error}")
+
+    def load(self, name: str) -> Any:
+        """Import the subsystem's module once; None if it failed to import."""
+        subsystem = self.subsystems[name]
+        if subsystem.module is not None or subsystem.state == "failed":
+            return subsystem.module
+        with subsystem.lock:
+            if subsystem.module is None and subsystem.state != "failed":
+                start = time.monotonic()
+                try:
+                    subsystem.module = importlib.import_module(subsystem.module_path, self.package)
+                    subsystem.state = "loaded"
+                except Exception as e:
+                    self._fail(subsystem, str(e))
+                subsystem.load_ms = round((time.monotonic() - start) * 1000, 1)
+        return subsystem.module
+
+    def is_loaded(self, name: str) -> bool:
+        return self.subsystems[name].module is not None
+
+    def lazy(self, name: str, attr: str, fallback: Optional[Callable] = None) -> Callable:
+        """A stand-in for module.attr that imports the module on first call."""
+
+        def _call(*args, **kwargs):
+            module = self.load(name)
+            if module is None:
+                if fallback is None:
+                    raise RuntimeError(f"{name} subsystem unavailable")
+                return fallback(*args, **kwargs)
+            return getattr(module, attr)(*args, **kwargs)
+
+        _call.__name__ = attr
+        return _call
+
+    def lazy_async(self, name: str, attr: str, fallback: Optional[Callable] = None) -> Callable:
+        """Like lazy() for coroutine functions, importing on a worker thread.
+
+        A first import can take seconds (SDK clients, models); doing it on the
+        event loop would stall every other request on the worker.
+        """
+
+        async def _call(*args, **kwargs):
+            module = self.subsystems[name].module
+            if module is None:
+                module = await asyncio.to_thread(self.load, name)
+            if module is None:
+                if fallback is None:
+                    raise RuntimeError(f"{name} subsystem unavailable")
+                return await fallback(*args, **kwargs)
+            return await getattr(module, attr)(*args, **kwargs)
+
+        _call.__name__ = attr
+        return _call
+
+    def warm_up(self, names: Optional[List[str]] = None):
+        """Load each subsystem and run its warm-up hook, in registration order."""
+        for name in names or list(self.subsystems):
+            subsystem = self.subsystems[name]
+            module = self.load(name)
+            if module is None or subsystem.warm is None or subsystem.state == "warm":
+                continue
+            start = time.monotonic()
+            try:
+                getattr(module, subsystem.warm)()
+                subsystem.state = "warm"
+            except Exception as e:
+                subsystem.error = f"warm-up failed: {e}"
+                print(f"⚠️  {name} warm-up failed: {e}")
+            subsystem.warm_ms = round((time.monotonic() - start) * 1000, 1)
+
+    def start_warm_up(self) -> bool:
+        """Run warm_up on a daemon thread once per process."""
+        if self._warm_thread is not None:
+            return False
+        self._warm_thread = threading.Thread(
+            target=self.warm_up, name="subsystem-warm-up", daemon=True
+        )
+        self._warm_thread.start()
+        return True
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "state": s.state,
+                "load_ms": s.load_ms,
+                "warm_ms": s.warm_ms,
+                "error": s.error,
+            }
+            for name, s in self.subsystems.items()
+        }
@@ -0,0 +1,61 @@
+"""
+Binary encoding helpers for stored embedding vectors
+Vectors are stored as raw little-endian float32 bytes (bytea) and decoded with
+numpy.frombuffer, avoiding JSON parsing and Python float lists entirely.
+Optional float16 / int8 quantized copies trade precision for size.
+"""
+
+import json
+from typing import List, Tuple, Union
+
+import numpy as np
+
+
+FLOAT32 = np.dtype("<f4")
+FLOAT16 = np.dtype("<f2")
+INT8 = np.dtype("i1")
+
+VectorLike = Union[List[float], np.ndarray]
+BufferLike = Union[bytes, bytearray, memoryview]
+
+
+def encode_float32(vector: VectorLike) -> bytes:
+    """Encode a vector as little-endian float32 bytes."""
+    return np.asarray(vector, dtype=FLOAT32).tobytes()
+
+
+def decode_float32(buf: BufferLike) -> np.ndarray:
+    """Decode little-endian float32 bytes into a read-only numpy view."""
+    return np.frombuffer(buf, dtype=FLOAT32)
+
+
+def encode_float16(vector: VectorLike) -> bytes:
+    """Encode a vector as little-endian float16 bytes (half the size of float32)."""
+    return np.asarray(vector, dtype=FLOAT16).tobytes()
+
+
+def decode_float16(buf: BufferLike) -> np.ndarray:
+    """Decode float16 bytes into a float32 array."""
+    return np.frombuffer(buf, dtype=FLOAT16).astype(np.float32)
+
+
+def quantize_int8(vector: VectorLike) -> Tuple[bytes, float]:
+    """Symmetric int8 quantization; returns (bytes, scale)."""
+    vec = np.asarray(vector, dtype=np.float32)
+    peak = float(np.max(np.abs(vec))) if vec.size else 0.0
+    scale = peak / 127.0 if peak else 1.0
+    return np.round(vec / scale).astype(INT8).tobytes(), scale
+
+
+def dequantize_int8(buf: BufferLike, scale: float) -> np.ndarray:
+    """Decode int8 bytes produced by quantize_int8 into a float32 array."""
+    return np.frombuffer(buf, dtype=INT8).astype(np.float32) * np.float32(scale)
+
+
+def decode_embedding(value) -> np.ndarray:
+    """Decode an embeddings.embedding value in either binary or legacy JSON form."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return decode_float32(value)
+    if isinstance(value, str):
+        return np.asarray(json.loads(value), dtype=np.float32)
+    return np.asarray(value, dtype=np.float32)
@@ -0,0 +1,322 @@
+"""
+In-process vector index for Mosaic RAG retrieval
+Keeps normalized float32 embeddings in memory and answers top-k cosine queries.
+Uses exact (flat) search for small corpora and an IVF index once the corpus grows.
+IVF centroids are trained on a background thread; searches keep using the flat
+scan (or the previous IVF lists) until the new ones are swapped in.
+"""
+
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# Corpus size at which the flat scan is replaced by an IVF index
+IVF_MIN_VECTORS = 20000
+# Rebuild the IVF lists when this share of rows are tombstones
+TOMBSTONE_REBUILD_RATIO = 0.2
+# Share of IVF lists probed per query; nlist grows as sqrt(N), so a fixed count
+# would scan an ever smaller slice of the corpus
+IVF_NPROBE_FRACTION = float(os.getenv("VECTOR_INDEX_NPROBE_FRACTION", "0.1"))
+IVF_MIN_NPROBE = int(os.getenv("VECTOR_INDEX_MIN_NPROBE", "8"))
+
+
+class VectorIndex:
+    """Cosine-similarity index supporting incremental add/remove."""
+
+    def __init__(
+        self,
+        ivf_min_vectors: int = IVF_MIN_VECTORS,
+        nprobe: Optional[int] = None,
+        kmeans_iterations: int = 8,
+        kmeans_sample_size: int = 50000,
+        background_training: bool = True,
+    ):
+        self.ivf_min_vectors = ivf_min_vectors
+        self.nprobe = nprobe  # None scales with the number of lists
+        self.kmeans_iterations = kmeans_iterations
+        self.kmeans_sample_size = kmeans_sample_size
+        self.background_training = background_training
+
+        self._lock = threading.RLock()
+        self._dim: Optional[int] = None
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._size = 0  # Rows used in the backing arrays (including tombstones)
+        self._keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._payloads: Dict[str, Dict[str, Any]] = {}
+
+        # IVF state (None while flat search is used)
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        self._ivf_built_size = 0
+        self._generation = 0  # Bumped when rows are renumbered by compaction
+        self._training: Optional[threading.Thread] = None
+        self.trainings = 0
+
+        self.last_search_ms = 0.0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._rows)
+
+    def _grow(self, needed: int):
+        """Grow backing arrays geometrically so appends stay amortized O(1)."""
+        capacity = self._vectors.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, 1024)
+        vectors = np.zeros((new_capacity, self._dim), dtype=np.float32)
+        vectors[: self._size] = self._vectors[: self._size]
+        norms = np.zeros(new_capacity, dtype=np.float32)
+        norms[: self._size] = self._norms[: self._size]
+        alive = np.zeros(new_capacity, dtype=bool)
+        alive[: self._size] = self._alive[: self._size]
+        self._vectors, self._norms, self._alive = vectors, norms, alive
+
+    def add(self, key: str, vector: List[float], payload: Optional[Dict[str, Any]] = None):
+        """Add or replace a vector under key."""
+        self.add_many([(key, vector, payload)])
+
+    def add_many(self, items: List[Tuple[str, List[float], Optional[Dict[str, Any]]]]):
+        """Add or replace several vectors in one locked pass."""
+        if not items:
+            return
+        with self._lock:
+            for key, vector, payload in items:
+                vec = np.asarray(vector, dtype=np.float32).ravel()
+                if self._dim is None:
+                    self._dim = vec.shape[0]
+                    self._vectors = np.zeros((0, self._dim), dtype=np.float32)
+                if vec.shape[0] != self._dim:
+                    print(f"Skipping vector {key[:12]}: dimension {vec.shape[0]} != {self._dim}")
+                    continue
+
+                self._remove_locked(key)
+                norm = float(np.linalg.norm(vec))
+                row = self._size
+                self._grow(row + 1)
+                self._vectors[row] = vec / norm if norm else vec
+                self._norms[row] = norm
+                self._alive[row] = True
+                self._size += 1
+                self._keys.append(key)
+                self._rows[key] = row
+                self._payloads[key] = payload or {}
+
+                if self._centroids is not None:
+                    self._lists[self._nearest_centroids(self._vectors[row], 1)[0]].append(row)
+
+            self._maybe_reindex()
+
+    def remove(self, key: str) -> bool:
+        """Tombstone the vector stored under key."""
+        with self._lock:
+            removed = self._remove_locked(key)
+            if removed:
+                self._maybe_reindex()
+            return removed
+
+    def _remove_locked(self, key: str) -> bool:
+        row = self._rows.pop(key, None)
+        if row is None:
+            return False
+        self._alive[row] = False
+        self._payloads.pop(key, None)
+        return True
+
+    def _maybe_reindex(self):
+        """Compact tombstones and (re)train IVF lists when the corpus has changed enough."""
+        dead = self._size - len(self._rows)
+        if self._size and dead / self._size > TOMBSTONE_REBUILD_RATIO:
+            self._compact()
+
+        live = len(self._rows)
+        if live < self.ivf_min_vectors:
+            self._centroids = None
+            self._lists = []
+            return
+        if self._centroids is None or live >= 2 * self._ivf_built_size:
+            self._start_training()
+
+    def _compact(self):
+        """Drop tombstoned rows from the backing arrays."""
+        live_rows = np.flatnonzero(self._alive[: self._size])
+        keys = [self._keys[row] for row in live_rows]
+        self._vectors = self._vectors[live_rows].copy()
+        self._norms = self._norms[live_rows].copy()
+        self._alive = np.ones(len(live_rows), dtype=bool)
+        self._size = len(live_rows)
+        self._keys = keys
+        self._rows = {key: row for row, key in enumerate(keys)}
+        self._generation += 1
+        # Row numbers changed; serve flat results until lists are retrained
+        self._centroids = None
+        self._lists = []
+
+    def _start_training(self):
+        """Train IVF lists from a snapshot of the live rows, off the lock when backgrounded."""
+        if self._training is not None:
+            return
+        # Rows below _size are never rewritten in place (growth and compaction copy),
+        # so the current array can be read without the lock
+        snapshot = (self._vectors, self._alive[: self._size].copy(), self._generation)
+        if not self.background_training:
+            self._train(*snapshot)
+            return
+        self._training = threading.Thread(
+            target=self._train, args=snapshot, name="vector-index-ivf", daemon=True
+        )
+        self._training.start()
+
+    def _train(self, vectors: np.ndarray, alive: np.ndarray, generation: int):
+        try:
+            live_rows = np.flatnonzero(alive)
+            centroids = self._kmeans(vectors, live_rows)
+            lists: List[List[int]] = [[] for _ in range(len(centroids))]
+            self._assign_rows(vectors, live_rows, centroids, lists)
+            with self._lock:
+                if generation != self._generation or len(self._rows) < self.ivf_min_vectors:
+                    return  # Stale snapshot; the next add or remove retrains if needed
+                # Rows added while training ran
+                late_rows = np.arange(len(alive), self._size)
+                self._assign_rows(self._vectors, late_rows, centroids, lists)
+                self._centroids, self._lists = centroids, lists
+                self._ivf_built_size = len(live_rows)
+                self.trainings += 1
+        except Exception as e:
+            print(f"⚠️ Vector index IVF training failed: {e}")
+        finally:
+            with self._lock:
+                if threading.current_thread() is self._training:
+                    self._training = None
+
+    def wait_for_training(self, timeout: Optional[float] = None) -> bool:
+        """Block until a running IVF training finishes; False on timeout."""
+        thread = self._training
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    def _kmeans(self, vectors: np.ndarray, live_rows: np.ndarray) -> np.ndarray:
+        """Train coarse centroids with k-means on a sample of live vectors."""
+        nlist = max(1, int(np.sqrt(len(live_rows))))
+        rng = np.random.default_rng(0)
+        sample_rows = live_rows
+        if len(live_rows) > self.kmeans_sample_size:
+            sample_rows = rng.choice(live_rows, self.kmeans_sample_size, replace=False)
+        sample = vectors[sample_rows]
+
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(self.kmeans_iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assignment == c]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    norm = np.linalg.norm(centroid)
+                    centroids[c] = centroid / norm if norm else centroid
+
+        return centroids.astype(np.float32)
+
+    @staticmethod
+    def _assign_rows(
+        vectors: np.ndarray, rows: np.ndarray, centroids: np.ndarray, lists: List[List[int]]
+    ):
+        # Chunk the assignment to bound the temporary score matrix
+        for start in range(0, len(rows), 8192):
+            chunk = rows[start : start + 8192]
+            assignment = np.argmax(vectors[chunk] @ centroids.T, axis=1)
+            for row, c in zip(chunk, assignment):
+                lists[c].append(int(row))
+
+    def _probe_count(self) -> int:
+        if self.nprobe is not None:
+            return self.nprobe
+        nlist = len(self._lists)
+        return min(nlist, max(IVF_MIN_NPROBE, math.ceil(nlist * IVF_NPROBE_FRACTION)))
+
+    def _nearest_centroids(self, query: np.ndarray, n: int) -> np.ndarray:
+        scores = self._centroids @ query
+        n = min(n, len(scores))
+        top = np.argpartition(-scores, n - 1)[:n]
+        return top[np.argsort(-scores[top])]
+
+    def search(
+        self, query: List[float], k: int = 5, min_similarity: float = -1.0
+    ) -> List[Dict[str, Any]]:
+        """Return up to k matches as {"key", "similarity", "norm", **payload}, best first."""
+        start = time.perf_counter()
+        with self._lock:
+            if not self._rows or self._dim is None:
+                return []
+            q = np.asarray(query, dtype=np.float32).ravel()
+            if q.shape[0] != self._dim:
+                return []
+            q_norm = float(np.linalg.norm(q))
+            if q_norm == 0:
+                return []
+            q = q / q_norm
+
+            if self._centroids is not None:
+                probes = self._nearest_centroids(q, self._probe_count())
+                candidates = np.fromiter(
+                    (row for c in probes for row in self._lists[c]), dtype=np.int64
+                )
+                candidates = candidates[self._alive[candidates]]
+            else:
+                candidates = np.flatnonzero(self._alive[: self._size])
+            if not len(candidates):
+                return []
+
+            scores = self._vectors[candidates] @ q
+            keep = scores >= min_similarity
+            candidates, scores = candidates[keep], scores[keep]
+            k = min(k, len(scores))
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+
+            results = []
+            for i in top:
+                row = int(candidates[i])
+                key = self._keys[row]
+                results.append(
+                    {
+                        "key": key,
+                        "similarity": float(scores[i]),
+                        "norm": float(self._norms[row]),
+                        **self._payloads.get(key, {}),
+                    }
+                )
+        self.last_search_ms = (time.perf_counter() - start) * 1000
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size and layout statistics."""
+        with self._lock:
+            return {
+                "vectors": len(self._rows),
+                "tombstones": self._size - len(self._rows),
+                "dimension": self._dim,
+                "mode": "ivf" if self._centroids is not None else "flat",
+                "ivf_lists": len(self._lists),
+                "nprobe": self._probe_count() if self._centroids is not None else None,
+                "training": self._training is not None,
+                "trainings": self.trainings,
+                "last_search_ms": round(self.last_search_ms, 3),
+            }
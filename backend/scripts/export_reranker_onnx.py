@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Export the reranker cross-encoder to an int8-quantized ONNX model.
+
+Writes model.int8.onnx and tokenizer.json to backend/models/reranker-onnx (or
+--output), which the reranker's ONNX backend loads with onnxruntime and the
+tokenizers library only. Run it once on a machine with PyTorch installed:
+
+    pip install torch transformers onnx onnxruntime
+    python backend/scripts/export_reranker_onnx.py
+
+and ship the output directory with the backend (or point RERANKER_ONNX_DIR at it).
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+
+DEFAULT_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+DEFAULT_OUTPUT = Path(__file__).resolve().parent.parent / "models" / "reranker-onnx"
+
+SAMPLE_PAIRS = [
+    ("python developer", "Senior Python developer building FastAPI services"),
+    ("python developer", "Registered nurse for night shifts"),
+    ("career change into data", "Junior data analyst role, training provided"),
+]
+
+
+def encode(tokenizer, pairs):
+    queries, documents = [q for q, _ in pairs], [d for _, d in pairs]
+    return tokenizer(queries, documents, return_tensors="pt", padding=True, truncation=True)
+
+
+def export(model_name: str, output: Path, opset: int):
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    output.mkdir(parents=True, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+
+    # tokenizer.json is all the runtime needs from the tokenizer
+    tokenizer.save_pretrained(str(output))
+
+    inputs = encode(tokenizer, SAMPLE_PAIRS[:1])
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    dynamic = {name: {0: "batch", 1: "sequence"} for name in names}
+    dynamic["logits"] = {0: "batch"}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fp32_path = Path(tmp) / "model.onnx"
+        torch.onnx.export(
+            model,
+            tuple(inputs[name] for name in names),
+            str(fp32_path),
+            input_names=names,
+            output_names=["logits"],
+            dynamic_axes=dynamic,
+            opset_version=opset,
+        )
+        quantize_dynamic(
+            str(fp32_path), str(output / "model.int8.onnx"), weight_type=QuantType.QInt8
+        )
+
+    return tokenizer, model
+
+
+def check_parity(tokenizer, model, output: Path):
+    """Compare quantized ONNX scores with the PyTorch model on sample pairs."""
+    import numpy as np
+    import onnxruntime
+    import torch
+
+    inputs = encode(tokenizer, SAMPLE_PAIRS)
+    with torch.no_grad():
+        expected = torch.sigmoid(model(**inputs).logits[:, 0]).numpy()
+
+    session = onnxruntime.InferenceSession(
+        str(output / "model.int8.onnx"), providers=["CPUExecutionProvider"]
+    )
+    feeds = {i.name: inputs[i.name].numpy() for i in session.get_inputs()}
+    actual = 1 / (1 + np.exp(-session.run(None, feeds)[0][:, 0]))
+
+    print(f"PyTorch scores: {np.round(expected, 4).tolist()}")
+    print(f"ONNX int8 scores: {np.round(actual, 4).tolist()}")
+    print(f"Max abs difference: {float(np.max(np.abs(expected - actual))):.4f}")
+    if list(np.argsort(-expected)) != list(np.argsort(-actual)):
+        print("WARNING: quantized model ranks the sample pairs differently")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args()
+
+    tokenizer, model = export(args.model, args.output, args.opset)
+    check_parity(tokenizer, model, args.output)
+    print(f"Exported {args.model} to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+-- Store embedding vectors as raw float32 bytes instead of JSON text
+-- Migration: 002_embeddings_binary_vectors
+-- Date: 2026-10-17
+
+-- Embeddings table used by the RAG engine
+CREATE TABLE IF NOT EXISTS embeddings (
+    text_hash VARCHAR(64) PRIMARY KEY,
+    text TEXT NOT NULL,
+    embedding TEXT,
+    model VARCHAR(100) DEFAULT 'text-embedding-3-small',
+    metadata TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Binary vector columns (little-endian float32, optional int8 copy with scale)
+ALTER TABLE embeddings ALTER COLUMN embedding DROP NOT NULL;
+ALTER TABLE embeddings ADD COLUMN IF NOT EXISTS embedding_vec BYTEA;
+ALTER TABLE embeddings ADD COLUMN IF NOT EXISTS embedding_dim INTEGER;
+ALTER TABLE embeddings ADD COLUMN IF NOT EXISTS embedding_q8 BYTEA;
+ALTER TABLE embeddings ADD COLUMN IF NOT EXISTS embedding_q8_scale REAL;
+
+-- Incremental index loads scan by created_at
+CREATE INDEX IF NOT EXISTS idx_embeddings_created_at ON embeddings(created_at);
+
+-- Existing JSON rows are converted by corpus_reindex.migrate_embeddings_to_binary()
@@ -0,0 +1,13 @@
+-- Persistent embedding cache shared across workers and restarts
+-- Migration: 003_embedding_cache
+-- Date: 2026-10-17
+
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    model VARCHAR(100) NOT NULL,
+    text_hash VARCHAR(64) NOT NULL,
+    embedding BYTEA NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (model, text_hash)
+);
+
+CREATE INDEX IF NOT EXISTS idx_embedding_cache_created_at ON embedding_cache(created_at);
@@ -0,0 +1,14 @@
+-- Usage tracking for cost and resource limits (Postgres)
+-- Migration: 004_usage_tracking
+-- Date: 2026-10-17
+
+CREATE TABLE IF NOT EXISTS usage_tracking (
+    id BIGSERIAL PRIMARY KEY,
+    operation VARCHAR(50) NOT NULL,
+    estimated_cost DOUBLE PRECISION DEFAULT 0.0,
+    success BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Counter seeding and re-sync scan month-to-date and last-hour ranges
+CREATE INDEX IF NOT EXISTS idx_usage_tracking_created_at ON usage_tracking(created_at);
@@ -0,0 +1,248 @@
+-- Daily partitions and minute/hour/day rollups for analytics tables
+-- Migration: 005_analytics_rollups
+-- Date: 2026-10-17
+
+-- Name of the column a partitioned table is ranged on
+CREATE OR REPLACE FUNCTION analytics_partition_column(parent TEXT)
+RETURNS TEXT AS $$
+    SELECT a.attname::TEXT
+    FROM pg_partitioned_table pt
+    JOIN pg_attribute a ON a.attrelid = pt.partrelid AND a.attnum = pt.partattrs[0]
+    WHERE pt.partrelid = to_regclass(parent);
+$$ LANGUAGE sql STABLE;
+
+-- Create one partition per UTC day in [from_day, to_day] (named <parent>_YYYYMMDD).
+-- Rows that already landed in <parent>_default for that day are moved into the new
+-- partition; Postgres refuses to create a partition overlapping rows in DEFAULT.
+CREATE OR REPLACE FUNCTION analytics_ensure_partitions(parent TEXT, from_day DATE, to_day DATE)
+RETURNS INTEGER AS $$
+DECLARE
+    d DATE := from_day;
+    created INTEGER := 0;
+    part TEXT;
+    default_part TEXT := parent || '_default';
+    key_column TEXT := analytics_partition_column(parent);
+    stranded BOOLEAN;
+BEGIN
+    WHILE d <= to_day LOOP
+        part := parent || '_' || to_char(d, 'YYYYMMDD');
+        IF to_regclass(part) IS NULL THEN
+            stranded := FALSE;
+            IF to_regclass(default_part) IS NOT NULL THEN
+                EXECUTE format('SELECT EXISTS (SELECT 1 FROM %I WHERE %I >= %L AND %I < %L)',
+                               default_part, key_column, d, key_column, d + 1)
+                    INTO stranded;
+            END IF;
+            IF stranded THEN
+                -- Build the partition standalone, move the day's rows out of DEFAULT,
+                -- then attach it (the attach check on DEFAULT now finds no overlap)
+                EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS)', part, parent);
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM %I WHERE %I >= %L AND %I < %L RETURNING *) '
+                    'INSERT INTO %I SELECT * FROM moved',
+                    default_part, key_column, d, key_column, d + 1, part
+                );
+                EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                               parent, part, d, d + 1);
+            ELSE
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                    part, parent, d, d + 1
+                );
+            END IF;
+            created := created + 1;
+        END IF;
+        d := d + 1;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Drop daily partitions older than keep_days and expire the same rows from DEFAULT
+CREATE OR REPLACE FUNCTION analytics_drop_partitions(parent TEXT, keep_days INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+    part RECORD;
+    dropped INTEGER := 0;
+BEGIN
+    IF to_regclass(parent || '_default') IS NOT NULL THEN
+        EXECUTE format('DELETE FROM %I WHERE %I < %L', parent || '_default',
+                       analytics_partition_column(parent), CURRENT_DATE - keep_days);
+    END IF;
+    FOR part IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = parent AND c.relname ~ ('^' || parent || '_[0-9]{8}$')
+    LOOP
+        IF to_date(right(part.relname, 8), 'YYYYMMDD') < CURRENT_DATE - keep_days THEN
+            EXECUTE format('DROP TABLE IF EXISTS %I', part.relname);
+            dropped := dropped + 1;
+        END IF;
+    END LOOP;
+    RETURN dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Move an existing unpartitioned table aside so it can be recreated partitioned
+CREATE OR REPLACE FUNCTION analytics_set_aside_legacy(parent TEXT)
+RETURNS BOOLEAN AS $$
+BEGIN
+    IF to_regclass(parent) IS NULL OR EXISTS (
+        SELECT 1 FROM pg_partitioned_table pt
+        JOIN pg_class c ON c.oid = pt.partrelid
+        WHERE c.relname = parent
+    ) THEN
+        RETURN FALSE;
+    END IF;
+    EXECUTE format('ALTER TABLE %I RENAME TO %I', parent, parent || '_legacy');
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Copy the named columns from <parent>_legacy into the partitioned table, then drop it.
+-- Columns are listed so extra or reordered legacy columns can't shift values.
+CREATE OR REPLACE FUNCTION analytics_adopt_legacy(parent TEXT, ts_column TEXT, column_names TEXT[])
+RETURNS VOID AS $$
+DECLARE
+    first_day DATE;
+    last_day DATE;
+    column_list TEXT;
+BEGIN
+    IF to_regclass(parent || '_legacy') IS NULL THEN
+        RETURN;
+    END IF;
+    SELECT string_agg(quote_ident(c), ', ') INTO column_list FROM unnest(column_names) AS c;
+    EXECUTE format('SELECT MIN(%I)::date, MAX(%I)::date FROM %I', ts_column, ts_column,
+                   parent || '_legacy')
+        INTO first_day, last_day;
+    IF first_day IS NOT NULL THEN
+        PERFORM analytics_ensure_partitions(parent, first_day, last_day);
+        EXECUTE format('INSERT INTO %I (%s) SELECT %s FROM %I WHERE %I IS NOT NULL',
+                       parent, column_list, column_list, parent || '_legacy', ts_column);
+        EXECUTE format(
+            'SELECT setval(pg_get_serial_sequence(%L, ''id''), COALESCE(MAX(id), 0) + 1, FALSE) '
+            'FROM %I',
+            parent, parent
+        );
+    END IF;
+    EXECUTE format('DROP TABLE %I', parent || '_legacy');
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT analytics_set_aside_legacy('usage_tracking');
+SELECT analytics_set_aside_legacy('match_analytics');
+SELECT analytics_set_aside_legacy('token_usage');
+
+-- Raw event tables, partitioned by day
+CREATE TABLE IF NOT EXISTS usage_tracking (
+    id BIGSERIAL,
+    operation VARCHAR(50) NOT NULL,
+    estimated_cost DOUBLE PRECISION DEFAULT 0.0,
+    success BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE IF NOT EXISTS match_analytics (
+    id BIGSERIAL,
+    query_hash TEXT,
+    query_text TEXT,
+    pre_rerank_avg REAL,
+    post_rerank_avg REAL,
+    improvement_pct REAL,
+    processing_time REAL,
+    timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc'),
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+CREATE TABLE IF NOT EXISTS token_usage (
+    id BIGSERIAL,
+    operation TEXT,
+    tokens INTEGER,
+    cost REAL,
+    success BOOLEAN,
+    timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc'),
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+SELECT analytics_adopt_legacy('usage_tracking', 'created_at',
+    ARRAY['id', 'operation', 'estimated_cost', 'success', 'created_at']);
+SELECT analytics_adopt_legacy('match_analytics', 'timestamp',
+    ARRAY['id', 'query_hash', 'query_text', 'pre_rerank_avg', 'post_rerank_avg',
+          'improvement_pct', 'processing_time', 'timestamp']);
+SELECT analytics_adopt_legacy('token_usage', 'timestamp',
+    ARRAY['id', 'operation', 'tokens', 'cost', 'success', 'timestamp']);
+
+-- Created after the legacy tables (and their same-named indexes) are gone
+CREATE INDEX IF NOT EXISTS idx_usage_tracking_created_at ON usage_tracking(created_at);
+CREATE INDEX IF NOT EXISTS idx_match_analytics_timestamp ON match_analytics(timestamp);
+CREATE INDEX IF NOT EXISTS idx_token_usage_timestamp ON token_usage(timestamp);
+
+-- Partitions for the coming week; analytics_store.run_maintenance() keeps this rolling
+SELECT analytics_ensure_partitions('usage_tracking', CURRENT_DATE, CURRENT_DATE + 7);
+SELECT analytics_ensure_partitions('match_analytics', CURRENT_DATE, CURRENT_DATE + 7);
+SELECT analytics_ensure_partitions('token_usage', CURRENT_DATE, CURRENT_DATE + 7);
+
+-- Catch-all so inserts never fail if maintenance falls behind
+CREATE TABLE IF NOT EXISTS usage_tracking_default PARTITION OF usage_tracking DEFAULT;
+CREATE TABLE IF NOT EXISTS match_analytics_default PARTITION OF match_analytics DEFAULT;
+CREATE TABLE IF NOT EXISTS token_usage_default PARTITION OF token_usage DEFAULT;
+
+-- Rollups: one row per (granularity, bucket_start[, operation]), maintained by upsert
+CREATE TABLE IF NOT EXISTS usage_tracking_rollup (
+    granularity VARCHAR(10) NOT NULL,
+    bucket_start TIMESTAMP NOT NULL,
+    operation VARCHAR(50) NOT NULL,
+    requests BIGINT NOT NULL DEFAULT 0,
+    successes BIGINT NOT NULL DEFAULT 0,
+    cost DOUBLE PRECISION NOT NULL DEFAULT 0,
+    PRIMARY KEY (granularity, bucket_start, operation)
+);
+
+CREATE TABLE IF NOT EXISTS match_analytics_rollup (
+    granularity VARCHAR(10) NOT NULL,
+    bucket_start TIMESTAMP NOT NULL,
+    queries BIGINT NOT NULL DEFAULT 0,
+    sum_pre_rerank DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sum_post_rerank DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sum_improvement_pct DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sum_processing_time DOUBLE PRECISION NOT NULL DEFAULT 0,
+    PRIMARY KEY (granularity, bucket_start)
+);
+
+CREATE TABLE IF NOT EXISTS token_usage_rollup (
+    granularity VARCHAR(10) NOT NULL,
+    bucket_start TIMESTAMP NOT NULL,
+    operation TEXT NOT NULL,
+    operations BIGINT NOT NULL DEFAULT 0,
+    tokens BIGINT NOT NULL DEFAULT 0,
+    successful_tokens BIGINT NOT NULL DEFAULT 0,
+    cost DOUBLE PRECISION NOT NULL DEFAULT 0,
+    PRIMARY KEY (granularity, bucket_start, operation)
+);
+
+-- Backfill rollups from existing raw rows
+INSERT INTO usage_tracking_rollup
+SELECT g, date_trunc(g, created_at), operation, COUNT(*),
+       COUNT(*) FILTER (WHERE success), COALESCE(SUM(estimated_cost), 0)
+FROM usage_tracking CROSS JOIN unnest(ARRAY['minute', 'hour', 'day']) AS g
+GROUP BY 1, 2, 3
+ON CONFLICT DO NOTHING;
+
+INSERT INTO match_analytics_rollup
+SELECT g, date_trunc(g, timestamp AT TIME ZONE 'UTC'), COUNT(*),
+       COALESCE(SUM(pre_rerank_avg), 0), COALESCE(SUM(post_rerank_avg), 0),
+       COALESCE(SUM(improvement_pct), 0), COALESCE(SUM(processing_time), 0)
+FROM match_analytics CROSS JOIN unnest(ARRAY['minute', 'hour', 'day']) AS g
+GROUP BY 1, 2
+ON CONFLICT DO NOTHING;
+
+INSERT INTO token_usage_rollup
+SELECT g, date_trunc(g, timestamp AT TIME ZONE 'UTC'), COALESCE(operation, 'unknown'), COUNT(*),
+       COALESCE(SUM(tokens), 0), COALESCE(SUM(tokens) FILTER (WHERE success), 0),
+       COALESCE(SUM(cost), 0)
+FROM token_usage CROSS JOIN unnest(ARRAY['minute', 'hour', 'day']) AS g
+GROUP BY 1, 2, 3
+ON CONFLICT DO NOTHING;
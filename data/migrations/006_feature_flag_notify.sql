@@ -0,0 +1,30 @@
+-- Notify listeners when feature flags change so cached snapshots refresh immediately
+-- Migration: 006_feature_flag_notify
+-- Date: 2026-10-17
+
+CREATE TABLE IF NOT EXISTS feature_flags (
+    id SERIAL PRIMARY KEY,
+    flag_name TEXT UNIQUE NOT NULL,
+    enabled BOOLEAN DEFAULT FALSE,
+    description TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE OR REPLACE FUNCTION feature_flags_notify()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('feature_flags_changed', OLD.flag_name);
+        RETURN OLD;
+    END IF;
+    NEW.updated_at := CURRENT_TIMESTAMP;
+    PERFORM pg_notify('feature_flags_changed', NEW.flag_name);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_feature_flags_notify ON feature_flags;
+CREATE TRIGGER trg_feature_flags_notify
+BEFORE INSERT OR UPDATE OR DELETE ON feature_flags
+FOR EACH ROW EXECUTE FUNCTION feature_flags_notify();
@@ -0,0 +1,22 @@
+-- Store response text in prompt_selector_cache so cached prompts can be served
+-- Migration: 007_prompt_selector_response_cache
+-- Date: 2026-10-17
+
+CREATE TABLE IF NOT EXISTS prompt_selector_cache (
+    id SERIAL PRIMARY KEY,
+    prompt_hash TEXT UNIQUE,
+    csv_available BOOLEAN,
+    ai_fallback_used BOOLEAN,
+    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+ALTER TABLE prompt_selector_cache ADD COLUMN IF NOT EXISTS response TEXT;
+ALTER TABLE prompt_selector_cache ADD COLUMN IF NOT EXISTS source VARCHAR(20);
+ALTER TABLE prompt_selector_cache ADD COLUMN IF NOT EXISTS provider VARCHAR(50);
+ALTER TABLE prompt_selector_cache ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP;
+
+-- Rows written before this migration hold only booleans and can never be served
+DELETE FROM prompt_selector_cache WHERE response IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_prompt_selector_cache_expires_at
+    ON prompt_selector_cache(expires_at);
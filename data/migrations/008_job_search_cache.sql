@@ -0,0 +1,12 @@
+-- Shared job search result cache (stale-while-revalidate)
+-- Migration: 008_job_search_cache
+-- Date: 2026-10-17
+
+CREATE TABLE IF NOT EXISTS job_search_cache (
+    cache_key VARCHAR(64) PRIMARY KEY,
+    source VARCHAR(50) NOT NULL,
+    payload JSONB NOT NULL,
+    fetched_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_job_search_cache_fetched_at ON job_search_cache(fetched_at);
@@ -0,0 +1,33 @@
+-- Local job index filled by background feed ingestion
+-- Migration: 009_job_postings
+-- Date: 2026-10-17
+
+CREATE TABLE IF NOT EXISTS job_postings (
+    id TEXT PRIMARY KEY,
+    source VARCHAR(50) NOT NULL,
+    title TEXT NOT NULL,
+    company TEXT,
+    location TEXT,
+    description TEXT,
+    url TEXT,
+    posted_date TIMESTAMP,
+    salary_range TEXT,
+    job_type TEXT,
+    remote BOOLEAN NOT NULL DEFAULT FALSE,
+    skills JSONB NOT NULL DEFAULT '[]',
+    experience_level TEXT,
+    metadata JSONB NOT NULL DEFAULT '{}',
+    -- Same title at the same company, whichever source it came from
+    fingerprint VARCHAR(64) NOT NULL,
+    first_seen_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    last_seen_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(company, '')), 'B')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED
+);
+
+CREATE INDEX IF NOT EXISTS idx_job_postings_search ON job_postings USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_job_postings_fingerprint ON job_postings(fingerprint);
+CREATE INDEX IF NOT EXISTS idx_job_postings_source_seen ON job_postings(source, last_seen_at);
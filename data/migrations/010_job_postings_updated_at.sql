@@ -0,0 +1,8 @@
+-- Track content changes on ingested postings so in-process search indexes
+-- can sync incrementally instead of re-reading every posting
+-- Migration: 010_job_postings_updated_at
+-- Date: 2026-10-17
+
+ALTER TABLE job_postings ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+
+CREATE INDEX IF NOT EXISTS idx_job_postings_updated ON job_postings(updated_at);
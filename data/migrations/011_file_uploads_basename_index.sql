@@ -0,0 +1,6 @@
+-- Index upload file names so orphan-upload cleanup can look them up by name
+-- Migration: 011_file_uploads_basename_index
+-- Date: 2026-10-17
+
+CREATE INDEX IF NOT EXISTS idx_file_uploads_basename
+    ON file_uploads ((regexp_replace(file_path, '^.*/', '')));
@@ -0,0 +1,130 @@
+import asyncio
+from types import SimpleNamespace
+
+from api import ai_clients
+from api.ai_clients import AIClientManager
+
+
+class FlakyMessages:
+    """Fails with a transient error a set number of times, then succeeds."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("529 connection reset")
+        return SimpleNamespace(content=[SimpleNamespace(text="ok")])
+
+
+def make_manager(messages):
+    manager = AIClientManager()
+    manager.openai_client = None
+    manager.anthropic_client = object()
+    manager.async_anthropic_client = SimpleNamespace(messages=messages)
+    manager.backoff_delays = [0.01, 0.01, 0.01]
+    return manager
+
+
+def test_async_anthropic_retries_transient_errors(monkeypatch):
+    monkeypatch.setattr(ai_clients, "AI_PACKAGES_AVAILABLE", True)
+    messages = FlakyMessages(failures=2)
+    manager = make_manager(messages)
+
+    result = asyncio.run(manager.generate_fallback_response_async("hello"))
+
+    assert result["response"] == "ok"
+    assert result["provider"] == "anthropic"
+    assert messages.calls == 3
+
+
+def test_async_backoff_does_not_block_event_loop(monkeypatch):
+    monkeypatch.setattr(ai_clients, "AI_PACKAGES_AVAILABLE", True)
+    manager = make_manager(FlakyMessages(failures=3))
+    manager.backoff_delays = [0.05, 0.05, 0.05]
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(1)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        return await asyncio.gather(manager.generate_fallback_response_async("hello"), ticker())
+
+    result, _ = asyncio.run(main())
+
+    assert result["response"] == "ok"
+    assert len(ticks) == 5
+
+
+def test_async_gives_up_after_retries(monkeypatch):
+    monkeypatch.setattr(ai_clients, "AI_PACKAGES_AVAILABLE", True)
+    messages = FlakyMessages(failures=10)
+    manager = make_manager(messages)
+
+    result = asyncio.run(manager.generate_fallback_response_async("hello"))
+
+    assert result["fallback_used"] is False
+    assert messages.calls == 4
+
+
+class StreamingMessages:
+    """Streams the given chunks, optionally failing after them."""
+
+    def __init__(self, chunks, fail=False):
+        self.chunks = chunks
+        self.fail = fail
+        self.calls = 0
+
+    def stream(self, **kwargs):
+        messages = self
+
+        class Stream:
+            async def __aenter__(self):
+                messages.calls += 1
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            @property
+            async def text_stream(self):
+                for chunk in messages.chunks:
+                    yield chunk
+                if messages.fail:
+                    raise RuntimeError("connection reset")
+
+        return Stream()
+
+
+def test_async_streams_deltas_to_callback(monkeypatch):
+    monkeypatch.setattr(ai_clients, "AI_PACKAGES_AVAILABLE", True)
+    manager = make_manager(StreamingMessages(["Try ", "a small ", "experiment"]))
+    deltas = []
+
+    async def on_delta(text):
+        deltas.append(text)
+
+    result = asyncio.run(manager.generate_fallback_response_async("hello", on_delta=on_delta))
+
+    assert deltas == ["Try ", "a small ", "experiment"]
+    assert result["response"] == "Try a small experiment"
+    assert "incomplete" not in result
+
+
+def test_async_broken_stream_is_not_retried(monkeypatch):
+    monkeypatch.setattr(ai_clients, "AI_PACKAGES_AVAILABLE", True)
+    messages = StreamingMessages(["Try "], fail=True)
+    manager = make_manager(messages)
+
+    async def on_delta(text):
+        pass
+
+    result = asyncio.run(manager.generate_fallback_response_async("hello", on_delta=on_delta))
+
+    assert messages.calls == 1
+    assert result["response"] == "Try "
+    assert result["incomplete"] is True
@@ -0,0 +1,88 @@
+from contextlib import contextmanager
+from datetime import datetime
+
+from api import analytics_store
+from api.analytics import AnalyticsEngine
+from api.analytics_store import TOKEN_ROLLUP, aggregate_events, upsert_rollups
+
+
+class FakeCursor:
+    def __init__(self, rows=None):
+        self.rows = rows or []
+        self.statements = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.statements.append((" ".join(sql.split()), params))
+
+    def executemany(self, sql, rows):
+        self.statements.append((" ".join(sql.split()), list(rows)))
+
+    def fetchall(self):
+        return self.rows
+
+
+def fake_get_conn(cursor):
+    class Conn:
+        def cursor(self):
+            return cursor
+
+    @contextmanager
+    def get_conn():
+        yield Conn()
+
+    return get_conn
+
+
+def test_events_are_summed_per_bucket_and_dimension():
+    t1 = datetime(2026, 10, 17, 9, 15, 10)
+    t2 = datetime(2026, 10, 17, 9, 15, 50)
+    t3 = datetime(2026, 10, 17, 10, 5)
+
+    totals = aggregate_events(
+        [
+            (t1, ("chat",), (1, 100, 100, 0.01)),
+            (t2, ("chat",), (1, 50, 0, 0.005)),
+            (t3, ("chat",), (1, 10, 10, 0.001)),
+        ]
+    )
+
+    assert totals[("minute", datetime(2026, 10, 17, 9, 15), "chat")] == [2, 150, 100, 0.015]
+    assert totals[("hour", datetime(2026, 10, 17, 9), "chat")][0] == 2
+    assert totals[("day", datetime(2026, 10, 17), "chat")][:3] == [3, 160, 110]
+
+
+def test_upsert_increments_existing_buckets():
+    cursor = FakeCursor()
+
+    event = (datetime(2026, 1, 1), ("chat",), (1, 5, 5, 0.1))
+
+    written = upsert_rollups(cursor, TOKEN_ROLLUP, [event])
+
+    sql, rows = cursor.statements[0]
+    assert written == 3
+    assert "ON CONFLICT (granularity, bucket_start, operation)" in sql
+    assert "tokens = token_usage_rollup.tokens + EXCLUDED.tokens" in sql
+    assert len(rows) == 3
+
+
+def test_match_dashboard_reads_rollup(monkeypatch):
+    cursor = FakeCursor(rows=[(4, 2.0, 3.0, 40.0, 0.8)])
+    monkeypatch.setattr(analytics_store, "get_conn", fake_get_conn(cursor))
+
+    result = AnalyticsEngine().get_match_analytics(days=7)
+
+    sql, params = cursor.statements[0]
+    assert "FROM match_analytics_rollup" in sql
+    # Leading partial day from hour buckets, whole days from day buckets
+    until, day_edge, hour_edge, _ = params
+    assert day_edge.hour == 0 and day_edge >= hour_edge
+    assert 6 <= (until - hour_edge).days <= 7
+    assert result["total_queries"] == 4
+    assert result["avg_pre_score"] == 0.5
+    assert result["avg_improvement_pct"] == 10.0
@@ -0,0 +1,58 @@
+import time
+
+import numpy as np
+
+from api.caching import LRUTTLCache
+from api.embedding_cache import EmbeddingCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUTTLCache(max_items=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_byte_budget_is_enforced():
+    cache = LRUTTLCache(max_items=100, max_bytes=1000)
+    for i in range(5):
+        cache.set(i, np.zeros(60, dtype=np.float32))  # 240 bytes each
+
+    stats = cache.get_stats()
+    assert stats["entries"] == 4
+    assert stats["bytes"] == 960
+    # Oversized values are refused rather than flushing the cache
+    cache.set("huge", np.zeros(1000, dtype=np.float32))
+    assert cache.get("huge") is None
+    assert len(cache) == 4
+
+
+def test_ttl_expiry_counts_as_miss():
+    cache = LRUTTLCache(ttl_seconds=0.01)
+    cache.set("k", "v")
+    time.sleep(0.02)
+
+    assert cache.get("k") is None
+    stats = cache.get_stats()
+    assert stats["expirations"] == 1
+    assert stats["misses"] == 1
+
+
+def test_embedding_cache_memory_tier_round_trip():
+    cache = EmbeddingCache()
+    cache.persistent_enabled = False
+
+    cache.put_many({"h1": [0.5, 1.5], "h2": [2.0, 3.0]})
+    found = cache.get_many(["h1", "h3"])
+
+    assert list(found) == ["h1"]
+    assert found["h1"].dtype == np.float32
+    assert found["h1"].tolist() == [0.5, 1.5]
+    assert cache.get("h2", model="other-model") is None
+    assert cache.get_stats()["memory"]["hits"] == 1
@@ -5,37 +5,149 @@ Test suite for Cost Controls
 import os
 import sys
 import unittest
+from datetime import datetime, timezone
 
 # Add the api directory to the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
 
+from api import cost_controls  # noqa: E402
+from api.cost_controls import CostController, SlidingWindowCounter  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
 
 class TestCostControls(unittest.TestCase):
     """Test cases for Cost Controls functionality"""
 
     def setUp(self):
         """Set up test environment"""
-        pass
+        self.clock = FakeClock(datetime(2026, 3, 31, 23, 59, tzinfo=timezone.utc).timestamp())
+        self.controller = CostController(background=False)
+        self.controller.clock = self.clock
+        self.controller._seeded = True
 
     def test_cost_limits(self):
         """Test cost limit enforcement"""
-        # TODO: Implement cost limit tests
-        pass
+        self.controller.cost_limits.daily_limit = 1.0
+        for _ in range(9):
+            self.controller.record_usage("embedding", 0.1)
+
+        self.assertTrue(self.controller.check_cost_limits("embedding", 0.05)["allowed"])
+        result = self.controller.check_cost_limits("embedding", 0.2)
+        self.assertFalse(result["allowed"])
+        self.assertEqual(result["reason"], "Daily cost limit exceeded")
 
     def test_resource_limits(self):
         """Test resource limit enforcement"""
-        # TODO: Implement resource limit tests
-        pass
+        self.controller.resource_limits.max_requests_per_minute = 3
+        for _ in range(3):
+            self.controller.record_usage("job_search", 0.01)
+
+        self.assertFalse(self.controller.check_resource_limits("job_search")["allowed"])
+        # The per-minute window slides; the daily count does not
+        self.clock.now += 61
+        self.assertTrue(self.controller.check_resource_limits("job_search")["allowed"])
+        usage = self.controller._get_current_usage()
+        self.assertEqual(usage["requests_this_hour"], 3)
+
+    def test_zero_limit_disables_check(self):
+        """A limit of 0 turns that check off"""
+        self.controller.resource_limits.max_requests_per_minute = 0
+        self.controller.resource_limits.max_embedding_requests = 0
+        for _ in range(5):
+            self.controller.record_usage("embedding", 0.0001)
+
+        self.assertTrue(self.controller.check_resource_limits("embedding")["allowed"])
 
     def test_usage_tracking(self):
         """Test usage tracking functionality"""
-        # TODO: Implement usage tracking tests
-        pass
+        self.controller.record_usage("embedding", 0.5)
+        self.controller.record_usage("job_search", 0.25)
+        usage = self.controller._get_current_usage()
+        self.assertEqual(usage["requests_today"], 2)
+        self.assertEqual(usage["embedding_requests_today"], 1)
+        self.assertAlmostEqual(usage["monthly_cost"], 0.75)
+
+        # Crossing midnight into a new month resets the calendar counters
+        self.clock.now += 120
+        usage = self.controller._get_current_usage()
+        self.assertEqual(usage["requests_today"], 0)
+        self.assertEqual(usage["monthly_cost"], 0.0)
+        self.assertEqual(usage["requests_this_hour"], 2)
 
     def test_emergency_stop(self):
         """Test emergency stop functionality"""
-        # TODO: Implement emergency stop tests
-        pass
+        self.controller.cost_limits.daily_limit = 100.0
+        self.controller.cost_limits.monthly_limit = 1000.0
+        self.controller.cost_limits.emergency_stop = 1.0
+        self.controller.record_usage("embedding", 2.0)
+
+        self.assertFalse(self.controller.check_cost_limits("embedding")["allowed"])
+        self.assertTrue(self.controller.emergency_stop)
+
+    def test_flush_batches_pending_rows(self):
+        """Usage rows are written in one batch and kept when the write fails"""
+        written = []
+        rollups = []
+        fail = False
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def executemany(self, sql, rows):
+                if fail:
+                    raise RuntimeError("db down")
+                (rollups if "usage_tracking_rollup" in sql else written).extend(rows)
+
+        class Conn:
+            def cursor(self):
+                return Cursor()
+
+        class GetConn:
+            def __enter__(self):
+                return Conn()
+
+            def __exit__(self, *exc):
+                return False
+
+        original = cost_controls.get_conn
+        cost_controls.get_conn = GetConn
+        try:
+            for _ in range(3):
+                self.controller.record_usage("embedding", 0.01)
+            fail = True
+            self.assertEqual(self.controller.flush(), 0)
+            self.assertEqual(self.controller.get_counter_stats()["pending_rows"], 3)
+            fail = False
+            self.assertEqual(self.controller.flush(), 3)
+        finally:
+            cost_controls.get_conn = original
+
+        self.assertEqual(len(written), 3)
+        self.assertEqual(written[0][0], "embedding")
+        # One upsert per granularity, with the batch already summed
+        self.assertEqual([row[0] for row in rollups], ["minute", "hour", "day"])
+        self.assertEqual(rollups[0][2:5], ("embedding", 3, 3))
+        self.assertEqual(self.controller.get_counter_stats()["pending_rows"], 0)
+
+    def test_sliding_window_expires_old_buckets(self):
+        """Ring buffer drops buckets older than the window"""
+        window = SlidingWindowCounter(60, 60)
+        window.add(1000.0, 1000.0, cost=1.0)
+        window.add(1030.0, 1030.0, cost=1.0)
+        self.assertEqual(window.total(1059.0), (2, 2.0))
+        self.assertEqual(window.total(1061.0), (1, 1.0))
+        self.assertEqual(window.total(5000.0), (0, 0.0))
 
 
 if __name__ == "__main__":
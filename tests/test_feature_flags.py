@@ -0,0 +1,111 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from api import feature_flags as flags_module
+from api.feature_flags import FeatureFlagService
+
+
+class FakeDB:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+        self.down = False
+
+    def get_conn(self):
+        db = self
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, sql, params=None):
+                if db.down:
+                    raise RuntimeError("db down")
+                db.queries += 1
+
+            def fetchall(self):
+                return list(db.rows.items())
+
+        class Conn:
+            def cursor(self):
+                return Cursor()
+
+        @contextmanager
+        def get_conn():
+            yield Conn()
+
+        return get_conn
+
+
+def make_service(monkeypatch, rows, ttl=60.0):
+    db = FakeDB(rows)
+    monkeypatch.setattr(flags_module, "get_conn", db.get_conn())
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    return FeatureFlagService(ttl_seconds=ttl), db
+
+
+def test_all_flags_load_in_one_query(monkeypatch):
+    service, db = make_service(monkeypatch, {"AI_FALLBACK_ENABLED": 1, "RAG_BASELINE": 0})
+
+    assert service.is_enabled("AI_FALLBACK_ENABLED") is True
+    assert service.is_enabled("RAG_BASELINE") is False
+    assert service.is_enabled("AI_FALLBACK_ENABLED") is True
+    assert db.queries == 1
+
+
+def test_missing_flag_falls_back_to_environment(monkeypatch):
+    service, _ = make_service(monkeypatch, {})
+    monkeypatch.setenv("NEW_UI_ELEMENTS", "true")
+
+    assert service.is_enabled("NEW_UI_ELEMENTS") is True
+    assert service.is_enabled("UNKNOWN_FLAG", default=True) is True
+
+
+def test_refresh_picks_up_changes_and_survives_outage(monkeypatch):
+    service, db = make_service(monkeypatch, {"RAG_BASELINE": False})
+    assert service.is_enabled("RAG_BASELINE") is False
+
+    db.rows["RAG_BASELINE"] = True
+    service.refresh()
+    assert service.is_enabled("RAG_BASELINE") is True
+
+    # A failed refresh keeps serving the last good snapshot
+    db.down = True
+    assert service.refresh() is False
+    assert service.is_enabled("RAG_BASELINE") is True
+    assert service.get_stats()["refresh_errors"] == 1
+
+
+def test_engines_share_the_service(monkeypatch):
+    from api.prompt_selector import PromptSelector
+
+    service, db = make_service(monkeypatch, {"AI_FALLBACK_ENABLED": True})
+    monkeypatch.setattr(flags_module, "feature_flags", service)
+    monkeypatch.setattr("api.prompt_selector.feature_flags", service)
+
+    selector = PromptSelector()
+    assert selector._check_feature_flag("AI_FALLBACK_ENABLED") is True
+    assert selector.get_health_status()["fallback_enabled"] is True
+    assert db.queries == 1
+
+
+def test_concurrent_first_reads_load_once(monkeypatch):
+    service, db = make_service(monkeypatch, {"RAG_BASELINE": 1})
+    load = service._load
+
+    def slow_load():
+        time.sleep(0.05)
+        return load()
+
+    service._load = slow_load
+    threads = [threading.Thread(target=service.snapshot) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert db.queries == 1
@@ -0,0 +1,80 @@
+import time
+
+from api.job_sources import JobPosting, JobSource
+from api.job_sources.aggregator import JobSearchAggregator
+
+
+class FakeSource(JobSource):
+    def __init__(self, name, delay=0.0, jobs=(), error=None):
+        super().__init__(name)
+        self.delay = delay
+        self.job_ids = jobs
+        self.error = error
+
+    def search_jobs(self, query, location=None, limit=10):
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return [
+            JobPosting(
+                id=job_id,
+                title=query,
+                company="c",
+                location="",
+                description="",
+                url="",
+                source=self.name,
+            )
+            for job_id in self.job_ids
+        ]
+
+    def get_job_details(self, job_id):
+        return None
+
+
+def test_sources_run_concurrently_and_merge_in_order():
+    aggregator = JobSearchAggregator(max_workers=4, deadline_seconds=2.0)
+    sources = [
+        FakeSource("a", delay=0.2, jobs=["1", "2"]),
+        FakeSource("b", delay=0.2, jobs=["2", "3"]),
+        FakeSource("c", delay=0.2, error=RuntimeError("down")),
+    ]
+
+    start = time.monotonic()
+    result = aggregator.search(sources, "python")
+
+    assert time.monotonic() - start < 0.5
+    assert [job.id for job in result.jobs] == ["1", "2", "3"]
+    assert result.sources_used == ["a", "b"]
+    report = result.latency_report()
+    assert report["c"]["status"] == "error"
+    assert report["a"]["jobs"] == 2
+    assert not result.timed_out
+
+
+def test_deadline_returns_partial_results():
+    aggregator = JobSearchAggregator(max_workers=4, deadline_seconds=0.1)
+    sources = [FakeSource("fast", jobs=["1"]), FakeSource("slow", delay=1.0, jobs=["2"])]
+
+    start = time.monotonic()
+    result = aggregator.search(sources, "python")
+
+    assert time.monotonic() - start < 0.5
+    assert [job.id for job in result.jobs] == ["1"]
+    assert result.timed_out
+    assert result.latency_report()["slow"]["status"] == "timeout"
+
+
+def test_sub_requests_respect_source_deadline():
+    source = FakeSource("subs")
+    source.deadline = time.monotonic() + 0.1
+
+    def fetch(delay):
+        time.sleep(delay)
+        return delay
+
+    start = time.monotonic()
+    results = source._map_concurrent(fetch, [0.0, 0.01, 1.0])
+
+    assert time.monotonic() - start < 0.5
+    assert results == [0.0, 0.01, None]
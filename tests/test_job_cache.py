@@ -0,0 +1,79 @@
+import time
+
+from api.job_sources import cache as cache_module
+from api.job_sources.aggregator import JobSearchAggregator
+from api.job_sources.cache import JobSearchCache, job_from_dict, job_to_dict
+from tests.test_job_aggregator import FakeSource
+
+
+class CountingSource(FakeSource):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = 0
+
+    def search_jobs(self, query, location=None, limit=10):
+        self.calls += 1
+        return super().search_jobs(query, location, limit)
+
+
+def make_aggregator():
+    cache = JobSearchCache(enabled=True, persistent=False)
+    return JobSearchAggregator(max_workers=4, deadline_seconds=2.0, cache=cache), cache
+
+
+def test_repeat_search_is_served_from_cache():
+    aggregator, cache = make_aggregator()
+    source = CountingSource("greenhouse", jobs=["1"])
+
+    first = aggregator.search([source], "Software  Engineer", "Remote")
+    second = aggregator.search([source], "software engineer", "remote")
+
+    assert source.calls == 1
+    assert first.latency_report()["greenhouse"]["cache"] == "miss"
+    assert second.cache_hits == ["greenhouse"]
+    assert [job.id for job in second.jobs] == ["1"]
+    assert cache.get_stats()["sources"]["greenhouse"]["fresh"] == 1
+
+
+def test_stale_entry_is_served_while_refreshing(monkeypatch):
+    aggregator, cache = make_aggregator()
+    monkeypatch.setenv("JOB_CACHE_TTL_REDDIT", "0")
+    source = CountingSource("reddit", jobs=["1"])
+    aggregator.search([source], "python")
+
+    result = aggregator.search([source], "python")
+
+    assert result.latency_report()["reddit"]["cache"] == "stale"
+    assert [job.id for job in result.jobs] == ["1"]
+    # The refresh runs on a copy of the source so the request's deadline can't cut it short
+    for _ in range(50):
+        if cache.get_stats()["sources"]["reddit"]["refreshes"]:
+            break
+        time.sleep(0.01)
+    assert cache.get_stats()["sources"]["reddit"]["refreshes"] == 1
+
+
+def test_empty_results_are_not_cached():
+    aggregator, _ = make_aggregator()
+    source = CountingSource("remoteok", jobs=[])
+
+    aggregator.search([source], "python")
+    aggregator.search([source], "python")
+
+    assert source.calls == 2
+
+
+def test_entries_too_stale_are_misses(monkeypatch):
+    cache = JobSearchCache(enabled=True, persistent=False)
+    monkeypatch.setattr(cache_module, "MAX_STALE_SECONDS", -1)
+    monkeypatch.setenv("JOB_CACHE_TTL_HACKERNEWS", "0")
+    jobs = FakeSource("hackernews", jobs=["1"]).search_jobs("python")
+    cache.put("hackernews", "python", None, 10, jobs)
+
+    assert cache.get("hackernews", "python", None, 10) is None
+
+
+def test_job_round_trips_through_json():
+    job = FakeSource("greenhouse", jobs=["1"]).search_jobs("python")[0]
+
+    assert job_from_dict(job_to_dict(job)) == job
@@ -0,0 +1,90 @@
+from api.job_sources import JobPosting
+from api.job_sources.ingestion import JobIngestor
+from api.job_sources.store import dedupe, fingerprint
+from tests.test_job_aggregator import FakeSource
+
+
+def posting(job_id, title="Backend Engineer", company="Acme", source="greenhouse"):
+    return JobPosting(
+        id=job_id,
+        title=title,
+        company=company,
+        location="Remote",
+        description="",
+        url="",
+        source=source,
+    )
+
+
+class FeedSource(FakeSource):
+    def fetch_feed(self, limit=500):
+        if self.error:
+            raise self.error
+        return [
+            posting(job_id, title=f"Role {job_id}", source=self.name) for job_id in self.job_ids
+        ]
+
+
+class FakeStore:
+    def __init__(self):
+        self.jobs = {}
+        self.expired = []
+
+    def upsert(self, jobs):
+        self.jobs.update({job.id: job for job in jobs})
+        return len(jobs)
+
+    def expire(self, source, max_age_hours):
+        self.expired.append(source)
+        return 0
+
+
+def test_fingerprint_ignores_case_and_spacing():
+    assert fingerprint(posting("1")) == fingerprint(posting("2", title=" backend  ENGINEER "))
+    assert fingerprint(posting("1")) != fingerprint(posting("3", company="Other"))
+
+
+def test_dedupe_drops_cross_posts_and_repeated_ids():
+    jobs = [
+        posting("gh-1"),
+        posting("reddit-9", title="backend engineer", source="reddit"),
+        posting("gh-1", title="Designer"),
+        posting("gh-2", title="Designer"),
+    ]
+
+    assert [job.id for job in dedupe(jobs)] == ["gh-1", "gh-2"]
+
+
+def test_run_once_ingests_every_source():
+    store = FakeStore()
+    ingestor = JobIngestor(
+        store=store,
+        sources={
+            "greenhouse": lambda: FeedSource("greenhouse", jobs=["1", "2"]),
+            "reddit": lambda: FeedSource("reddit", jobs=["2", "3"]),
+        },
+    )
+
+    reports = {report.source: report for report in ingestor.run_once()}
+
+    assert sorted(store.jobs) == ["1", "2", "3"]
+    assert reports["greenhouse"].stored == 2
+    assert sorted(store.expired) == ["greenhouse", "reddit"]
+    assert ingestor.get_stats()["runs"] == 1
+
+
+def test_failed_or_empty_feed_keeps_existing_postings():
+    store = FakeStore()
+    ingestor = JobIngestor(
+        store=store,
+        sources={
+            "remoteok": lambda: FeedSource("remoteok", error=RuntimeError("down")),
+            "hackernews": lambda: FeedSource("hackernews", jobs=[]),
+        },
+    )
+
+    reports = {report.source: report for report in ingestor.run_once()}
+
+    assert reports["remoteok"].error == "down"
+    assert reports["hackernews"].fetched == 0
+    assert store.expired == []
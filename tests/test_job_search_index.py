@@ -0,0 +1,106 @@
+from datetime import datetime
+
+from api.job_sources import JobPosting
+from api.job_sources.search_index import JobSearchIndex, parse_query, tokenize
+
+
+def posting(job_id, title, description="", company="Acme", location="Berlin", **kwargs):
+    return JobPosting(
+        id=job_id,
+        title=title,
+        company=company,
+        location=location,
+        description=description,
+        url="",
+        source="greenhouse",
+        **kwargs,
+    )
+
+
+def build(*jobs):
+    index = JobSearchIndex()
+    index.add_many(jobs)
+    return index
+
+
+def test_tokenize_stems_and_drops_stopwords():
+    assert tokenize("Senior Engineers for the Data Teams") == ["senior", "engineer", "data", "team"]
+    assert tokenize("C++ and node.js") == ["c++", "node.js"]
+
+
+def test_multi_word_query_ranks_best_match_first():
+    index = build(
+        posting("1", "Data Analyst", "Reporting for the senior leadership team"),
+        posting("2", "Senior Data Engineer", "Build pipelines"),
+        posting("3", "Frontend Engineer", "React"),
+    )
+
+    results = index.search("senior data engineering")
+
+    assert [job.id for job in results][:1] == ["2"]
+    assert {job.id for job in results} == {"1", "2", "3"}
+
+
+def test_phrase_requires_adjacent_terms():
+    index = build(
+        posting("1", "Machine Learning Engineer"),
+        posting("2", "Engineer", "Learning about every machine we run"),
+    )
+
+    assert [job.id for job in index.search('"machine learning"')] == ["1"]
+    _, phrases = parse_query('"machine learning" python')
+    assert phrases == [["machine", "learn"]]
+
+
+def test_location_filter_keeps_remote_postings():
+    index = build(
+        posting("1", "Python Developer", location="Berlin, Germany"),
+        posting("2", "Python Developer II", location="Austin"),
+        posting("3", "Python Developer III", location="Anywhere", remote=True),
+    )
+
+    assert {job.id for job in index.search("python", location="berlin")} == {"1", "3"}
+
+
+def test_remove_and_replace_update_postings():
+    index = build(posting("1", "Go Developer"), posting("2", "Rust Developer"))
+
+    index.add(posting("1", "Elixir Developer"))
+    assert index.search("go") == []
+    assert [job.id for job in index.search("elixir")] == ["1"]
+
+    assert index.remove("2") is True
+    assert index.search("rust") == []
+    assert "rust" not in index.postings
+    assert len(index) == 1
+
+
+def test_cross_posted_duplicates_collapse_and_empty_query_is_newest_first():
+    index = build(
+        posting("gh-1", "Platform Engineer", posted_date=datetime(2026, 1, 1)),
+        posting("hn-1", "platform engineer", posted_date=datetime(2026, 2, 1)),
+        posting("gh-2", "SRE", posted_date=datetime(2026, 3, 1)),
+    )
+
+    assert len(index.search("platform")) == 1
+    assert [job.id for job in index.search("")] == ["gh-2", "hn-1"]
+
+
+class FakeStore:
+    def __init__(self, jobs):
+        self.jobs = {job.id: job for job in jobs}
+
+    def changed_since(self, since):
+        return datetime(2026, 10, 17), list(self.jobs.values())
+
+    def ids(self):
+        return set(self.jobs)
+
+
+def test_sync_adds_changed_and_drops_expired_postings():
+    index = build(posting("old", "COBOL Developer"))
+    store = FakeStore([posting("new", "Kotlin Developer")])
+
+    assert index.sync(store) == {"added": 1, "removed": 1}
+    assert [job.id for job in index.search("kotlin")] == ["new"]
+    assert index.get_stats()["synced_at"] == "2026-10-17T00:00:00"
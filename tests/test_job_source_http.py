@@ -0,0 +1,64 @@
+import time
+
+import pytest
+
+from api.job_sources import GreenhouseSource, RedditSource
+from api.job_sources import http as job_http
+
+
+def test_sources_share_one_pooled_session():
+    session = job_http.get_http_session()
+
+    assert GreenhouseSource().http is session
+    assert RedditSource().http is session
+    adapter = session.get_adapter("https://boards-api.greenhouse.io")
+    assert adapter._pool_block is True
+    assert adapter._pool_maxsize == job_http.HTTP_POOL_PER_HOST
+    assert 503 in adapter.max_retries.status_forcelist
+    assert session.headers["User-Agent"] == job_http.DEFAULT_USER_AGENT
+
+
+def test_get_caps_timeout_at_deadline(monkeypatch):
+    calls = []
+
+    class FakeSession:
+        def get(self, url, timeout=None, **kwargs):
+            calls.append(timeout)
+
+    monkeypatch.setattr(GreenhouseSource, "http", FakeSession())
+    source = GreenhouseSource()
+
+    source._get("https://example.com", timeout=5)
+    source.deadline = time.monotonic() + 1.0
+    source._get("https://example.com", timeout=5)
+
+    assert calls[0] == 5
+    assert calls[1] <= 1.0
+
+
+def test_long_retry_after_is_not_slept_on():
+    from urllib3.exceptions import MaxRetryError
+    from urllib3.response import HTTPResponse
+
+    retry = job_http.create_session().get_adapter("https://x").max_retries
+    short = HTTPResponse(status=429, headers={"Retry-After": "1"})
+    long = HTTPResponse(status=429, headers={"Retry-After": "120"})
+
+    assert retry.increment("GET", "/", response=short).total == retry.total - 1
+    with pytest.raises(MaxRetryError):
+        retry.increment("GET", "/", response=long)
+
+
+def test_pool_wait_is_bounded(monkeypatch):
+    from urllib3.exceptions import EmptyPoolError
+
+    monkeypatch.setattr(job_http, "HTTP_POOL_TIMEOUT_SECONDS", 0.05)
+    adapter = job_http.create_session().get_adapter("https://x")
+    pool = adapter.poolmanager.connection_from_host("example.com", 443, "https")
+    for _ in range(job_http.HTTP_POOL_PER_HOST):
+        pool._get_conn()
+
+    start = time.monotonic()
+    with pytest.raises(EmptyPoolError):
+        pool._get_conn()
+    assert time.monotonic() - start < 1.0
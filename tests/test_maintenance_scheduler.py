@@ -0,0 +1,87 @@
+from contextlib import contextmanager
+
+from api import maintenance
+from api.maintenance import MaintenanceScheduler, run_batches
+
+
+def test_due_jobs_run_with_jittered_reschedule():
+    scheduler = MaintenanceScheduler(jitter=0.1, locking=False)
+    calls = []
+    scheduler.add("due", lambda: calls.append("due") or {"rows": 3}, 100, initial_delay=0)
+    scheduler.add("later", lambda: calls.append("later"), 100)
+
+    assert scheduler.run_pending() == 1
+    assert calls == ["due"]
+    job = scheduler.get_stats()["jobs"]["due"]
+    assert job["runs"] == 1
+    assert job["last_result"] == {"rows": 3}
+    assert job["last_duration_ms"] is not None
+    assert 90 <= job["next_run_in_seconds"] <= 110
+
+    # Not due again until its interval has passed
+    assert scheduler.run_pending() == 0
+
+
+def test_failures_are_recorded_and_cleared():
+    scheduler = MaintenanceScheduler(locking=False)
+    outcomes = [RuntimeError("db down"), None]
+
+    def flaky():
+        outcome = outcomes.pop(0)
+        if outcome:
+            raise outcome
+        return "ok"
+
+    scheduler.add("flaky", flaky, 60)
+
+    assert scheduler.run_job("flaky") is False
+    job = scheduler.get_stats()["jobs"]["flaky"]
+    assert job["failures"] == 1
+    assert job["last_error"] == "db down"
+
+    assert scheduler.run_job("flaky") is True
+    job = scheduler.get_stats()["jobs"]["flaky"]
+    assert job["runs"] == 2
+    assert job["last_error"] is None
+
+
+def test_job_held_by_another_worker_is_skipped(monkeypatch):
+    scheduler = MaintenanceScheduler()
+    calls = []
+    scheduler.add("locked", lambda: calls.append(1), 60)
+
+    @contextmanager
+    def held_elsewhere(name):
+        yield False
+
+    monkeypatch.setattr(scheduler, "_job_lock", held_elsewhere)
+
+    assert scheduler.run_job("locked") is False
+    assert calls == []
+    assert scheduler.get_stats()["jobs"]["locked"]["skipped_locked"] == 1
+
+
+def test_job_lock_uses_storage_advisory_lock(monkeypatch):
+    keys = []
+
+    @contextmanager
+    def fake_advisory_lock(*key):
+        keys.append(key)
+        yield True
+
+    monkeypatch.setattr(maintenance, "advisory_lock", fake_advisory_lock)
+    scheduler = MaintenanceScheduler()
+    scheduler.add("locked", lambda: "ok", 60)
+
+    assert scheduler.run_job("locked") is True
+    assert keys[0][0] == maintenance.MAINTENANCE_LOCK_CLASS
+    assert len(keys) == 1
+
+
+def test_run_batches_stops_when_drained_or_out_of_budget():
+    remaining = [200, 200, 50, 0]
+    result = run_batches(lambda: remaining.pop(0), budget_seconds=10, pause_seconds=0)
+    assert result == {"processed": 450, "batches": 4, "complete": True}
+
+    result = run_batches(lambda: 200, budget_seconds=0, pause_seconds=0)
+    assert result == {"processed": 200, "batches": 1, "complete": False}
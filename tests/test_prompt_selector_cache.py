@@ -0,0 +1,118 @@
+import asyncio
+from contextlib import contextmanager
+
+import pytest
+
+from api import prompt_selector as selector_module
+from api import storage
+from api.prompt_selector import PromptSelector
+
+
+CSV_PROMPTS = {"prompts": [], "sha256": "sha-a"}
+
+
+@contextmanager
+def _db_down():
+    raise RuntimeError("db down")
+    yield  # pragma: no cover
+
+
+@pytest.fixture
+def selector(monkeypatch):
+    """Selector with the persistent tier offline and a counting CSV lookup."""
+    monkeypatch.setattr(selector_module, "get_conn", _db_down)
+    monkeypatch.setattr(storage, "get_session_data", lambda session_id: {})
+    selector = PromptSelector()
+    selector.calls = 0
+
+    def find_csv(prompt, csv_prompts):
+        selector.calls += 1
+        return f"answer to {prompt}"
+
+    monkeypatch.setattr(selector, "_find_csv_response", find_csv)
+    return selector
+
+
+def test_repeat_prompt_is_served_from_cache(selector):
+    first = selector.select_prompt_response("I feel stuck", "s1", CSV_PROMPTS, {})
+    second = selector.select_prompt_response("  i feel STUCK? ", "s2", CSV_PROMPTS, {})
+
+    assert selector.calls == 1
+    assert second["response"] == first["response"]
+    assert second["cached"] is True
+    assert second["source"] == "csv"
+    assert selector.get_cache_stats()["memory"]["hits"] == 1
+
+
+def test_cache_key_tracks_prompt_set_and_context(selector):
+    key = selector._cache_key("hello", CSV_PROMPTS, {"system_prompt": "A"})
+
+    assert key != selector._cache_key("hello", {"sha256": "sha-b"}, {"system_prompt": "A"})
+    assert key != selector._cache_key("hello", CSV_PROMPTS, {"system_prompt": "B"})
+    # Metrics are not sent to the model when a system prompt is set
+    assert key == selector._cache_key(
+        "hello", CSV_PROMPTS, {"system_prompt": "A", "metrics": {"clarity": 10}}
+    )
+
+
+def test_ps101_sessions_bypass_cache(selector, monkeypatch):
+    monkeypatch.setattr(storage, "get_session_data", lambda session_id: {"ps101_active": True})
+
+    selector.select_prompt_response("next step", "s1", CSV_PROMPTS, {})
+    result = selector.select_prompt_response("next step", "s1", CSV_PROMPTS, {})
+
+    assert selector.calls == 2
+    assert "cached" not in result
+    assert len(selector.response_cache) == 0
+    assert selector.get_cache_stats()["ps101_bypasses"] == 2
+
+
+def test_failed_lookups_are_not_cached(selector, monkeypatch):
+    monkeypatch.setattr(selector, "_find_csv_response", lambda prompt, csv_prompts: None)
+    monkeypatch.setattr(selector, "_check_feature_flag", lambda flag_name: False)
+
+    result = selector.select_prompt_response("unknown", "s1", CSV_PROMPTS, {})
+
+    assert result["source"] == "none"
+    assert len(selector.response_cache) == 0
+
+
+def test_async_path_shares_cache(selector):
+    selector.select_prompt_response("I feel stuck", "s1", CSV_PROMPTS, {})
+    result = asyncio.run(
+        selector.select_prompt_response_async("I feel stuck", "s1", CSV_PROMPTS, {})
+    )
+
+    assert selector.calls == 1
+    assert result["cached"] is True
+
+
+def test_csv_answers_are_shared_across_contexts(selector):
+    selector.select_prompt_response("I feel stuck", "s1", CSV_PROMPTS, {"system_prompt": "A"})
+    result = selector.select_prompt_response(
+        "I feel stuck", "s2", CSV_PROMPTS, {"system_prompt": "B", "metrics": {"clarity": 3}}
+    )
+
+    assert selector.calls == 1
+    assert result["cached"] is True
+
+
+def test_ai_answers_stay_keyed_on_context(selector, monkeypatch):
+    monkeypatch.setattr(selector, "_find_csv_response", lambda prompt, csv_prompts: None)
+    monkeypatch.setattr(selector, "_check_feature_flag", lambda flag_name: True)
+    monkeypatch.setattr(selector_module, "get_ai_health_status", lambda: {"any_available": True})
+    monkeypatch.setattr(selector, "_log_fallback_usage", lambda *args, **kwargs: None)
+    calls = []
+
+    def ai(prompt, context):
+        calls.append(context["system_prompt"])
+        return {"fallback_used": True, "response": f"ai {len(calls)}", "provider": "openai"}
+
+    monkeypatch.setattr(selector_module, "get_ai_fallback_response", ai)
+
+    selector.select_prompt_response("hello", "s1", CSV_PROMPTS, {"system_prompt": "A"})
+    selector.select_prompt_response("hello", "s1", CSV_PROMPTS, {"system_prompt": "B"})
+    result = selector.select_prompt_response("hello", "s2", CSV_PROMPTS, {"system_prompt": "A"})
+
+    assert calls == ["A", "B"]
+    assert result["cached"] is True
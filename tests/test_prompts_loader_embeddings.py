@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from api import prompts_loader
+from api.prompts_loader import (
+    build_prompt_embeddings,
+    embeddings_path,
+    get_prompt_embeddings,
+    prompts_digest,
+    top_k_prompts,
+)
+
+
+VOCAB = ["career", "resume", "interview", "salary"]
+
+
+def fake_embed(texts):
+    """Bag-of-words embedding over a tiny vocabulary."""
+    return [[float(text.lower().count(word)) for word in VOCAB] for text in texts]
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Run each test in an isolated working directory with a data/ folder."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    prompts_loader._EMBEDDING_MATRICES.clear()
+    yield tmp_path
+    prompts_loader._EMBEDDING_MATRICES.clear()
+
+
+ROWS = [
+    {"prompt": "help with my resume", "completion": "a", "tag": "x"},
+    {"prompt": "", "completion": "b", "tag": "x"},
+    {"prompt": "interview salary interview", "completion": "c", "tag": "x"},
+]
+
+
+def test_build_persists_normalized_matrix(data_dir):
+    path = build_prompt_embeddings("a" * 64, ROWS, embed_fn=fake_embed)
+
+    assert path == embeddings_path("a" * 64)
+    matrix = np.load(path)
+    assert matrix.shape == (3, len(VOCAB))
+    assert matrix.dtype == np.float32
+    assert np.allclose(np.linalg.norm(matrix[0]), 1.0)
+    # Rows without prompt text stay zero so they never match
+    assert not matrix[1].any()
+
+
+def test_get_prompt_embeddings_embeds_only_once(data_dir):
+    calls = []
+
+    def counting_embed(texts):
+        calls.append(list(texts))
+        return fake_embed(texts)
+
+    first = get_prompt_embeddings("b" * 64, ROWS, embed_fn=counting_embed)
+    second = get_prompt_embeddings("b" * 64, ROWS, embed_fn=counting_embed)
+
+    assert len(calls) == 1
+    assert calls[0] == ["help with my resume", "interview salary interview"]
+    assert np.array_equal(np.asarray(first), np.asarray(second))
+
+
+def test_top_k_prompts_ranks_by_cosine(data_dir):
+    matrix = get_prompt_embeddings("c" * 64, ROWS, embed_fn=fake_embed)
+
+    matches = top_k_prompts(matrix, fake_embed(["interview"])[0], k=2)
+
+    assert matches[0][0] == 2
+    assert matches[0][1] > 0.8
+    assert top_k_prompts(matrix, [0.0] * len(VOCAB)) == []
+
+
+def test_stale_matrix_is_rebuilt_when_row_count_changes(data_dir):
+    get_prompt_embeddings("d" * 64, ROWS[:1], embed_fn=fake_embed)
+    prompts_loader._EMBEDDING_MATRICES.clear()
+
+    matrix = get_prompt_embeddings("d" * 64, ROWS, embed_fn=fake_embed)
+
+    assert matrix.shape[0] == len(ROWS)
+
+
+def test_prompts_digest_tracks_prompt_text_only():
+    edited = [dict(row) for row in ROWS]
+    edited[0]["completion"] = "changed"
+    assert prompts_digest(edited) == prompts_digest(ROWS)
+
+    edited[0]["prompt"] = "help with my cover letter"
+    assert prompts_digest(edited) != prompts_digest(ROWS)
@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+from api import provider_routing
+from api.provider_routing import ProviderRouter
+
+
+def test_rank_prefers_faster_healthy_provider():
+    router = ProviderRouter(["openai", "anthropic"])
+    router.record("openai", 1500, True)
+    router.record("anthropic", 800, True)
+
+    assert router.rank(["openai", "anthropic"]) == ["anthropic", "openai"]
+
+    for _ in range(3):
+        router.record("anthropic", 800, False)
+    assert router.rank(["openai", "anthropic"]) == ["openai", "anthropic"]
+
+
+def test_breaker_opens_and_admits_one_probe(monkeypatch):
+    monkeypatch.setattr(provider_routing, "BREAKER_FAILURES", 2)
+    monkeypatch.setattr(provider_routing, "BREAKER_COOLDOWN_SECONDS", 0.05)
+    router = ProviderRouter(["openai", "anthropic"])
+    router.record("openai", 100, False)
+    router.record("openai", 100, False)
+
+    assert router.is_open("openai")
+    assert router.rank(["openai", "anthropic"]) == ["anthropic"]
+
+    time.sleep(0.06)
+    assert router.allow("openai") is True
+    assert router.allow("openai") is False  # only one probe per cooldown
+    router.record("openai", 100, True)
+    assert router.get_stats()["providers"]["openai"]["circuit"] == "closed"
+
+
+def test_slow_primary_is_hedged(monkeypatch):
+    monkeypatch.setattr(provider_routing, "HEDGE_DEFAULT_MS", 50)
+    monkeypatch.setattr(provider_routing, "HEDGE_MIN_MS", 50)
+    router = ProviderRouter(["openai", "anthropic"])
+
+    def slow():
+        time.sleep(0.5)
+        return "slow"
+
+    start = time.monotonic()
+    provider, response = router.call([("openai", slow), ("anthropic", lambda: "fast")])
+
+    assert (provider, response) == ("anthropic", "fast")
+    assert time.monotonic() - start < 0.4
+    assert router.get_stats()["hedges"] == 1
+    assert router.get_stats()["hedge_wins"] == 1
+
+
+def test_failed_primary_falls_through_without_waiting(monkeypatch):
+    monkeypatch.setattr(provider_routing, "HEDGE_DEFAULT_MS", 5000)
+    router = ProviderRouter(["openai", "anthropic"])
+
+    start = time.monotonic()
+    provider, response = router.call([("openai", lambda: None), ("anthropic", lambda: "ok")])
+
+    assert (provider, response) == ("anthropic", "ok")
+    assert time.monotonic() - start < 1
+    assert router.get_stats()["hedges"] == 0
+
+
+def test_async_hedge_cancels_loser(monkeypatch):
+    monkeypatch.setattr(provider_routing, "HEDGE_DEFAULT_MS", 50)
+    monkeypatch.setattr(provider_routing, "HEDGE_MIN_MS", 50)
+    router = ProviderRouter(["openai", "anthropic"])
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return "slow"
+
+    async def fast():
+        return "fast"
+
+    provider, response = asyncio.run(router.call_async([("openai", slow), ("anthropic", fast)]))
+
+    assert (provider, response) == ("anthropic", "fast")
+    assert cancelled == [True]
+    # A cancelled hedge loser is not counted against the provider
+    assert router.get_stats()["providers"]["openai"]["failures"] == 0
+
+
+def test_busy_pool_runs_inline_and_skips_hedge(monkeypatch):
+    monkeypatch.setattr(provider_routing, "HEDGE_DEFAULT_MS", 50)
+    monkeypatch.setattr(provider_routing, "HEDGE_MIN_MS", 50)
+    router = ProviderRouter(["openai", "anthropic"], max_workers=1)
+
+    def slow():
+        time.sleep(0.2)
+        return "slow"
+
+    # The only pool thread is busy with the primary, so no hedge is fired
+    provider, response = router.call([("openai", slow), ("anthropic", lambda: "fast")])
+    assert (provider, response) == ("openai", "slow")
+    assert router.get_stats()["hedges_skipped"] == 1
+
+    # A loser still holding the thread makes the next call run on the caller's thread
+    router._in_flight = 1
+    assert router.call([("anthropic", lambda: "inline")]) == ("anthropic", "inline")
+    assert router.get_stats()["inline_calls"] == 1
@@ -0,0 +1,149 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from api import rag_engine as rag_module
+from api.embedding_cache import EmbeddingCache
+from api.rag_engine import RAGEngine
+
+
+class FakeEmbeddingsAPI:
+    """Stands in for openai.OpenAI().embeddings and records each request."""
+
+    def __init__(self):
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def create(self, model, input):
+        with self.lock:
+            self.requests.append(list(input))
+        data = [
+            SimpleNamespace(index=i, embedding=[float(len(text)), 1.0])
+            for i, text in reversed(list(enumerate(input)))
+        ]
+        return SimpleNamespace(data=data)
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    usage = []
+    monkeypatch.setattr(rag_module, "record_usage", lambda *args: usage.append(args))
+    monkeypatch.setattr(rag_module, "check_cost_limits", lambda *a: {"allowed": True})
+    monkeypatch.setattr(rag_module, "check_resource_limits", lambda *a: {"allowed": True})
+
+    engine = RAGEngine()
+    engine.rag_enabled = True
+    engine.embedding_cache = EmbeddingCache()
+    engine.embedding_cache.persistent_enabled = False
+    engine.batch_max_items = 3
+    engine._openai_client = SimpleNamespace(embeddings=FakeEmbeddingsAPI())
+    engine.usage = usage
+    return engine
+
+
+def test_batches_dedupe_and_preserve_order(engine):
+    texts = ["a", "bb", "a", "ccc", "dddd", "eeeee", "bb"]
+
+    results = engine.batch_compute_embeddings(texts)
+
+    requests = engine._openai_client.embeddings.requests
+    assert sorted(len(r) for r in requests) == [2, 3]
+    assert sorted(t for r in requests for t in r) == ["a", "bb", "ccc", "dddd", "eeeee"]
+    assert [r.text for r in results] == texts
+    assert [r.embedding[0] for r in results] == [float(len(t)) for t in texts]
+    # One usage row per API batch, not per text
+    assert len(engine.usage) == 2
+
+
+def test_cache_hits_skip_the_api(engine):
+    engine.batch_compute_embeddings(["hello", "world"])
+    engine._openai_client.embeddings.requests.clear()
+
+    results = engine.batch_compute_embeddings(["hello", "new"])
+
+    assert engine._openai_client.embeddings.requests == [["new"]]
+    assert [r.cached for r in results] == [True, False]
+
+
+def test_cache_hits_bypass_limits_and_usage(engine, monkeypatch):
+    engine.batch_compute_embeddings(["hello"])
+    engine.usage.clear()
+    monkeypatch.setattr(
+        rag_module, "check_resource_limits", lambda *a: {"allowed": False, "reason": "cap"}
+    )
+
+    assert engine.compute_embedding("hello").cached is True
+    assert [r.cached for r in engine.batch_compute_embeddings(["hello"])] == [True]
+    assert engine.usage == []
+
+
+def test_pack_batches_respects_token_budget(engine):
+    engine.batch_max_items = 100
+    engine.batch_max_tokens = 10
+
+    batches = engine._pack_batches(["x" * 20, "x" * 20, "x" * 4, "x" * 100])
+
+    assert [len(b) for b in batches] == [1, 2, 1]
+
+
+class FakeEmbeddingsTable:
+    """Serves keyset-paged SELECTs over an in-memory embeddings table."""
+
+    def __init__(self, rows):
+        self.rows = rows  # (text_hash, created_at)
+
+    def __call__(self):
+        table = self
+
+        class Cursor:
+            def execute(self, sql, params=()):
+                ordered = sorted(table.rows, key=lambda r: (r[1], r[0]))
+                if sql.strip() == "SELECT text_hash FROM embeddings":
+                    self.result = [(h,) for h, _ in ordered]
+                    return
+                if "ANY" in sql:
+                    ordered = [r for r in ordered if r[0] in params[0]]
+                    limit = len(ordered)
+                elif "WHERE" in sql:
+                    created_at, text_hash, limit = params
+                    ordered = [r for r in ordered if (r[1], r[0]) > (created_at, text_hash)]
+                else:
+                    (limit,) = params
+                self.result = [(h, h, None, "[1.0, 0.0]", "{}", t) for h, t in ordered[:limit]]
+
+            def fetchall(self):
+                return self.result
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+        class Conn:
+            def cursor(self):
+                return Cursor()
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+        return Conn()
+
+
+def test_vector_index_pages_past_shared_timestamps_and_reconciles(engine, monkeypatch):
+    table = FakeEmbeddingsTable([(f"h{i}", 1) for i in range(5)] + [("h9", 2)])
+    monkeypatch.setattr(rag_module, "get_conn", table)
+    engine.index_page_size = 2
+
+    engine._sync_vector_index(force=True)
+    assert sorted(engine.vector_index.keys()) == ["h0", "h1", "h2", "h3", "h4", "h9"]
+
+    table.rows = [r for r in table.rows if r[0] != "h1"] + [("h5", 1)]
+    engine._sync_vector_index(force=True)
+    # h5 landed behind the watermark and h1 was deleted elsewhere; reconciliation fixes both
+    assert sorted(engine.vector_index.keys()) == ["h0", "h2", "h3", "h4", "h5", "h9"]
+    assert engine._index_watermark == (2, "h9")
@@ -0,0 +1,78 @@
+import threading
+import time
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+import pytest
+
+from api.rerank_batching import RerankScheduler
+
+
+class RecordingModel:
+    def __init__(self, delay=0.0, error=None):
+        self.calls = []
+        self.delay = delay
+        self.error = error
+
+    def predict(self, pairs):
+        self.calls.append(list(pairs))
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return [float(len(doc)) for _, doc in pairs]
+
+
+def test_concurrent_callers_share_one_batch():
+    model = RecordingModel()
+    scheduler = RerankScheduler(model.predict, max_wait_ms=50)
+    results = {}
+
+    def call(n):
+        results[n] = scheduler.score([("q", "x" * n), ("q", "y" * (n + 10))])
+
+    threads = [threading.Thread(target=call, args=(n,)) for n in range(1, 5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {n: [float(n), float(n + 10)] for n in range(1, 5)}
+    assert len(model.calls) == 1
+    stats = scheduler.get_stats()
+    assert stats["batches"] == 1
+    assert stats["avg_batch_requests"] == 4
+    assert stats["queue_depth"] == 0
+
+
+def test_batches_are_split_into_length_sorted_buckets():
+    model = RecordingModel()
+    scheduler = RerankScheduler(model.predict, max_wait_ms=1, bucket_size=2)
+
+    scores = scheduler.score([("q", "ccc"), ("q", "a"), ("q", "dddd"), ("q", "bb")])
+
+    assert scores == [3.0, 1.0, 4.0, 2.0]
+    assert [[doc for _, doc in call] for call in model.calls] == [["a", "bb"], ["ccc", "dddd"]]
+
+
+def test_budget_exceeded_raises_timeout():
+    model = RecordingModel(delay=0.3)
+    scheduler = RerankScheduler(model.predict, max_wait_ms=1)
+    blocker = threading.Thread(target=scheduler.score, args=([("q", "slow")],))
+    blocker.start()
+    time.sleep(0.05)
+
+    with pytest.raises(FuturesTimeoutError):
+        scheduler.score([("q", "late")], budget_ms=50)
+    blocker.join()
+
+    # The expired request was dropped rather than scored after its caller left
+    time.sleep(0.05)
+    assert [[doc for _, doc in call] for call in model.calls] == [["slow"]]
+    assert scheduler.get_stats()["budget_exceeded"] == 1
+
+
+def test_model_errors_reach_every_caller():
+    scheduler = RerankScheduler(RecordingModel(error=RuntimeError("boom")).predict)
+
+    with pytest.raises(RuntimeError):
+        scheduler.score([("q", "doc")])
+    assert scheduler.get_stats()["errors"] == 1
@@ -0,0 +1,81 @@
+from api import reranker as reranker_module
+from api.reranker import CrossEncoderReranker, RerankResult, load_backend
+
+
+class KeywordBackend:
+    name = "fake"
+
+    def predict(self, pairs):
+        return [1.0 if query.split()[0].lower() in text.lower() else 0.0 for query, text in pairs]
+
+
+def test_backend_scores_keep_rerank_contract(monkeypatch):
+    monkeypatch.setattr(reranker_module, "load_backend", lambda backend: KeywordBackend())
+    reranker = CrossEncoderReranker()
+    docs = [
+        {"text": "Java engineer role", "similarity": 0.9},
+        {"text": "Python developer position", "similarity": 0.5},
+    ]
+
+    result = reranker.rerank_documents("python developer", docs)
+
+    assert isinstance(result, RerankResult)
+    assert result.reranked_documents[0]["text"] == "Python developer position"
+    assert result.reranked_documents[0]["rerank_score"] == 1.0
+    assert result.reranked_documents[0]["original_score"] == 0.5
+    health = reranker.get_health_status()
+    assert health["backend"] == "fake"
+    assert health["batching"]["batches"] == 1
+
+
+def test_missing_backend_falls_back_to_mock(monkeypatch):
+    monkeypatch.setattr(reranker_module, "load_backend", lambda backend: None)
+    reranker = CrossEncoderReranker()
+    docs = [{"text": "a", "similarity": 0.2}]
+
+    result = reranker.rerank_documents("query", docs)
+
+    assert result.reranked_documents == docs
+    assert reranker.get_health_status()["status"] == "mock"
+
+
+def test_auto_prefers_onnx_export_over_torch(monkeypatch):
+    monkeypatch.setattr(reranker_module, "ONNXRUNTIME_AVAILABLE", True)
+    monkeypatch.setattr(reranker_module, "SENTENCE_TRANSFORMERS_AVAILABLE", True)
+    monkeypatch.setattr(reranker_module, "onnx_model_available", lambda: True)
+    monkeypatch.setattr(reranker_module, "OnnxBackend", lambda model_dir: "onnx")
+    monkeypatch.setattr(reranker_module, "TorchBackend", lambda model_name: "torch")
+
+    assert load_backend("auto") == "onnx"
+    assert load_backend("torch") == "torch"
+
+    monkeypatch.setattr(reranker_module, "onnx_model_available", lambda: False)
+    assert load_backend("auto") == "torch"
+    assert load_backend("onnx") is None
+
+
+class CountingBackend(KeywordBackend):
+    def __init__(self):
+        self.scored = []
+
+    def predict(self, pairs):
+        self.scored.extend(text for _, text in pairs)
+        return super().predict(pairs)
+
+
+def test_score_cache_only_sends_uncached_pairs(monkeypatch):
+    backend = CountingBackend()
+    monkeypatch.setattr(reranker_module, "load_backend", lambda backend_name: backend)
+    reranker = CrossEncoderReranker()
+    docs = [{"text": "Python developer", "similarity": 0.5}, {"text": "Chef", "similarity": 0.4}]
+
+    reranker.rerank_documents("python jobs", docs)
+    result = reranker.rerank_documents(
+        "Python  JOBS", [*docs[1:], {"text": "Python tutor", "similarity": 0.3}]
+    )
+
+    assert sorted(backend.scored) == ["Chef", "Python developer", "Python tutor"]
+    assert result.reranked_documents[0]["text"] == "Python tutor"
+    health = reranker.get_health_status()
+    assert health["score_cache_hit_ratio"] == 0.25
+    assert health["score_cache"]["entries"] == 3
@@ -0,0 +1,111 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from api import ai_clients
+from api.ai_clients import AIClientManager
+from api.semantic_cache import SemanticResponseCache, namespace_for
+
+
+VECTORS = {
+    "i feel stuck in my career": [1.0, 0.0, 0.0],
+    "i feel stuck in my job": [0.98, 0.2, 0.0],
+    "how do i negotiate salary": [0.0, 1.0, 0.0],
+}
+
+
+def fake_embed(prompt):
+    return VECTORS[prompt.lower()]
+
+
+def make_cache(**kwargs):
+    return SemanticResponseCache(threshold=0.9, embed_fn=fake_embed, enabled=True, **kwargs)
+
+
+def store(cache, namespace, prompt, response):
+    cache.store(namespace, prompt, cache.embed(prompt), {"response": response})
+
+
+def test_similar_prompt_hits_within_namespace():
+    cache = make_cache()
+    ns = namespace_for("coach")
+    store(cache, ns, "I feel stuck in my career", "Try a small experiment")
+
+    hit = cache.lookup(ns, cache.embed("I feel stuck in my job"))
+    assert hit["response"] == "Try a small experiment"
+    assert hit["similarity"] >= 0.9
+
+    assert cache.lookup(ns, cache.embed("How do I negotiate salary")) is None
+    assert cache.lookup(namespace_for("other coach"), cache.embed("I feel stuck in my job")) is None
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_namespace_evicts_least_recently_used():
+    cache = make_cache(max_per_namespace=1)
+    ns = namespace_for("coach")
+    for prompt in ("I feel stuck in my career", "How do I negotiate salary"):
+        store(cache, ns, prompt, prompt)
+
+    assert cache.lookup(ns, cache.embed("I feel stuck in my career")) is None
+    assert cache.lookup(ns, cache.embed("How do I negotiate salary")) is not None
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_expired_entries_are_not_served():
+    cache = make_cache(ttl_seconds=-1)
+    ns = namespace_for("coach")
+    store(cache, ns, "I feel stuck in my career", "old")
+
+    assert cache.lookup(ns, cache.embed("I feel stuck in my career")) is None
+    assert cache.get_stats()["expirations"] == 1
+
+
+def test_fallback_reuses_answer_for_similar_prompt(monkeypatch):
+    monkeypatch.setattr(ai_clients, "AI_PACKAGES_AVAILABLE", True)
+    calls = []
+
+    class Messages:
+        async def create(self, **kwargs):
+            calls.append(kwargs)
+            return SimpleNamespace(content=[SimpleNamespace(text="ok")])
+
+    manager = AIClientManager()
+    manager.semantic_cache = make_cache()
+    manager.openai_client = None
+    manager.anthropic_client = object()
+    manager.async_anthropic_client = SimpleNamespace(messages=Messages())
+    context = {"system_prompt": "coach"}
+
+    first = asyncio.run(
+        manager.generate_fallback_response_async("I feel stuck in my career", context)
+    )
+    second = asyncio.run(
+        manager.generate_fallback_response_async("I feel stuck in my job", context)
+    )
+
+    assert len(calls) == 1
+    assert "cached" not in first
+    assert second["cached"] is True
+    assert second["response"] == "ok"
+    assert second["provider"] == "anthropic"
+
+
+def test_manager_embeds_through_its_own_client_and_embedding_cache(monkeypatch):
+    requests = []
+
+    def create(model, input):
+        requests.append(input)
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[0.6, 0.8])])
+
+    monkeypatch.setattr(ai_clients, "get_cached_embedding", lambda text, fn: fn(text))
+    manager = AIClientManager()
+    manager.openai_client = SimpleNamespace(embeddings=SimpleNamespace(create=create))
+    manager.semantic_cache.enabled = True
+
+    assert manager.semantic_cache.embed("hello  there").tolist() == pytest.approx([0.6, 0.8])
+    assert requests == ["hello there"]
+
+    manager.openai_client = None
+    assert manager.semantic_cache.embed("hello") is None
+    assert SemanticResponseCache(enabled=True).embed("hello") is None
@@ -0,0 +1,149 @@
+import asyncio
+import json
+from contextlib import contextmanager
+
+import pytest
+
+from api import async_storage, storage
+
+
+class FakeDB:
+    """Just enough of the sessions/wimd_outputs tables to observe transactions."""
+
+    def __init__(self, user_data=None, metrics=None):
+        self.user_data = json.dumps(user_data or {})
+        self.metrics = metrics
+        self.outputs = []
+        self.transactions = 0
+        self.statements = []
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.result = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.db.statements.append(" ".join(sql.split()))
+        if "RETURNING user_data" in sql or "FOR UPDATE" in sql:
+            self.result = (self.db.user_data,)
+        elif "SELECT metrics" in sql:
+            self.result = (self.db.metrics,) if self.db.metrics else None
+        elif sql.startswith("UPDATE sessions"):
+            self.db.user_data = params[0]
+
+    def executemany(self, sql, rows):
+        self.db.statements.append(" ".join(sql.split()))
+        self.db.outputs.extend(rows)
+
+    def fetchone(self):
+        return self.result
+
+
+class FakeConn:
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self.db)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeDB(user_data={"ps101_step": 1, "name": "x"}, metrics={"clarity": 40})
+
+    @contextmanager
+    def fake_get_conn():
+        db.transactions += 1
+        yield FakeConn(db)
+
+    monkeypatch.setattr(storage, "get_conn", fake_get_conn)
+    return db
+
+
+def test_turn_uses_one_load_and_one_flush(db):
+    with storage.session_unit_of_work("s1") as uow:
+        assert storage.latest_metrics("s1") == {"clarity": 40}
+        data = storage.get_session_data("s1")
+        data["ps101_step"] = 2
+        storage.update_session_data("s1", data)
+        assert storage.get_session_data("s1")["ps101_step"] == 2
+        storage.ensure_session("s1")
+        storage.record_wimd_output("s1", "hi", "hello", metrics={"clarity": 42})
+        assert storage.latest_metrics("s1") == {"clarity": 42}
+        assert uow.dirty
+
+    assert db.transactions == 2
+    assert json.loads(db.user_data)["ps101_step"] == 2
+    assert len(db.outputs) == 1
+    assert db.outputs[0][:3] == ("s1", "hi", "hello")
+
+
+def test_read_only_turn_does_not_flush(db):
+    with storage.session_unit_of_work("s1"):
+        storage.get_session_data("s1")
+
+    assert db.transactions == 1
+
+
+def test_returned_data_is_a_copy(db):
+    with storage.session_unit_of_work("s1"):
+        storage.get_session_data("s1")["ps101_step"] = 99
+        assert storage.get_session_data("s1")["ps101_step"] == 1
+
+
+def test_flush_merges_with_concurrent_changes(db):
+    with storage.session_unit_of_work("s1"):
+        data = storage.get_session_data("s1")
+        data["ps101_step"] = 3
+        del data["name"]
+        storage.update_session_data("s1", data)
+        # Another tab writes a different key before this turn flushes
+        db.user_data = json.dumps({"ps101_step": 1, "name": "x", "other_tab": True})
+
+    assert json.loads(db.user_data) == {"ps101_step": 3, "other_tab": True}
+    assert any("FOR UPDATE" in sql for sql in db.statements)
+
+
+def test_error_discards_pending_writes(db):
+    with pytest.raises(RuntimeError):
+        with storage.session_unit_of_work("s1"):
+            storage.update_session_data("s1", {"ps101_step": 5})
+            raise RuntimeError("boom")
+
+    assert json.loads(db.user_data)["ps101_step"] == 1
+    assert db.transactions == 1
+
+
+def test_new_session_gets_generated_id(db):
+    with storage.session_unit_of_work(None) as uow:
+        assert len(uow.session_id) == 32
+
+
+def test_async_unit_of_work_is_visible_to_sync_code_in_threads(db, monkeypatch):
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+
+    def sync_turn(session_id):
+        data = storage.get_session_data(session_id)
+        data["ps101_step"] = 7
+        storage.update_session_data(session_id, data)
+
+    async def turn():
+        async with async_storage.session_unit_of_work("s1") as uow:
+            await asyncio.to_thread(sync_turn, "s1")
+            await async_storage.record_wimd_output("s1", "hi", "hello", metrics={"clarity": 1})
+            assert await async_storage.latest_metrics("s1") == {"clarity": 1}
+            return uow
+
+    uow = asyncio.run(turn())
+
+    assert not uow.dirty
+    assert json.loads(db.user_data)["ps101_step"] == 7
+    assert len(db.outputs) == 1
+    assert db.transactions == 2
@@ -0,0 +1,255 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+from psycopg2 import pool as pg_pool
+
+from api import storage
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if self.conn.dead:
+            raise RuntimeError("server closed the connection")
+
+
+class FakeConn:
+    def __init__(self):
+        self.closed = 0
+        self.dead = False
+        self.autocommit = False
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class FakeThreadedPool:
+    """Mimics psycopg2's pool: raises PoolError as soon as it is exhausted."""
+
+    def __init__(self, minconn, maxconn, dsn):
+        self.maxconn = maxconn
+        self._pool = []
+        self._used = []
+        self.opened = 0
+
+    def getconn(self):
+        if self._pool:
+            conn = self._pool.pop()
+        elif len(self._used) < self.maxconn:
+            conn = FakeConn()
+            self.opened += 1
+        else:
+            raise pg_pool.PoolError("connection pool exhausted")
+        self._used.append(conn)
+        return conn
+
+    def putconn(self, conn, close=False):
+        self._used.remove(conn)
+        if close:
+            conn.closed = 1
+        else:
+            self._pool.append(conn)
+
+    def closeall(self):
+        pass
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    monkeypatch.setattr(pg_pool, "ThreadedConnectionPool", FakeThreadedPool)
+    monkeypatch.setenv("DATABASE_URL", "postgresql://test/db")
+    monkeypatch.setattr(storage, "_POOL", None)
+    yield
+    monkeypatch.setattr(storage, "_POOL", None)
+
+
+def test_get_conn_reuses_pooled_connection(fake_pool):
+    with storage.get_conn() as first:
+        pass
+    with storage.get_conn() as second:
+        pass
+
+    assert first is second
+    assert first.commits == 2
+    stats = storage.get_pool_stats()
+    assert stats["initialized"] is True
+    assert stats["acquired"] == 2
+    assert stats["in_use"] == 0
+
+
+def test_get_conn_rolls_back_on_error(fake_pool):
+    with pytest.raises(ValueError):
+        with storage.get_conn() as conn:
+            raise ValueError("boom")
+
+    assert conn.rollbacks == 1
+    assert conn.commits == 0
+
+
+def test_exhausted_pool_waits_then_times_out(fake_pool):
+    pool = storage.ConnectionPool("dsn", minconn=0, maxconn=1, timeout=0.05)
+    held = pool.getconn()
+
+    with pytest.raises(pg_pool.PoolError):
+        pool.getconn()
+
+    # A waiter is served once the connection is returned
+    threading.Timer(0.02, pool.putconn, args=(held,)).start()
+    pool.timeout = 1.0
+    assert pool.getconn() is held
+    stats = pool.get_stats()
+    assert stats["timeouts"] == 1
+    assert stats["waits"] == 2
+
+
+def test_stale_idle_connection_is_replaced(fake_pool):
+    pool = storage.ConnectionPool("dsn", minconn=0, maxconn=2, idle_check_seconds=0.0)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    conn.dead = True
+    time.sleep(0.001)
+
+    fresh = pool.getconn()
+
+    assert fresh is not conn
+    assert conn.closed
+    assert pool.get_stats()["discarded"] == 1
+
+
+class LockConn:
+    def __init__(self, granted):
+        self.granted = granted
+        self.autocommit = False
+        self.closed = False
+        self.statements = []
+
+    def cursor(self):
+        conn = self
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, sql, params=None):
+                # Session locks must not sit inside an open transaction
+                assert conn.autocommit
+                conn.statements.append((sql, params))
+
+            def fetchone(self):
+                return (conn.granted,)
+
+        return Cursor()
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.parametrize("granted", [True, False])
+def test_advisory_lock_uses_dedicated_autocommit_connection(monkeypatch, granted):
+    conn = LockConn(granted)
+    monkeypatch.setenv("DATABASE_URL", "postgresql://example/db")
+    monkeypatch.setattr(storage.psycopg2, "connect", lambda dsn: conn)
+
+    with storage.advisory_lock(7302, 11) as acquired:
+        assert acquired is granted
+
+    assert conn.statements[0] == ("SELECT pg_try_advisory_lock(%s, %s)", (7302, 11))
+    assert len(conn.statements) == (2 if granted else 1)
+    assert conn.closed
+
+
+class UploadsCursor:
+    def __init__(self, stored):
+        self.stored = stored
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if "ORDER BY id DESC" in sql:
+            # Sanity-check sample of known rows
+            self.rows = [(path,) for path in reversed(self.stored)][: params[0]]
+            return
+        names = set(params[0])
+        self.rows = [(path.rsplit("/", 1)[-1],) for path in self.stored]
+        self.rows = [row for row in self.rows if row[0] in names]
+
+    def fetchall(self):
+        return self.rows
+
+
+def _old_upload(root, name):
+    path = root / name
+    path.write_text("x")
+    old = time.time() - 7200
+    os.utime(path, (old, old))
+    return path
+
+
+def _patch_uploads(monkeypatch, root, stored):
+    class Conn:
+        def cursor(self):
+            return UploadsCursor(stored)
+
+    @contextmanager
+    def fake_get_conn():
+        yield Conn()
+
+    monkeypatch.setattr(storage, "UPLOAD_ROOT", root)
+    monkeypatch.setattr(storage, "get_conn", fake_get_conn)
+
+
+def test_orphan_uploads_match_on_file_name(monkeypatch, tmp_path):
+    kept = _old_upload(tmp_path, "s1_1_resume.pdf")
+    orphan = _old_upload(tmp_path, "s2_2_old.pdf")
+    # Row written under a different UPLOAD_ROOT still protects the file
+    _patch_uploads(monkeypatch, tmp_path, ["/data/uploads/s1_1_resume.pdf"])
+
+    assert storage.delete_orphan_uploads() == 1
+    assert kept.exists()
+    assert not orphan.exists()
+
+
+def test_orphan_uploads_delete_batches_with_no_matching_rows(monkeypatch, tmp_path):
+    kept = _old_upload(tmp_path, "s0_1_kept.pdf")
+    orphans = [_old_upload(tmp_path, f"s{i}_1_file.pdf") for i in range(1, 6)]
+    _patch_uploads(monkeypatch, tmp_path, ["/data/uploads/s0_1_kept.pdf"])
+
+    # Small batches: most of them hold only orphans and must still be cleaned
+    assert storage.delete_orphan_uploads(batch_size=2) == 5
+    assert kept.exists()
+    assert not any(path.exists() for path in orphans)
+
+
+def test_orphan_uploads_skipped_when_no_known_row_resolves(monkeypatch, tmp_path):
+    files = [_old_upload(tmp_path, f"s{i}_1_file.pdf") for i in range(3)]
+    _patch_uploads(monkeypatch, tmp_path, ["/elsewhere/other.pdf"])
+
+    assert storage.delete_orphan_uploads() == 0
+    assert all(path.exists() for path in files)
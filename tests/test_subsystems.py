@@ -0,0 +1,90 @@
+import asyncio
+import sys
+import threading
+
+import pytest
+
+from api.subsystems import SubsystemRegistry
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    pkg = tmp_path / "lazypkg"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("")
+    (pkg / "heavy.py").write_text(
+        "WARMED = []\n"
+        "def answer(x):\n    return x * 2\n"
+        "def warm():\n    WARMED.append(True)\n"
+        "import threading\n"
+        "LOADED_ON = threading.current_thread().name\n"
+        "async def answer_async(x):\n    return x * 3\n"
+    )
+    (pkg / "broken.py").write_text("raise ImportError('missing dependency')\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "lazypkg"
+    for name in [m for m in sys.modules if m.startswith("lazypkg")]:
+        del sys.modules[name]
+
+
+def test_module_is_imported_on_first_call(package):
+    availability = {}
+    registry = SubsystemRegistry(package, availability)
+    registry.register("heavy", ".heavy", warm="warm")
+    answer = registry.lazy("heavy", "answer")
+
+    assert "lazypkg.heavy" not in sys.modules
+    assert availability == {"heavy": True}
+
+    assert answer(21) == 42
+    assert registry.is_loaded("heavy")
+    status = registry.get_status()["heavy"]
+    assert status["state"] == "loaded"
+    assert status["load_ms"] is not None
+
+
+def test_failed_import_uses_fallback_and_updates_availability(package):
+    availability = {}
+    registry = SubsystemRegistry(package, availability)
+    registry.register("broken", ".broken")
+    registry.register("absent", ".absent")
+    health = registry.lazy("broken", "health", lambda: {"ok": False})
+
+    assert availability["absent"] is False
+    assert health() == {"ok": False}
+    assert availability["broken"] is False
+    assert "missing dependency" in registry.get_status()["broken"]["error"]
+    with pytest.raises(RuntimeError):
+        registry.lazy("absent", "anything")()
+
+
+def test_async_stand_in_imports_off_the_event_loop(package):
+    registry = SubsystemRegistry(package)
+    registry.register("heavy", ".heavy")
+    registry.register("broken", ".broken")
+    answer = registry.lazy_async("heavy", "answer_async")
+
+    async def fallback():
+        return "unavailable"
+
+    async def main():
+        return await answer(5), threading.current_thread().name
+
+    result, loop_thread = asyncio.run(main())
+    assert result == 15
+    assert loop_thread != sys.modules["lazypkg.heavy"].LOADED_ON
+    assert asyncio.run(registry.lazy_async("broken", "health", fallback)()) == "unavailable"
+
+
+def test_warm_up_loads_and_runs_hooks(package):
+    registry = SubsystemRegistry(package)
+    registry.register("heavy", ".heavy", warm="warm")
+    registry.register("broken", ".broken")
+
+    registry.warm_up()
+
+    assert sys.modules["lazypkg.heavy"].WARMED == [True]
+    status = registry.get_status()
+    assert status["heavy"]["state"] == "warm"
+    assert status["heavy"]["warm_ms"] is not None
+    assert status["broken"]["state"] == "failed"
@@ -0,0 +1,56 @@
+import json
+
+import numpy as np
+
+from api.vector_codec import (
+    decode_embedding,
+    decode_float16,
+    decode_float32,
+    dequantize_int8,
+    encode_float16,
+    encode_float32,
+    quantize_int8,
+)
+
+
+def sample_vector(dim=1536):
+    return np.random.default_rng(0).normal(scale=0.05, size=dim).astype(np.float32)
+
+
+def test_float32_round_trip_is_exact_and_compact():
+    vector = sample_vector()
+
+    buf = encode_float32(vector.tolist())
+
+    assert len(buf) == 1536 * 4
+    assert len(buf) * 4 < len(json.dumps(vector.tolist()))
+    assert np.array_equal(decode_float32(buf), vector)
+    assert np.array_equal(decode_float32(memoryview(buf)), vector)
+
+
+def test_quantized_copies_stay_close():
+    vector = sample_vector()
+
+    half = decode_float16(encode_float16(vector))
+    q8, scale = quantize_int8(vector)
+
+    assert len(q8) == 1536
+    assert np.allclose(half, vector, atol=1e-3)
+    assert np.abs(dequantize_int8(q8, scale) - vector).max() <= scale / 2 + 1e-7
+
+
+def test_decode_embedding_accepts_binary_and_legacy_json():
+    vector = sample_vector(8)
+
+    from_bytes = decode_embedding(memoryview(encode_float32(vector)))
+    from_json = decode_embedding(json.dumps(vector.tolist()))
+
+    assert np.array_equal(from_bytes, vector)
+    assert np.allclose(from_json, vector)
+
+
+def test_quantize_zero_vector():
+    q8, scale = quantize_int8([0.0, 0.0])
+
+    assert scale == 1.0
+    assert not dequantize_int8(q8, scale).any()
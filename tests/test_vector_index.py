@@ -0,0 +1,106 @@
+import threading
+
+import numpy as np
+
+from api.vector_index import VectorIndex
+
+
+def random_vectors(n, dim=32, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def test_flat_search_returns_best_match_first():
+    index = VectorIndex()
+    vectors = random_vectors(200)
+    index.add_many([(f"doc{i}", v, {"text": f"text {i}"}) for i, v in enumerate(vectors)])
+
+    results = index.search(vectors[42] * 3.0, k=3)
+
+    assert results[0]["key"] == "doc42"
+    assert results[0]["text"] == "text 42"
+    assert abs(results[0]["similarity"] - 1.0) < 1e-5
+    assert len(results) == 3
+    assert index.get_stats()["mode"] == "flat"
+
+
+def test_remove_and_replace():
+    index = VectorIndex()
+    vectors = random_vectors(10)
+    for i, v in enumerate(vectors):
+        index.add(f"doc{i}", v)
+
+    assert index.remove("doc3")
+    assert not index.remove("doc3")
+    assert all(r["key"] != "doc3" for r in index.search(vectors[3], k=10))
+
+    index.add("doc4", vectors[3])
+    assert len(index) == 9
+    assert index.search(vectors[3], k=1)[0]["key"] == "doc4"
+
+
+def test_min_similarity_filters_results():
+    index = VectorIndex()
+    index.add("a", [1.0, 0.0])
+    index.add("b", [0.0, 1.0])
+
+    results = index.search([1.0, 0.1], k=5, min_similarity=0.5)
+
+    assert [r["key"] for r in results] == ["a"]
+
+
+def test_ivf_recall_matches_flat_search():
+    vectors = random_vectors(3000, dim=16, seed=1)
+    flat = VectorIndex()
+    ivf = VectorIndex(ivf_min_vectors=1000, nprobe=16)
+    items = [(f"doc{i}", v, None) for i, v in enumerate(vectors)]
+    flat.add_many(items)
+    ivf.add_many(items)
+    assert ivf.wait_for_training(timeout=10)
+    assert ivf.get_stats()["mode"] == "ivf"
+
+    queries = random_vectors(50, dim=16, seed=2)
+    hits = sum(flat.search(q, k=1)[0]["key"] == ivf.search(q, k=1)[0]["key"] for q in queries)
+
+    assert hits / len(queries) >= 0.8
+
+
+def test_ivf_trains_in_background_while_search_serves_flat_results():
+    vectors = random_vectors(1500, dim=16, seed=3)
+    index = VectorIndex(ivf_min_vectors=1000)
+    release = threading.Event()
+    train = index._kmeans
+
+    def slow_kmeans(*args):
+        release.wait(10)
+        return train(*args)
+
+    index._kmeans = slow_kmeans
+    index.add_many([(f"doc{i}", v, None) for i, v in enumerate(vectors[:1200])])
+
+    # add_many returned with training still blocked; searches don't wait on it
+    assert index.get_stats()["training"]
+    assert index.search(vectors[7], k=1)[0]["key"] == "doc7"
+    assert index.get_stats()["mode"] == "flat"
+    index.add_many([(f"doc{i}", v, None) for i, v in enumerate(vectors[1200:], 1200)])
+
+    release.set()
+    assert index.wait_for_training(timeout=10)
+    stats = index.get_stats()
+    assert stats["mode"] == "ivf"
+    assert sum(len(rows) for rows in index._lists) == 1500  # rows added mid-training included
+    assert index.search(vectors[1400], k=1)[0]["key"] == "doc1400"
+
+
+def test_nprobe_scales_with_list_count():
+    small = VectorIndex(ivf_min_vectors=100, background_training=False)
+    small.add_many([(f"doc{i}", v, None) for i, v in enumerate(random_vectors(400, dim=8))])
+    assert small.get_stats()["nprobe"] == 8  # floor while 10% of 20 lists is fewer
+
+    large = VectorIndex(ivf_min_vectors=100, background_training=False)
+    large.add_many([(f"doc{i}", v, None) for i, v in enumerate(random_vectors(10000, dim=8))])
+    stats = large.get_stats()
+    assert stats["mode"] == "ivf"
+    assert stats["ivf_lists"] == 100
+    assert stats["nprobe"] == 10
+
+    assert VectorIndex(nprobe=3).nprobe == 3
@@ -0,0 +1,62 @@
+import asyncio
+
+from api import index
+
+
+def collect(prompt="hello"):
+    async def run():
+        return [chunk async for chunk in index._coach_reply_stream(prompt, {}, "s1")]
+
+    return asyncio.run(run())
+
+
+def test_stream_forwards_deltas(monkeypatch):
+    monkeypatch.setattr(
+        index, "_prepare_coach_reply", lambda *args: (None, {"prompt": "hello", "session_id": "s1"})
+    )
+
+    async def fake_response(on_delta=None, **kwargs):
+        for text in ("Try ", "this"):
+            await on_delta(text)
+        return {"response": "Try this"}
+
+    monkeypatch.setattr(index, "get_prompt_response_async", fake_response)
+
+    assert collect() == ["Try ", "this"]
+
+
+def test_stream_sends_whole_reply_when_nothing_streamed(monkeypatch):
+    monkeypatch.setattr(
+        index, "_prepare_coach_reply", lambda *args: (None, {"prompt": "hello", "session_id": "s1"})
+    )
+
+    async def fake_response(on_delta=None, **kwargs):
+        return {"response": "From the prompt library", "source": "csv"}
+
+    monkeypatch.setattr(index, "get_prompt_response_async", fake_response)
+
+    assert collect() == ["From the prompt library"]
+
+
+def test_stream_returns_ps101_reply_directly(monkeypatch):
+    monkeypatch.setattr(index, "_prepare_coach_reply", lambda *args: ("Step 1", None))
+
+    assert collect() == ["Step 1"]
+
+
+def test_failed_background_task_is_reported(capsys):
+    async def failing():
+        raise RuntimeError("provider ping failed")
+
+    async def run():
+        task = asyncio.create_task(failing(), name="deferred_startup")
+        index._background_tasks.add(task)
+        task.add_done_callback(index._background_task_done)
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.sleep(0)
+        return task
+
+    task = asyncio.run(run())
+    assert task not in index._background_tasks
+    out = capsys.readouterr().out
+    assert "deferred_startup failed: RuntimeError('provider ping failed')" in out